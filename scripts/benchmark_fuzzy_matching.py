@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Benchmark approximate phrase matching against a per-pattern regex loop."""
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+# Add source directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from klyntos_guard.core.fuzzy import FuzzyPhraseMatcher
+from klyntos_guard.rails.jailbreak_prevention import JailbreakPreventionRail
+
+WORDS = (
+    "the quick brown fox jumps over a lazy dog please help me write some "
+    "code for my project and explain how this function handles errors"
+).split()
+
+
+def make_phrases(count: int, rng: random.Random) -> list:
+    """The rail's default phrases, padded with synthetic attack-like phrases."""
+    phrases = list(JailbreakPreventionRail.DEFAULT_FUZZY_PHRASES[:count])
+    verbs = ["ignore", "bypass", "override", "disable", "unlock", "reveal", "forget"]
+    objects = ["safety", "filters", "policy", "restrictions", "guardrails", "prompt"]
+    while len(phrases) < count:
+        suffix = "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(5))
+        phrases.append(f"{rng.choice(verbs)} {rng.choice(objects)} {suffix}")
+    return phrases
+
+
+def make_text(length: int, rng: random.Random) -> str:
+    """Benign text of the requested length."""
+    words = []
+    size = 0
+    while size < length:
+        word = rng.choice(WORDS)
+        words.append(word)
+        size += len(word) + 1
+    return " ".join(words)[:length]
+
+
+def timed(func, repeat: int) -> float:
+    """Best wall-clock time of ``repeat`` runs, in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="1000,4000,16000", help="Text lengths")
+    parser.add_argument("--phrases", default="10,50,200", help="Phrase counts")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    sizes = [int(s) for s in args.sizes.split(",")]
+    counts = [int(c) for c in args.phrases.split(",")]
+
+    print(f"{'phrases':>8} {'chars':>7} {'regex ms':>10} {'fuzzy ms':>10} {'full scan ms':>13}")
+    for count in counts:
+        phrases = make_phrases(count, rng)
+        patterns = [re.compile(r"\s+".join(map(re.escape, p.split()))) for p in phrases]
+        matcher = FuzzyPhraseMatcher(phrases)
+        # Bit-parallel scan of every character
+        full_scan = FuzzyPhraseMatcher(phrases, prefilter=False)
+
+        for size in sizes:
+            text = make_text(size, rng)
+            regex_ms = timed(lambda: [p.search(text) for p in patterns], args.repeat)
+            fuzzy_ms = timed(lambda: matcher.search(text), args.repeat)
+            full_ms = timed(lambda: full_scan.search(text), args.repeat)
+            print(f"{count:>8} {size:>7} {regex_ms:>10.2f} {fuzzy_ms:>10.2f} {full_ms:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
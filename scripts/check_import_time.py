@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""Fail if importing klyntos_guard is too slow or pulls in heavy dependencies."""
+
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).parent.parent / "src"
+
+# Heavy dependencies that only specific rails and adapters need; none of
+# them may be imported by the package itself
+HEAVY_MODULES = [
+    "anthropic",
+    "detoxify",
+    "google.generativeai",
+    "numpy",
+    "openai",
+    "presidio_analyzer",
+    "presidio_anonymizer",
+    "sentence_transformers",
+    "spacy",
+    "torch",
+]
+
+
+def import_times(module: str) -> dict:
+    """
+    Import a module in a fresh interpreter under ``-X importtime``.
+
+    Returns:
+        Cumulative import time in microseconds per imported module
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(SRC), env.get("PYTHONPATH")]))
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode:
+        sys.exit(f"import {module} failed:\n{completed.stderr}")
+
+    times = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--module", default="klyntos_guard")
+    parser.add_argument(
+        "--budget-ms", type=float, default=1500, help="Maximum cumulative import time"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="Imports to run; the fastest one counts"
+    )
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to show")
+    args = parser.parse_args()
+
+    # Module caches and pyc files make the first import slower than the rest
+    runs = [import_times(args.module) for _ in range(args.repeat)]
+    best = min(runs, key=lambda times: times.get(args.module, 0))
+    total_ms = best.get(args.module, 0) / 1000
+
+    print(f"import {args.module}: {total_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    for name, micros in sorted(best.items(), key=lambda item: -item[1])[1:args.top + 1]:
+        print(f"  {micros / 1000:>8.1f} ms  {name}")
+
+    failures = []
+    if total_ms > args.budget_ms:
+        failures.append(f"import time {total_ms:.1f} ms exceeds {args.budget_ms:.0f} ms")
+    heavy = sorted(name for name in HEAVY_MODULES if name in best)
+    if heavy:
+        failures.append(f"heavy modules imported eagerly: {', '.join(heavy)}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
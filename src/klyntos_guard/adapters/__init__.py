@@ -1,9 +1,27 @@
 """LLM adapter implementations for KlyntosGuard."""
 
+import importlib
+from typing import Any
+
 from klyntos_guard.adapters.base import BaseLLMAdapter
-from klyntos_guard.adapters.openai import OpenAIAdapter
-from klyntos_guard.adapters.anthropic import AnthropicAdapter
-from klyntos_guard.adapters.google import GoogleAdapter
+
+# Adapters import their provider SDKs, which is slow; each is imported on
+# first access (``from klyntos_guard.adapters import OpenAIAdapter``)
+_ADAPTER_MODULES = {
+    "OpenAIAdapter": "klyntos_guard.adapters.openai",
+    "AnthropicAdapter": "klyntos_guard.adapters.anthropic",
+    "GoogleAdapter": "klyntos_guard.adapters.google",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _ADAPTER_MODULES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    adapter = getattr(importlib.import_module(module_name), name)
+    globals()[name] = adapter
+    return adapter
+
 
 __all__ = [
     "BaseLLMAdapter",
@@ -8,6 +8,7 @@ from klyntos_guard import GuardrailsEngine
 from klyntos_guard.core.config import GuardrailsConfig, settings
 from klyntos_guard.core.types import ProcessingContext
 from klyntos_guard.api.schemas.guardrails import (
+    ConversationRequest,
     GuardrailsRequest,
     GuardrailsResponse,
     ViolationDetail,
@@ -109,6 +110,74 @@ async def process_guardrails(
         )
 
 
+@router.post("/check/conversation", response_model=GuardrailsResponse)
+async def check_conversation(
+    request: ConversationRequest,
+    engine: GuardrailsEngine = Depends(get_guardrails_engine),
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Check a full conversation through guardrails.
+
+    Clients may resend the whole conversation every turn: with a session_id
+    in the context, only messages not checked before in the session are run
+    through the rails.
+
+    Args:
+        request: Conversation to check
+        engine: Guardrails engine instance
+        current_user: Authenticated user
+
+    Returns:
+        GuardrailsResponse; redacted messages are in
+        metadata["processed_messages"]
+
+    Raises:
+        HTTPException: If processing fails
+    """
+    try:
+        context = ProcessingContext(
+            user_id=current_user.get("user_id"),
+            tenant_id=current_user.get("tenant_id"),
+            session_id=request.context.get("session_id") if request.context else None,
+            metadata=request.context or {},
+        )
+
+        result = await engine.check_conversation(request.messages, context)
+
+        return GuardrailsResponse(
+            status=result.status.value,
+            allowed=result.allowed,
+            original_input=result.original_input,
+            violations=[
+                ViolationDetail(
+                    rail_name=v.rail_name,
+                    rail_type=v.rail_type.value,
+                    severity=v.severity,
+                    message=v.message,
+                    details=v.details,
+                    suggestion=v.suggestion,
+                )
+                for v in result.violations
+            ],
+            warnings=result.warnings,
+            metadata=result.metadata,
+            processing_time_ms=result.processing_time_ms,
+            timestamp=result.timestamp,
+        )
+
+    except Exception as e:
+        logger.error(
+            "conversation_check_error",
+            error=str(e),
+            exc_info=True,
+        )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Processing failed: {str(e)}",
+        )
+
+
 @router.post("/process/stream")
 async def process_guardrails_stream(
     request: GuardrailsRequest,
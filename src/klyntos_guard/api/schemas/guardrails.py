@@ -35,6 +35,32 @@ class GuardrailsRequest(BaseModel):
         }
 
 
+class ConversationRequest(BaseModel):
+    """Request to check a full conversation through guardrails."""
+
+    messages: List[Dict[str, str]] = Field(
+        ..., description="Conversation as role/content messages, oldest first"
+    )
+    context: Optional[Dict[str, Any]] = Field(
+        default=None,
+        description="Processing context; session_id enables incremental checks"
+    )
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "messages": [
+                    {"role": "user", "content": "Hi, I need help with my order"},
+                    {"role": "assistant", "content": "Sure, what's the order number?"},
+                    {"role": "user", "content": "It's 12345"}
+                ],
+                "context": {
+                    "session_id": "session456"
+                }
+            }
+        }
+
+
 class ViolationDetail(BaseModel):
     """Details about a guardrail violation."""
 
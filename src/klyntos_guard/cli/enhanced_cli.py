@@ -746,6 +746,119 @@ def subscription_upgrade():
         console.print("[green]✓[/green] Opened pricing page in browser")
 
 
+# ============================================================================
+# BLOCKLIST COMMANDS
+# ============================================================================
+
+@cli.group()
+def blocklist():
+    """Manage the known-malicious prompt blocklist"""
+    pass
+
+
+@blocklist.command(name="build")
+@click.argument("corpus", type=click.Path(exists=True, dir_okay=False))
+@click.option("--output", "-o", required=True, type=click.Path(dir_okay=False), help="Blocklist file to write")
+@click.option("--field", default="prompt", help="JSON field holding the prompt text")
+@click.option("--fp-rate", default=0.001, type=float, help="Target false-positive rate of the filter")
+@click.option("--update", is_flag=True, help="Merge with the existing blocklist at --output")
+def blocklist_build(corpus, output, field, fp_rate, update):
+    """Build (or update) a blocklist from a JSONL corpus of prompts"""
+    from array import array
+
+    from klyntos_guard.core.blocklist import BloomBlocklist, fingerprint
+
+    # Packed 64-bit fingerprints; duplicates are dropped by build()
+    keys = array("Q")
+    if update and Path(output).exists():
+        existing = BloomBlocklist.load(output)
+        keys.extend(existing.keys())
+        existing.close()
+        console.print(f"Loaded [cyan]{len(keys):,}[/cyan] existing fingerprints")
+
+    skipped = 0
+    with open(corpus, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                prompt = json.loads(line)[field]
+            except (ValueError, KeyError, TypeError):
+                skipped += 1
+                continue
+            keys.append(fingerprint(prompt))
+
+    built = BloomBlocklist.build(keys, false_positive_rate=fp_rate)
+    built.save(output)
+
+    console.print(f"[green]✓[/green] Wrote {output}")
+    console.print(f"Entries: [cyan]{len(built):,}[/cyan]")
+    console.print(f"Filter: {built.num_bits // 8 / 1024 / 1024:.1f} MB, {built.num_hashes} hashes")
+    if skipped:
+        console.print(f"[yellow]Skipped {skipped} malformed lines[/yellow]")
+
+
+# ============================================================================
+# KNOWLEDGE BASE COMMANDS
+# ============================================================================
+
+@cli.group()
+def kb():
+    """Manage local knowledge bases for fact checking"""
+    pass
+
+
+@kb.command(name="build")
+@click.argument("corpus", type=click.Path(exists=True, dir_okay=False))
+@click.option("--output", "-o", required=True, type=click.Path(file_okay=False), help="Knowledge base directory")
+@click.option("--field", default="text", help="JSON field holding the passage text")
+@click.option("--batch-size", default=100_000, type=int, help="Passages per index segment")
+@click.option("--compact", is_flag=True, help="Merge all segments into one afterwards")
+def kb_build(corpus, output, field, batch_size, compact):
+    """Add passages from a JSONL corpus to a knowledge base
+
+    Each record is stored as-is and returned as evidence; include a
+    "source" field so fact checks can cite it. Running the command again
+    appends new segments without re-indexing existing passages.
+    """
+    from klyntos_guard.core.knowledge_base import KnowledgeBase
+
+    knowledge_base = KnowledgeBase(output)
+    before = len(knowledge_base)
+
+    skipped = 0
+    batch = []
+    with open(corpus, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+                if not isinstance(record[field], str):
+                    raise TypeError(field)
+            except (ValueError, KeyError, TypeError):
+                skipped += 1
+                continue
+            batch.append(record)
+            if len(batch) >= batch_size:
+                knowledge_base.add(batch, text_field=field)
+                batch = []
+    if batch:
+        knowledge_base.add(batch, text_field=field)
+
+    if compact:
+        knowledge_base.compact()
+
+    stats = knowledge_base.get_stats()
+    console.print(f"[green]✓[/green] Updated {output}")
+    console.print(f"Added: [cyan]{len(knowledge_base) - before:,}[/cyan] passages")
+    console.print(f"Total: [cyan]{stats['passages']:,}[/cyan] passages in {stats['segments']} segments")
+    if skipped:
+        console.print(f"[yellow]Skipped {skipped} malformed lines[/yellow]")
+
+
 # ============================================================================
 # CONFIGURATION COMMANDS
 # ============================================================================
@@ -0,0 +1,239 @@
+"""Bloom-filter blocklist of known-bad prompt fingerprints."""
+
+import hashlib
+import math
+import mmap
+import struct
+import time
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+from klyntos_guard.core.text import TextView
+
+MAGIC = b"KGBLOOM\x00"
+FORMAT_VERSION = 1
+
+# Bump when the normalization feeding fingerprints changes; filters built
+# with a different normalization would silently stop matching.
+NORMALIZATION_VERSION = 1
+
+# magic, format version, normalization version, hash count, bit count,
+# entry count, created_at (unix seconds)
+_HEADER = struct.Struct("<8sHHIQQQ")
+
+
+def fingerprint(text: Union[str, TextView]) -> int:
+    """
+    Fingerprint a prompt after normalization.
+
+    Args:
+        text: Prompt text, or its shared TextView
+
+    Returns:
+        64-bit fingerprint
+    """
+    view = text if isinstance(text, TextView) else TextView(text)
+    digest = hashlib.blake2b(view.leet.strip().encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def _probes(key: int, num_bits: int):
+    """Start and step for double hashing, both reduced modulo the filter size."""
+    return key % num_bits, ((key >> 32) ^ (key & 0xFFFFFFFF)) % num_bits | 1
+
+
+def _sorted_keys(fingerprints: Iterable[int]) -> array:
+    """Distinct fingerprints, sorted, as a packed array."""
+    keys = fingerprints if isinstance(fingerprints, array) else array("Q", fingerprints)
+    if NUMPY_AVAILABLE:
+        unique = np.unique(np.frombuffer(keys, dtype=np.uint64))
+        keys = array("Q")
+        keys.frombytes(unique.tobytes())
+        return keys
+    return array("Q", sorted(set(keys)))
+
+
+def _packed(keys):
+    """Exact-match keys as native 64-bit integers, as ``load`` maps them."""
+    if isinstance(keys, (array, memoryview)):
+        return keys
+    return array("Q", keys)
+
+
+class BloomBlocklist:
+    """
+    Bloom filter with an exact-match fallback for confirmed fingerprints.
+
+    The file holds a header, the filter bit array and the sorted 64-bit
+    exact-match keys. It is memory-mapped, so only touched pages are
+    resident: the bit array (~1.8 bytes per entry at the default 0.1%
+    false-positive rate) is probed on every lookup, and the exact keys are
+    read only to confirm filter positives.
+    """
+
+    def __init__(
+        self,
+        bits: Union[bytearray, memoryview],
+        num_bits: int,
+        num_hashes: int,
+        keys,
+        created_at: int = 0,
+    ):
+        """
+        Initialize the blocklist.
+
+        Args:
+            bits: Filter bit array
+            num_bits: Number of bits in the filter
+            num_hashes: Number of hash functions
+            keys: Sorted sequence of exact-match keys
+            created_at: Build time (unix seconds)
+        """
+        self._bits = bits
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self._keys = keys
+        self.created_at = created_at
+        self._mmap: Optional[mmap.mmap] = None
+        self._buffer: Optional[memoryview] = None
+
+    @classmethod
+    def build(
+        cls,
+        fingerprints: Iterable[int],
+        false_positive_rate: float = 0.001,
+    ) -> "BloomBlocklist":
+        """
+        Build a blocklist in memory.
+
+        Fingerprints are collected as packed 64-bit integers (8 bytes each)
+        and sorted in place, so building from tens of millions of prompts
+        never holds them as Python ints.
+
+        Args:
+            fingerprints: Fingerprints from ``fingerprint``
+            false_positive_rate: Target filter false-positive rate
+
+        Returns:
+            The built blocklist
+        """
+        keys = _sorted_keys(fingerprints)
+        count = max(len(keys), 1)
+
+        num_bits = max(int(-count * math.log(false_positive_rate) / math.log(2) ** 2), 64)
+        num_bits = (num_bits + 63) // 64 * 64
+        num_hashes = max(int(round(num_bits / count * math.log(2))), 1)
+
+        bits = bytearray(num_bits // 8)
+        for key in keys:
+            position, step = _probes(key, num_bits)
+            for _ in range(num_hashes):
+                bits[position >> 3] |= 1 << (position & 7)
+                position = (position + step) % num_bits
+
+        return cls(bits, num_bits, num_hashes, keys, int(time.time()))
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "BloomBlocklist":
+        """
+        Memory-map a blocklist file.
+
+        Args:
+            path: Path written by ``save``
+
+        Returns:
+            The loaded blocklist
+
+        Raises:
+            ValueError: If the file is not a compatible blocklist
+        """
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, normalization, num_hashes, num_bits, count, created_at = (
+            _HEADER.unpack_from(mapped, 0)
+        )
+        if magic != MAGIC or version != FORMAT_VERSION:
+            mapped.close()
+            raise ValueError(f"Not a blocklist file (or unsupported version): {path}")
+        if normalization != NORMALIZATION_VERSION:
+            mapped.close()
+            raise ValueError(
+                f"Blocklist built with normalization v{normalization}, "
+                f"expected v{NORMALIZATION_VERSION}; rebuild it"
+            )
+
+        view = memoryview(mapped)
+        bits_start = _HEADER.size
+        keys_start = bits_start + num_bits // 8
+        bits = view[bits_start:keys_start]
+        keys = view[keys_start:keys_start + count * 8].cast("Q")
+
+        blocklist = cls(bits, num_bits, num_hashes, keys, created_at)
+        blocklist._mmap = mapped
+        blocklist._buffer = view
+        return blocklist
+
+    def save(self, path: Union[str, Path]) -> None:
+        """
+        Write the blocklist to disk.
+
+        Args:
+            path: Destination file
+        """
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(
+                MAGIC,
+                FORMAT_VERSION,
+                NORMALIZATION_VERSION,
+                self.num_hashes,
+                self.num_bits,
+                len(self._keys),
+                self.created_at,
+            ))
+            f.write(self._bits)
+            f.write(_packed(self._keys))
+
+    def keys(self) -> Iterable[int]:
+        """Iterate over the exact-match keys."""
+        return iter(self._keys)
+
+    def might_contain(self, key: int) -> bool:
+        """Probe the Bloom filter only (may return false positives)."""
+        bits = self._bits
+        num_bits = self.num_bits
+        position, step = _probes(key, num_bits)
+        for _ in range(self.num_hashes):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+            position = (position + step) % num_bits
+        return True
+
+    def __contains__(self, key: int) -> bool:
+        """Check a fingerprint, confirming filter positives exactly."""
+        if not self.might_contain(key):
+            return False
+        keys = self._keys
+        index = bisect_left(keys, key)
+        return index < len(keys) and keys[index] == key
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def close(self) -> None:
+        """Release the memory map, if any."""
+        if self._mmap is not None:
+            self._bits.release()
+            self._keys.release()
+            self._buffer.release()
+            self._mmap.close()
+            self._mmap = None
+            self._buffer = None
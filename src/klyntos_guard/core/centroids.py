@@ -0,0 +1,155 @@
+"""Nearest-centroid text classification over sentence embeddings."""
+
+import asyncio
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Sequence, Union
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+import structlog
+
+from klyntos_guard.core.embeddings import TextEmbedder
+
+logger = structlog.get_logger(__name__)
+
+
+class CentroidClassifier:
+    """
+    Score texts against one centroid vector per label.
+
+    Each label's example phrases are embedded and averaged into a unit
+    centroid. A batch of texts is embedded once (through the embedder's
+    per-text cache) and scored against all labels with a single matrix
+    product; a label is reported when its cosine similarity reaches the
+    label's threshold.
+
+    Centroids are computed on first use and, with a ``cache_path``, stored
+    on disk together with a fingerprint of the examples and encoder, so
+    later processes load them instead of re-embedding the examples.
+    """
+
+    def __init__(
+        self,
+        embedder: TextEmbedder,
+        examples: Mapping[str, Sequence[str]],
+        thresholds: Optional[Mapping[str, float]] = None,
+        default_threshold: float = 0.5,
+        cache_path: Optional[Union[str, Path]] = None,
+    ):
+        """
+        Initialize the classifier.
+
+        Args:
+            embedder: Embedder for examples and inputs
+            examples: Example phrases per label
+            thresholds: Similarity threshold per label
+            default_threshold: Threshold for labels without one
+            cache_path: ``.npz`` file caching the centroid matrix
+        """
+        if not NUMPY_AVAILABLE:
+            raise ImportError(
+                "NumPy is required for embeddings. Install it with: pip install numpy"
+            )
+
+        self.embedder = embedder
+        self.labels = [label for label, phrases in examples.items() if phrases]
+        self.examples = {label: list(examples[label]) for label in self.labels}
+
+        thresholds = thresholds or {}
+        self.thresholds = np.array(
+            [thresholds.get(label, default_threshold) for label in self.labels],
+            dtype=np.float32,
+        )
+
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.fingerprint = self._fingerprint()
+        self._centroids: Optional["np.ndarray"] = None
+        self._lock = asyncio.Lock()
+
+        if self.cache_path is not None:
+            self._load_cached()
+
+    async def classify(self, texts: List[str]) -> List[Dict[str, float]]:
+        """
+        Classify a batch of texts.
+
+        Args:
+            texts: Texts to classify
+
+        Returns:
+            Per text, the similarity of each label that reached its
+            threshold, best first
+        """
+        if not texts or not self.labels:
+            return [{} for _ in texts]
+
+        centroids = await self.centroids()
+        similarities = (await self.embedder.embed(texts)) @ centroids.T
+        passed = similarities >= self.thresholds
+
+        results = []
+        for row, mask in zip(similarities, passed):
+            indices = np.flatnonzero(mask)
+            indices = indices[np.argsort(-row[indices], kind="stable")]
+            results.append({self.labels[i]: float(row[i]) for i in indices})
+        return results
+
+    async def centroids(self) -> "np.ndarray":
+        """The (labels, dim) centroid matrix, computed on first use."""
+        if self._centroids is None:
+            async with self._lock:
+                if self._centroids is None:
+                    self._centroids = await self._compute()
+        return self._centroids
+
+    async def _compute(self) -> "np.ndarray":
+        """Embed all examples in one batch and average them per label."""
+        phrases = [phrase for label in self.labels for phrase in self.examples[label]]
+        vectors = await self.embedder.embed(phrases)
+
+        counts = np.array([len(self.examples[label]) for label in self.labels])
+        offsets = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        sums = np.add.reduceat(vectors, offsets, axis=0)
+        centroids = (sums / np.maximum(
+            np.linalg.norm(sums, axis=1, keepdims=True), 1e-12
+        )).astype(np.float32)
+
+        if self.cache_path is not None:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            np.savez(
+                self.cache_path,
+                centroids=centroids,
+                fingerprint=np.array(self.fingerprint),
+            )
+
+        logger.info(
+            "centroids_computed",
+            labels=len(self.labels),
+            examples=len(phrases),
+            cache_path=str(self.cache_path) if self.cache_path else None,
+        )
+        return centroids
+
+    def _load_cached(self) -> None:
+        """Use the on-disk centroids if they match the current examples."""
+        if not self.cache_path.exists():
+            return
+        cached = np.load(self.cache_path)
+        if str(cached["fingerprint"]) != self.fingerprint:
+            logger.info("centroid_cache_stale", cache_path=str(self.cache_path))
+            return
+        self._centroids = cached["centroids"]
+
+    def _fingerprint(self) -> str:
+        """Hash of everything the centroids depend on."""
+        payload = json.dumps(
+            [self.embedder.backend, self.embedder.model_name, self.labels, self.examples],
+            sort_keys=True,
+        )
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
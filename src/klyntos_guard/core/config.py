@@ -208,6 +208,10 @@ class GuardrailsConfig:
         """Get LLM configuration."""
         return self.config_data.get("llm", {})
 
+    def get_settings(self) -> Dict[str, Any]:
+        """Get global engine settings."""
+        return self.config_data.get("settings", {})
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert configuration to dictionary."""
         return self.config_data
@@ -0,0 +1,240 @@
+"""Bounded decoding of encoded payloads hidden in request text."""
+
+import binascii
+import codecs
+import re
+import time
+from typing import Any, Dict, List, Optional
+from urllib.parse import unquote
+
+# Cheap span detectors; each candidate is validated before it is decoded
+BASE64_SPAN = re.compile(r"[A-Za-z0-9+/_-]{16,}={0,2}")
+HEX_SPAN = re.compile(r"(?:\\x[0-9A-Fa-f]{2}){8,}|\b(?:[0-9A-Fa-f]{2}){8,}\b")
+TOKEN_SPAN = re.compile(r"\S+")
+URL_ESCAPE = re.compile(r"%[0-9A-Fa-f]{2}")
+ROT13_SPAN = re.compile(r"[A-Za-z][A-Za-z ,.'!?-]{15,}")
+_HEX_DIGITS = set("0123456789abcdefABCDEF")
+
+# Letters that dominate English text; rot13 moves most of them out of the set
+_COMMON_LETTERS = set("etaoinshrdlu")
+
+
+class PayloadDecoder:
+    """
+    Find and decode base64, hex, URL-encoded and rot13 spans.
+
+    All work is bounded: every call has a wall-clock budget, a cap on the
+    number of decoded bytes and spans, and a maximum nesting depth for
+    payloads that decode to further encoded payloads. When a limit is hit
+    decoding stops and the result is marked as exhausted.
+    """
+
+    ENCODINGS = ("base64", "hex", "url", "rot13")
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024,
+        max_depth: int = 2,
+        max_spans: int = 32,
+        budget_ms: float = 5.0,
+        min_printable_ratio: float = 0.9,
+        encodings: Optional[List[str]] = None,
+    ):
+        """
+        Initialize the decoder.
+
+        Args:
+            max_bytes: Maximum number of decoded bytes per call
+            max_depth: Maximum nesting depth of encoded payloads
+            max_spans: Maximum number of spans decoded per call
+            budget_ms: Wall-clock budget per call in milliseconds
+            min_printable_ratio: Fraction of printable characters a decoded
+                payload needs to count as text
+            encodings: Encodings to look for (default: all)
+        """
+        self.max_bytes = max_bytes
+        self.max_depth = max_depth
+        self.max_spans = max_spans
+        self.budget_ms = budget_ms
+        self.min_printable_ratio = min_printable_ratio
+        self.encodings = list(encodings or self.ENCODINGS)
+
+    def decode(self, text: str) -> Dict[str, Any]:
+        """
+        Decode all encoded spans found in the text.
+
+        Args:
+            text: Text to search for encoded payloads
+
+        Returns:
+            Dictionary with:
+                - payloads (list): Decoded payloads with encoding, start/end
+                  of the outermost encoded span, decoded text and depth
+                - bytes_decoded (int): Total decoded bytes
+                - decode_time_ms (float): Time spent decoding
+                - budget_exhausted (bool): Whether a limit stopped decoding
+        """
+        state = {
+            "deadline": time.perf_counter() + self.budget_ms / 1000,
+            "bytes": 0,
+            "spans": 0,
+            "exhausted": False,
+        }
+        start_time = time.perf_counter()
+        payloads: List[Dict[str, Any]] = []
+        self._decode_level(text, 1, None, state, payloads)
+
+        return {
+            "payloads": payloads,
+            "bytes_decoded": state["bytes"],
+            "decode_time_ms": (time.perf_counter() - start_time) * 1000,
+            "budget_exhausted": state["exhausted"],
+        }
+
+    def _decode_level(
+        self,
+        text: str,
+        depth: int,
+        outer_span: Optional[tuple],
+        state: Dict[str, Any],
+        payloads: List[Dict[str, Any]],
+    ) -> None:
+        """Decode the spans of one nesting level and recurse into the results."""
+        for encoding, start, end in self._find_spans(text, state):
+            if self._over_budget(state):
+                return
+
+            # Decoded size is known up front; a span that would overflow
+            # the byte budget ends decoding
+            span_text = text[start:end]
+            if self._decoded_size(encoding, span_text) > self.max_bytes - state["bytes"]:
+                state["exhausted"] = True
+                return
+
+            decoded = self._decode_span(encoding, span_text)
+            if decoded is None:
+                continue
+
+            state["spans"] += 1
+            state["bytes"] += len(decoded)
+            span = outer_span or (start, end)
+            payloads.append({
+                "encoding": encoding,
+                "start": span[0],
+                "end": span[1],
+                "text": decoded,
+                "depth": depth,
+            })
+
+            if depth < self.max_depth:
+                self._decode_level(decoded, depth + 1, span, state, payloads)
+
+    def _over_budget(self, state: Dict[str, Any]) -> bool:
+        """Check (and record) whether any limit has been reached."""
+        if (
+            state["bytes"] >= self.max_bytes
+            or state["spans"] >= self.max_spans
+            or time.perf_counter() >= state["deadline"]
+        ):
+            state["exhausted"] = True
+        return state["exhausted"]
+
+    def _find_spans(self, text: str, state: Dict[str, Any]):
+        """Yield (encoding, start, end) candidates using cheap heuristics."""
+        if "hex" in self.encodings:
+            for match in HEX_SPAN.finditer(text):
+                yield "hex", match.start(), match.end()
+
+        if self._over_budget(state):
+            return
+
+        if "base64" in self.encodings:
+            for match in BASE64_SPAN.finditer(text):
+                if self._looks_base64(match.group()):
+                    yield "base64", match.start(), match.end()
+
+        if self._over_budget(state):
+            return
+
+        if "url" in self.encodings and "%" in text:
+            for match in TOKEN_SPAN.finditer(text):
+                if len(URL_ESCAPE.findall(match.group())) >= 3:
+                    yield "url", match.start(), match.end()
+
+        if self._over_budget(state):
+            return
+
+        if "rot13" in self.encodings:
+            for match in ROT13_SPAN.finditer(text):
+                candidate = match.group()
+                if candidate.count(" ") >= 2 and self._looks_rot13(candidate):
+                    yield "rot13", match.start(), match.end()
+
+    @staticmethod
+    def _decoded_size(encoding: str, span: str) -> int:
+        """Upper bound on the decoded size of a span in bytes."""
+        if encoding == "base64":
+            return len(span.rstrip("=")) * 3 // 4
+        if encoding == "hex":
+            return len(span.replace("\\x", "")) // 2
+        return len(span)
+
+    def _decode_span(self, encoding: str, span: str) -> Optional[str]:
+        """Decode a single span, returning None if it is not a text payload."""
+        if encoding == "base64":
+            raw = span.rstrip("=").replace("-", "+").replace("_", "/")
+            raw += "=" * (-len(raw) % 4)
+            try:
+                data = binascii.a2b_base64(raw.encode("ascii"))
+            except (binascii.Error, ValueError):
+                return None
+        elif encoding == "hex":
+            digits = span.replace("\\x", "")
+            try:
+                data = bytes.fromhex(digits)
+            except ValueError:
+                return None
+        elif encoding == "url":
+            try:
+                decoded = unquote(span, errors="strict")
+            except UnicodeDecodeError:
+                return None
+            return decoded if decoded != span else None
+        elif encoding == "rot13":
+            return codecs.decode(span, "rot13")
+        else:
+            return None
+
+        try:
+            decoded = data.decode("utf-8")
+        except UnicodeDecodeError:
+            return None
+        if not self._is_printable(decoded):
+            return None
+        return decoded
+
+    def _is_printable(self, text: str) -> bool:
+        """Check that decoded bytes look like text rather than binary data."""
+        if not text:
+            return False
+        printable = sum(1 for c in text if c.isprintable() or c in "\n\r\t")
+        return printable / len(text) >= self.min_printable_ratio
+
+    @staticmethod
+    def _looks_base64(text: str) -> bool:
+        """Rule out words and hex strings, which also fit the base64 alphabet."""
+        if set(text) <= _HEX_DIGITS:
+            return False
+        if text.isalpha() and (text[1:].islower() or text.isupper()):
+            return False
+        return True
+
+    @staticmethod
+    def _looks_rot13(text: str) -> bool:
+        """Check whether rot13 makes the letter distribution more English-like."""
+        letters = [c for c in text.lower() if c.isalpha()]
+        if not letters:
+            return False
+        before = sum(1 for c in letters if c in _COMMON_LETTERS)
+        after = sum(1 for c in codecs.decode("".join(letters), "rot13") if c in _COMMON_LETTERS)
+        return after > before * 1.3 and after / len(letters) > 0.6
@@ -0,0 +1,114 @@
+"""Domain allow/block lists compiled into a reversed-label trie."""
+
+from typing import Any, Dict, Iterable, Optional
+from urllib.parse import urlsplit
+
+# Node keys that cannot collide with a DNS label
+_EXACT = ""
+_WILDCARD = "*"
+
+
+def url_host(url: str) -> Optional[str]:
+    """
+    Host name of a URL, lowercased and without a trailing dot.
+
+    Scheme-less sources ("docs.example.com/page") are accepted.
+
+    Args:
+        url: URL or bare host
+
+    Returns:
+        The host, or None if there is none
+    """
+    url = url.strip()
+    if "//" not in url:
+        url = "//" + url
+    try:
+        host = urlsplit(url).hostname
+    except ValueError:
+        return None
+    if not host or any(char.isspace() for char in host):
+        return None
+    return host.rstrip(".")
+
+
+class DomainTrie:
+    """
+    Map domain patterns to values, looked up in O(labels of the host).
+
+    Patterns are stored label by label from the top-level domain down, so
+    the lookup cost does not depend on how many patterns there are.
+
+    Patterns:
+        - ``example.com``: exactly that host
+        - ``*.example.com``: any subdomain of example.com, at any depth
+          (not example.com itself)
+
+    When several patterns match, the most specific one wins; an exact
+    pattern is more specific than a wildcard for the same domain.
+    """
+
+    def __init__(self):
+        """Initialize an empty trie."""
+        self._root: Dict[str, Any] = {}
+        self.size = 0
+
+    def add(self, pattern: str, value: Any) -> None:
+        """
+        Add a domain pattern.
+
+        Args:
+            pattern: Domain or ``*.``-prefixed wildcard domain
+            value: Value returned for hosts matching the pattern
+        """
+        pattern = pattern.strip().lower().rstrip(".")
+        wildcard = pattern.startswith("*.")
+        if wildcard:
+            pattern = pattern[2:]
+        if not pattern:
+            raise ValueError("Empty domain pattern")
+
+        labels = pattern.split(".")
+        if not all(labels) or _WILDCARD in labels:
+            raise ValueError(f"Invalid domain pattern: {pattern}")
+
+        node = self._root
+        for label in reversed(labels):
+            node = node.setdefault(label, {})
+        marker = _WILDCARD if wildcard else _EXACT
+        if marker not in node:
+            self.size += 1
+        node[marker] = value
+
+    def update(self, patterns: Iterable[str], value: Any) -> None:
+        """Add several patterns with the same value."""
+        for pattern in patterns:
+            self.add(pattern, value)
+
+    def lookup(self, host: str) -> Optional[Any]:
+        """
+        Value of the most specific pattern matching a host.
+
+        Args:
+            host: Lowercase host name (see url_host)
+
+        Returns:
+            The value, or None if no pattern matches
+        """
+        labels = host.split(".")
+        node = self._root
+        match = None
+        for depth in range(len(labels) - 1, -1, -1):
+            label = labels[depth]
+            if label in (_EXACT, _WILDCARD):
+                return match
+            node = node.get(label)
+            if node is None:
+                return match
+            if depth and _WILDCARD in node:
+                # More labels remain, so this is a strict subdomain
+                match = node[_WILDCARD]
+        return node.get(_EXACT, match)
+
+    def __len__(self) -> int:
+        return self.size
@@ -0,0 +1,183 @@
+"""Deferred text edits shared by transforming rails."""
+
+from typing import Iterable, List, Tuple
+
+# (start, end, replacement) against the base text of a stage
+Edit = Tuple[int, int, str]
+
+
+class EditConflictError(ValueError):
+    """Edits of different rails overlap, so no order of them is safe."""
+
+
+def _overlaps(a: Edit, b: Edit) -> bool:
+    """Whether two edits touch the same text (or insert at the same point)."""
+    return (a[0] < b[1] and b[0] < a[1]) or (a[0] == b[0] and a[1] == b[1])
+
+
+class EditPlan:
+    """
+    Span replacements against one base text, applied in a single pass.
+
+    Transforming rails report edits instead of building a new string, so a
+    stage with several redacting rails copies the text once, and every
+    rail's offsets refer to the same (original) text.
+
+    Each ``extend`` call is one group (one rail's result). Overlapping edits
+    within a group are merged into one edit covering their union, with the
+    replacement of the edit added first (the rail's top-ranked one), so no
+    part of a redacted span survives. Edits of different groups must not
+    overlap, since either choice would undo the other rail's
+    transformation; ``resolved`` raises EditConflictError instead of
+    dropping one. Callers check ``conflicts`` before merging a rail's edits.
+    """
+
+    def __init__(self, edits: Iterable[Edit] = ()):
+        """
+        Initialize the plan.
+
+        Args:
+            edits: Initial edits, as one group
+        """
+        self._edits: List[Edit] = []
+        self._groups: List[int] = []
+        self._group_count = 0
+        # Edit spans sorted by start, for ``conflicts``; rebuilt lazily
+        self._spans: List[Tuple[int, int]] = []
+        self._spans_version = 0
+        self.version = 0
+        self.extend(edits)
+
+    def add(self, start: int, end: int, replacement: str) -> None:
+        """Replace base[start:end] with replacement, as a group of its own."""
+        self.extend([(start, end, replacement)])
+
+    def extend(self, edits: Iterable[Edit]) -> None:
+        """Add one rail's edits, in priority order, as one group."""
+        group = self._group_count
+        for start, end, replacement in edits:
+            if start > end:
+                raise ValueError(f"Invalid edit span: {start}-{end}")
+            self._edits.append((start, end, replacement))
+            self._groups.append(group)
+            self.version += 1
+        self._group_count += 1
+
+    def conflicts(self, edits: Iterable[Edit]) -> bool:
+        """
+        Whether edits would overlap edits already in the plan.
+
+        Both edit lists are swept once in start order, so the check is
+        O((n + m) log(n + m)) rather than comparing every pair.
+
+        Args:
+            edits: Edits of another rail, against the same base text
+
+        Returns:
+            True if merging them with ``extend`` would make the plan
+            unresolvable
+        """
+        incoming = sorted((start, end) for start, end, _ in edits)
+        if not incoming or not self._edits:
+            return False
+        if self._spans_version != self.version:
+            self._spans = sorted((start, end) for start, end, _ in self._edits)
+            self._spans_version = self.version
+        existing = self._spans
+
+        # Furthest end of each list among the spans starting before the
+        # current position
+        reach = [0, 0]
+        lists = (existing, incoming)
+        positions = [0, 0]
+        while positions[0] < len(existing) and positions[1] < len(incoming):
+            start = min(existing[positions[0]][0], incoming[positions[1]][0])
+            # Spans of each list starting exactly here
+            here = []
+            for side in (0, 1):
+                spans = lists[side]
+                first = positions[side]
+                while positions[side] < len(spans) and spans[positions[side]][0] == start:
+                    positions[side] += 1
+                here.append(spans[first:positions[side]])
+            for side in (0, 1):
+                if here[side] and start < reach[1 - side]:
+                    return True
+            if here[0] and here[1]:
+                ends = {end for _, end in here[0]}
+                if any(end in ends for _, end in here[1]):
+                    return True
+                if any(end > start for _, end in here[0]) and any(
+                    end > start for _, end in here[1]
+                ):
+                    return True
+            for side in (0, 1):
+                for _, end in here[side]:
+                    reach[side] = max(reach[side], end)
+
+        # Whatever remains of one list starts after every span of the other
+        for side in (0, 1):
+            if positions[side] < len(lists[side]):
+                return lists[side][positions[side]][0] < reach[1 - side]
+        return False
+
+    def resolved(self) -> List[Edit]:
+        """
+        Non-overlapping edits sorted by start.
+
+        Edits are swept by start; an edit overlapping the last kept one of
+        its group is merged into it, keeping the replacement of whichever
+        was added earlier.
+
+        Raises:
+            EditConflictError: If edits of different groups overlap
+        """
+        ordered = sorted(
+            range(len(self._edits)),
+            key=lambda i: (self._edits[i][0], self._edits[i][1], i),
+        )
+        # [start, end, index of the edit whose replacement is used]
+        kept: List[List[int]] = []
+        for index in ordered:
+            start, end, _ = self._edits[index]
+            if kept:
+                last = kept[-1]
+                if _overlaps((start, end, ""), (last[0], last[1], "")):
+                    if self._groups[index] != self._groups[last[2]]:
+                        raise EditConflictError(
+                            f"Edits {tuple(last[:2])} and {(start, end)} "
+                            f"of different rails overlap"
+                        )
+                    last[1] = max(last[1], end)
+                    last[2] = min(last[2], index)
+                    continue
+            kept.append([start, end, index])
+        return [(start, end, self._edits[index][2]) for start, end, index in kept]
+
+    def apply(self, text: str) -> str:
+        """
+        Apply the plan to its base text.
+
+        Args:
+            text: The base text the edits refer to
+
+        Returns:
+            The edited text
+        """
+        if not self._edits:
+            return text
+
+        pieces = []
+        position = 0
+        for start, end, replacement in self.resolved():
+            pieces.append(text[position:start])
+            pieces.append(replacement)
+            position = end
+        pieces.append(text[position:])
+        return "".join(pieces)
+
+    def __len__(self) -> int:
+        return len(self._edits)
+
+    def __bool__(self) -> bool:
+        return bool(self._edits)
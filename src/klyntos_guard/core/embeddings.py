@@ -0,0 +1,163 @@
+"""Text embedding with a per-process cache keyed by text hash."""
+
+import asyncio
+import hashlib
+from collections import OrderedDict
+from typing import Any, List, Optional
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+
+def text_key(text: str) -> bytes:
+    """Stable 128-bit hash of a text, used as a cache key."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+class EmbeddingCache:
+    """Bounded LRU cache of embedding vectors keyed by text hash."""
+
+    def __init__(self, max_size: int = 10000):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Maximum number of cached vectors
+        """
+        self.max_size = max_size
+        self._entries: "OrderedDict[bytes, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: bytes) -> Optional["np.ndarray"]:
+        """Get a cached vector, or None."""
+        vector = self._entries.get(key)
+        if vector is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return vector
+
+    def put(self, key: bytes, vector: "np.ndarray") -> None:
+        """Store a vector, evicting the least recently used entry if full."""
+        self._entries[key] = vector
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class TextEmbedder:
+    """
+    Embed texts through an LLM adapter or a local sentence-transformers model.
+
+    Vectors are returned as a float32 matrix with L2-normalized rows, so
+    cosine similarity is a plain dot product. Only texts missing from the
+    cache are sent to the encoder, in a single batch.
+    """
+
+    def __init__(
+        self,
+        backend: str = "local",
+        model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+        adapter: Optional[Any] = None,
+        cache_size: int = 10000,
+        batch_size: int = 64,
+    ):
+        """
+        Initialize the embedder.
+
+        Args:
+            backend: "adapter" (BaseLLMAdapter.embed) or "local"
+            model_name: sentence-transformers model for the local backend
+            adapter: LLM adapter for the adapter backend
+            cache_size: Maximum number of cached embeddings
+            batch_size: Batch size for the local encoder
+        """
+        if not NUMPY_AVAILABLE:
+            raise ImportError(
+                "NumPy is required for embeddings. Install it with: pip install numpy"
+            )
+
+        if backend not in ("adapter", "local"):
+            raise ValueError(f"Unknown embedding backend: {backend}")
+
+        self.backend = backend
+        self.model_name = model_name
+        self.adapter = adapter
+        self.batch_size = batch_size
+        self.cache = EmbeddingCache(cache_size)
+        self._model = None
+
+    async def embed(self, texts: List[str]) -> "np.ndarray":
+        """
+        Embed a batch of texts.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            float32 matrix of shape (len(texts), dim) with unit-length rows
+        """
+        keys = [text_key(text) for text in texts]
+        vectors: List[Optional["np.ndarray"]] = [self.cache.get(key) for key in keys]
+
+        missing = {}
+        for index, vector in enumerate(vectors):
+            if vector is None:
+                missing.setdefault(keys[index], texts[index])
+
+        if missing:
+            encoded = self._normalize(await self._encode(list(missing.values())))
+            fresh = dict(zip(missing.keys(), encoded))
+            for key, vector in fresh.items():
+                self.cache.put(key, vector)
+            vectors = [fresh[key] if v is None else v for key, v in zip(keys, vectors)]
+
+        return np.stack(vectors).astype(np.float32, copy=False)
+
+    async def _encode(self, texts: List[str]) -> "np.ndarray":
+        """Run the configured encoder on texts that were not cached."""
+        if self.backend == "adapter":
+            if self.adapter is None:
+                raise RuntimeError("No LLM adapter bound for adapter embeddings")
+            return np.asarray(await self.adapter.embed(texts), dtype=np.float32)
+
+        model = self._load_model()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None,
+            lambda: model.encode(
+                texts, batch_size=self.batch_size, convert_to_numpy=True
+            ).astype(np.float32),
+        )
+
+    def _load_model(self):
+        """Load the local encoder on first use."""
+        if self._model is None:
+            try:
+                from sentence_transformers import SentenceTransformer
+            except ImportError:
+                raise ImportError(
+                    "sentence-transformers is required for local embeddings. "
+                    "Install it with: pip install sentence-transformers"
+                )
+            self._model = SentenceTransformer(self.model_name)
+            logger.info("embedding_model_loaded", model_name=self.model_name)
+        return self._model
+
+    @staticmethod
+    def _normalize(vectors: "np.ndarray") -> "np.ndarray":
+        """L2-normalize rows."""
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
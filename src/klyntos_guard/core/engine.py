@@ -1,26 +1,48 @@
 """Core guardrails engine for KlyntosGuard."""
 
 import asyncio
+import hashlib
+import json
 import time
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, List, Optional, Set, Tuple, Union
 
 import structlog
 
 from klyntos_guard.core.config import GuardrailsConfig
+from klyntos_guard.core.edits import EditPlan
+from klyntos_guard.core.execution import decision_key
+from klyntos_guard.core.patterns import get_pattern_cache_stats
+from klyntos_guard.core.policy import StagePolicy
+from klyntos_guard.core.sessions import SessionStore, create_session_store, session_key
+from klyntos_guard.core.streaming import GuardedStream, redact_stream
+from klyntos_guard.core.verdicts import VerdictCache, content_key
 from klyntos_guard.core.types import (
+    ChunkVerdict,
+    ExecutionResult,
     GuardrailResult,
     ProcessingContext,
     RailStatus,
     RailType,
     RailViolation,
+    RetrievalResult,
 )
 from klyntos_guard.adapters.base import BaseLLMAdapter
 from klyntos_guard.rails.base import BaseRail
-from klyntos_guard.rails.registry import RailRegistry
+from klyntos_guard.rails.registry import get_registry
+
+if TYPE_CHECKING:
+    from klyntos_guard.core.near_duplicates import NearDuplicateIndex
 
 logger = structlog.get_logger(__name__)
 
 
+def _merge_signals(signals: Dict[str, float], recorded: Dict[str, float]) -> None:
+    """Add recorded signals, keeping the highest value per name."""
+    for name, value in recorded.items():
+        if value > signals.get(name, float("-inf")):
+            signals[name] = value
+
+
 class GuardrailsEngine:
     """
     Main engine for processing inputs through guardrails.
@@ -46,7 +68,7 @@ class GuardrailsEngine:
         """
         self.config = config or GuardrailsConfig(config_path=config_path)
         self.adapters = adapters or []
-        self.registry = RailRegistry()
+        self.registry = get_registry()
         self._rails: Dict[RailType, List[BaseRail]] = {
             RailType.INPUT: [],
             RailType.OUTPUT: [],
@@ -54,8 +76,44 @@ class GuardrailsEngine:
             RailType.RETRIEVAL: [],
             RailType.EXECUTION: [],
         }
+        session_config = self.config.get_settings().get("sessions", {})
+        self.sessions: SessionStore = create_session_store(session_config)
+        # Earlier messages visible to rails in check_conversation
+        self.context_window = session_config.get("context_window", 6)
+        # Message verdicts remembered per session
+        self.max_verdicts = session_config.get("max_verdicts", 128)
         self._initialize_rails()
 
+        # Pattern rules of each stage's rails, fused into one scan per text
+        fused_config = self.config.get_settings().get("fused_matching", {})
+        self.fused_matching = fused_config.get("enabled", True)
+        self._policies: Dict[RailType, Optional[StagePolicy]] = {}
+        self._compile_policies()
+
+        # Verdicts on retrieved chunks by content, reused across requests
+        retrieval_cache = self.config.get_settings().get("retrieval_cache", {})
+        self.chunk_verdicts = VerdictCache(
+            max_entries=retrieval_cache.get("max_entries", 100000),
+            ttl_seconds=retrieval_cache.get("ttl_seconds"),
+        )
+
+        # Execution-rail decisions by canonical request shape
+        execution_cache = self.config.get_settings().get("execution_cache", {})
+        self.execution_decisions: Optional[VerdictCache] = None
+        if execution_cache.get("enabled", True):
+            self.execution_decisions = VerdictCache(
+                max_entries=execution_cache.get("max_entries", 100000),
+                ttl_seconds=execution_cache.get("ttl_seconds"),
+            )
+        self._policy_version = str(execution_cache.get("policy_version", ""))
+        self._execution_policy = ""
+        self._execution_value_fields: Optional[Set[str]] = None
+        self._update_execution_policy()
+
+        self.near_duplicates: Optional["NearDuplicateIndex"] = None
+        self._skip_on_near_duplicate: Set[int] = set()
+        self._initialize_near_duplicates()
+
         logger.info(
             "guardrails_engine_initialized",
             num_adapters=len(self.adapters),
@@ -65,10 +123,14 @@ class GuardrailsEngine:
     def _initialize_rails(self) -> None:
         """Initialize rails from configuration."""
         for rail_config in self.config.rails:
+            if not rail_config.enabled:
+                continue
             try:
                 rail_class = self.registry.get(rail_config.name)
                 if rail_class:
                     rail_instance = rail_class(rail_config.config)
+                    rail_instance.bind_adapters(self.adapters)
+                    rail_instance.bind_session_store(self.sessions)
                     self._rails[rail_config.type].append(rail_instance)
                     logger.debug(
                         "rail_initialized",
@@ -82,6 +144,41 @@ class GuardrailsEngine:
                     error=str(e),
                 )
 
+    def _compile_policies(self) -> None:
+        """Compile the pattern rules of the input, dialog and output rails."""
+        self._policies = {
+            rail_type: (
+                StagePolicy.from_rails(self._rails[rail_type], rail_type)
+                if self.fused_matching else None
+            )
+            for rail_type in (RailType.INPUT, RailType.DIALOG, RailType.OUTPUT)
+        }
+
+    def _initialize_near_duplicates(self) -> None:
+        """Set up the near-duplicate prompt index from settings, if enabled."""
+        nd_config = self.config.get_settings().get("near_duplicates", {})
+        if not nd_config.get("enabled", False):
+            return
+
+        # Needs NumPy, which is only imported when the index is enabled
+        from klyntos_guard.core.near_duplicates import NearDuplicateIndex
+
+        self.near_duplicates = NearDuplicateIndex(
+            threshold=nd_config.get("threshold", 0.8),
+            num_perm=nd_config.get("num_perm", 64),
+            bands=nd_config.get("bands", 16),
+            window_seconds=nd_config.get("window_seconds", 600),
+            max_entries=nd_config.get("max_entries", 50000),
+        )
+
+        # Input rails that may be skipped for near-duplicates of allowed prompts
+        skip_names = set(nd_config.get("skip_rails_on_allowed", []))
+        self._skip_on_near_duplicate = {
+            id(rail)
+            for rail in self._rails[RailType.INPUT]
+            if rail.get_metadata().get("name") in skip_names
+        }
+
     async def process(
         self,
         user_input: str,
@@ -103,6 +200,8 @@ class GuardrailsEngine:
         context = context or ProcessingContext()
         violations: List[RailViolation] = []
         warnings: List[str] = []
+        metadata: Dict[str, Any] = {}
+        context.clear_signals()
 
         logger.info(
             "processing_started",
@@ -112,10 +211,40 @@ class GuardrailsEngine:
         )
 
         try:
+            # Step 0: Consult recently seen near-duplicate prompts
+            signature = None
+            near_duplicate = None
+            skip_rails: Set[int] = set()
+            if self.near_duplicates is not None:
+                signature = self.near_duplicates.signature(
+                    context.text_view(user_input).collapsed
+                )
+                near_duplicate = self.near_duplicates.query(signature)
+
+            if near_duplicate is not None:
+                metadata["near_duplicate"] = {
+                    "similarity": near_duplicate["similarity"],
+                    "cluster_id": near_duplicate["cluster_id"],
+                    "prior_verdict": near_duplicate["verdict"],
+                }
+                if near_duplicate["verdict"] == "blocked":
+                    self.near_duplicates.observe(near_duplicate["cluster_id"], "blocked")
+                    processing_time_ms = (time.time() - start_time) * 1000
+                    return GuardrailResult(
+                        status=RailStatus.BLOCKED,
+                        allowed=False,
+                        original_input=user_input,
+                        violations=list(near_duplicate["payload"]["violations"]),
+                        metadata=metadata,
+                        processing_time_ms=processing_time_ms,
+                    )
+                skip_rails = self._skip_on_near_duplicate
+
             # Step 1: Run input rails
-            input_result = await self._run_input_rails(user_input, context)
+            input_result = await self._run_input_rails(user_input, context, skip_rails)
             if not input_result["allowed"]:
                 violations.extend(input_result["violations"])
+                self._record_near_duplicate(signature, near_duplicate, violations, skip_rails)
                 processing_time_ms = (time.time() - start_time) * 1000
                 return GuardrailResult(
                     status=RailStatus.BLOCKED,
@@ -126,7 +255,11 @@ class GuardrailsEngine:
                 )
 
             warnings.extend(input_result.get("warnings", []))
+            metadata.update(input_result.get("metadata", {}))
             processed_input = input_result.get("processed_input", user_input)
+            # Only the input stage's verdict is shared across sessions;
+            # dialog verdicts depend on the session's own history
+            self._record_near_duplicate(signature, near_duplicate, [], skip_rails)
 
             # Step 2: Run dialog rails (if applicable)
             dialog_result = await self._run_dialog_rails(processed_input, context)
@@ -142,6 +275,7 @@ class GuardrailsEngine:
                 )
 
             warnings.extend(dialog_result.get("warnings", []))
+            metadata.update(dialog_result.get("metadata", {}))
 
             # Step 3: Generate LLM response (if adapters are configured)
             llm_output = None
@@ -153,6 +287,7 @@ class GuardrailsEngine:
                 output_result = await self._run_output_rails(llm_output, context)
                 if not output_result["allowed"]:
                     violations.extend(output_result["violations"])
+                    metadata.update(output_result.get("metadata", {}))
                     processing_time_ms = (time.time() - start_time) * 1000
                     return GuardrailResult(
                         status=RailStatus.BLOCKED,
@@ -161,9 +296,11 @@ class GuardrailsEngine:
                         processed_output=llm_output,
                         violations=violations,
                         processing_time_ms=processing_time_ms,
+                        metadata=metadata,
                     )
 
                 warnings.extend(output_result.get("warnings", []))
+                metadata.update(output_result.get("metadata", {}))
                 final_output = output_result.get("processed_output", llm_output)
             else:
                 final_output = None
@@ -186,6 +323,7 @@ class GuardrailsEngine:
                 processed_output=final_output,
                 violations=violations,
                 warnings=warnings,
+                metadata=metadata,
                 processing_time_ms=processing_time_ms,
             )
 
@@ -207,17 +345,581 @@ class GuardrailsEngine:
                 processing_time_ms=processing_time_ms,
             )
 
+    async def check_inputs(
+        self,
+        user_inputs: List[str],
+        context: Optional[ProcessingContext] = None,
+    ) -> List[GuardrailResult]:
+        """
+        Run the input rails over a batch of texts without calling an LLM.
+
+        Each rail receives all texts that are still allowed in one call, so
+        rails with batched implementations (e.g. PII detection) process the
+        whole batch at once.
+
+        Args:
+            user_inputs: Texts to check
+            context: Processing context shared by the batch
+
+        Returns:
+            One GuardrailResult per text; the (possibly redacted) text is in
+            metadata["processed_input"]
+        """
+        start_time = time.time()
+        context = context or ProcessingContext()
+        outcomes = await self._run_input_rails_batch(list(user_inputs), context)
+
+        processing_time_ms = (time.time() - start_time) * 1000
+        results = []
+        for user_input, outcome in zip(user_inputs, outcomes):
+            if not outcome["allowed"]:
+                status = RailStatus.BLOCKED
+            elif outcome["warnings"]:
+                status = RailStatus.WARNING
+            else:
+                status = RailStatus.PASSED
+            results.append(GuardrailResult(
+                status=status,
+                allowed=outcome["allowed"],
+                original_input=user_input,
+                violations=outcome["violations"],
+                warnings=outcome["warnings"],
+                metadata=(
+                    {**outcome["metadata"], "processed_input": outcome["processed_input"]}
+                    if outcome["allowed"] else {}
+                ),
+                processing_time_ms=processing_time_ms,
+            ))
+        return results
+
+    async def check_conversation(
+        self,
+        messages: List[Dict[str, str]],
+        context: Optional[ProcessingContext] = None,
+    ) -> GuardrailResult:
+        """
+        Check a full conversation, re-running rails only on new messages.
+
+        Clients resend the whole conversation every turn. Each message is
+        fingerprinted (role, content and the fingerprint of the message
+        before it) and the verdicts of messages already checked in the
+        session are reused, so a request costs about
+        one turn of rail work however long the conversation is. User
+        messages go through the input and dialog rails (the input rails see
+        all new user messages as one batch), assistant messages through the
+        output rails; other roles are not checked. Rails see the
+        previous ``context_window`` messages in ``context.conversation``.
+
+        Without a session id in the context nothing is remembered and every
+        message is checked.
+
+        Args:
+            messages: Conversation as {"role", "content"} dicts, oldest first
+            context: Processing context identifying the session
+
+        Returns:
+            GuardrailResult for the conversation; the (possibly redacted)
+            messages are in metadata["processed_messages"]
+        """
+        start_time = time.time()
+        context = context or ProcessingContext()
+        key = session_key(context.tenant_id, context.session_id)
+
+        known: Dict[str, Dict[str, Any]] = {}
+        if key is not None:
+            state = await self.sessions.get(key)
+            if state is not None:
+                known = state.verdicts
+
+        fresh: Dict[str, Dict[str, Any]] = {}
+        processed_messages: List[Dict[str, str]] = []
+        violations: List[RailViolation] = []
+        warnings: List[str] = []
+        reused = 0
+
+        fingerprints = []
+        previous = ""
+        for message in messages:
+            previous = self._message_fingerprint(message, previous)
+            fingerprints.append(previous)
+
+        # New user messages go through the input rails as one batch, so
+        # rails with batched implementations (e.g. PII detection) process
+        # a whole conversation at once
+        new_inputs: Dict[str, str] = {}
+        for message, fingerprint in zip(messages, fingerprints):
+            if message.get("role") == "user" and fingerprint not in known:
+                new_inputs.setdefault(fingerprint, message.get("content", ""))
+        input_outcomes = dict(zip(
+            new_inputs,
+            await self._run_input_rails_batch(list(new_inputs.values()), context)
+            if new_inputs else [],
+        ))
+
+        for index, (message, fingerprint) in enumerate(zip(messages, fingerprints)):
+            verdict = known.get(fingerprint)
+            if verdict is None:
+                verdict = fresh.get(fingerprint)
+            if verdict is not None:
+                reused += 1
+            else:
+                context.conversation = messages[max(index - self.context_window, 0):index]
+                verdict, message_warnings = await self._check_message(
+                    message, context, input_outcomes.get(fingerprint)
+                )
+                fresh[fingerprint] = verdict
+                warnings.extend(message_warnings)
+
+            if verdict.get("blocked"):
+                violations.append(RailViolation(
+                    rail_name=verdict.get("rail", "engine"),
+                    rail_type=RailType(verdict.get("rail_type", "input")),
+                    severity=verdict.get("severity", "medium"),
+                    message=verdict.get("message", "Message blocked"),
+                ))
+                break
+
+            content = verdict.get("content")
+            processed_messages.append(
+                message if content is None else {**message, "content": content}
+            )
+
+        context.conversation = []
+        if key is not None and fresh:
+            await self.sessions.update(
+                key, lambda state: state.remember_verdicts(fresh, self.max_verdicts)
+            )
+
+        if violations:
+            status = RailStatus.BLOCKED
+        else:
+            status = RailStatus.WARNING if warnings else RailStatus.PASSED
+        last_user = next(
+            (m["content"] for m in reversed(messages) if m.get("role") == "user"), ""
+        )
+        return GuardrailResult(
+            status=status,
+            allowed=not violations,
+            original_input=last_user,
+            violations=violations,
+            warnings=warnings,
+            metadata={
+                "processed_messages": processed_messages if not violations else [],
+                "checked_messages": len(fresh),
+                "reused_verdicts": reused,
+            },
+            processing_time_ms=(time.time() - start_time) * 1000,
+        )
+
+    async def check_retrieval(
+        self,
+        chunks: List[Union[str, Dict[str, Any]]],
+        context: Optional[ProcessingContext] = None,
+    ) -> RetrievalResult:
+        """
+        Run the retrieval rails over retrieved chunks before they reach the LLM.
+
+        Each rail receives all chunks still in play in one call, so rails
+        with batched models score them together. Rails drop chunks or
+        redact their content. Verdicts are cached by chunk content and
+        source, so knowledge-base chunks retrieved again are not re-checked.
+
+        Args:
+            chunks: Chunk texts, or dicts with "content" and optional
+                "source" and "metadata"
+            context: Processing context
+
+        Returns:
+            RetrievalResult with the kept (possibly redacted) chunks in
+            order and one verdict per input chunk
+        """
+        start_time = time.time()
+        context = context or ProcessingContext()
+        chunks = [
+            {"content": chunk} if isinstance(chunk, str) else chunk
+            for chunk in chunks
+        ]
+        keys = [
+            content_key(chunk["content"], str(chunk.get("source") or ""))
+            for chunk in chunks
+        ]
+
+        # index -> (allowed, redacted content or None, reasons)
+        decided: Dict[int, tuple] = {}
+        pending = []
+        for index, key in enumerate(keys):
+            cached = self.chunk_verdicts.get(key)
+            if cached is not None:
+                decided[index] = cached
+            else:
+                pending.append(index)
+
+        current = {index: chunks[index] for index in pending}
+        reasons: Dict[int, List[str]] = {index: [] for index in pending}
+        dropped: Set[int] = set()
+        failed = False
+
+        for rail in self._rails[RailType.RETRIEVAL]:
+            alive = [index for index in pending if index not in dropped]
+            if not alive:
+                break
+            rail_name = rail.__class__.__name__
+            try:
+                result = await rail.process_retrieval(
+                    [current[index] for index in alive], context
+                )
+            except Exception as e:
+                logger.error("retrieval_rail_error", rail_name=rail_name, error=str(e))
+                failed = True
+                continue
+
+            if result.get("blocked"):
+                return RetrievalResult(
+                    allowed=False,
+                    violations=[RailViolation(
+                        rail_name=rail_name,
+                        rail_type=RailType.RETRIEVAL,
+                        severity=result.get("severity", "medium"),
+                        message=result.get("message", "Retrieval blocked"),
+                        details=result.get("details"),
+                    )],
+                    processing_time_ms=(time.time() - start_time) * 1000,
+                )
+
+            chunk_verdicts = result.get("chunk_verdicts")
+            if chunk_verdicts is None:
+                # Rails that only return filtered_chunks keep chunks by identity
+                kept = {id(chunk) for chunk in result.get("filtered_chunks", [])}
+                chunk_verdicts = [
+                    {"allowed": id(current[index]) in kept} for index in alive
+                ]
+
+            for index, verdict in zip(alive, chunk_verdicts):
+                if not verdict.get("allowed", True):
+                    dropped.add(index)
+                    reasons[index].append(
+                        f"{rail_name}: {verdict.get('reason') or 'filtered'}"
+                    )
+                elif verdict.get("content") is not None:
+                    current[index] = {**current[index], "content": verdict["content"]}
+                    reasons[index].append(f"{rail_name}: redacted")
+
+        for index in pending:
+            content = current[index]["content"]
+            decided[index] = (
+                index not in dropped,
+                content if content != chunks[index]["content"] else None,
+                tuple(reasons[index]),
+            )
+            if not failed:
+                self.chunk_verdicts.put(keys[index], decided[index])
+
+        kept_chunks = []
+        verdicts = []
+        pending_set = set(pending)
+        for index, chunk in enumerate(chunks):
+            allowed, content, chunk_reasons = decided[index]
+            verdicts.append(ChunkVerdict(
+                index=index,
+                allowed=allowed,
+                redacted=content is not None,
+                reasons=list(chunk_reasons),
+                cached=index not in pending_set,
+            ))
+            if allowed:
+                kept_chunks.append(chunk if content is None else {**chunk, "content": content})
+
+        return RetrievalResult(
+            allowed=True,
+            chunks=kept_chunks,
+            verdicts=verdicts,
+            metadata={
+                "checked_chunks": len(pending),
+                "cached_chunks": len(chunks) - len(pending),
+                "dropped_chunks": len(chunks) - len(kept_chunks),
+            },
+            processing_time_ms=(time.time() - start_time) * 1000,
+        )
+
+    async def check_execution(
+        self,
+        request: Dict[str, Any],
+        context: Optional[ProcessingContext] = None,
+    ) -> ExecutionResult:
+        """
+        Vet a tool or code execution request with the execution rails.
+
+        Agents issue many calls of the same shape, so decisions are cached
+        by a canonical hash of the request: the tool, the argument shape,
+        the values of the arguments rails declare they decide on
+        (``execution_value_fields``), and the policy version (configured
+        ``policy_version`` plus the execution rails' configuration).
+
+        Args:
+            request: Execution request with "tool" and "arguments" (and
+                e.g. "code", "language")
+            context: Processing context
+
+        Returns:
+            ExecutionResult with the decision
+        """
+        start_time = time.time()
+        key = None
+        if self.execution_decisions is not None:
+            key = decision_key(request, self._execution_value_fields, self._execution_policy)
+            cached = self.execution_decisions.get(key)
+            if cached is not None:
+                allowed, violations, warnings = cached
+                return ExecutionResult(
+                    allowed=allowed,
+                    violations=list(violations),
+                    warnings=list(warnings),
+                    cached=True,
+                    processing_time_ms=(time.time() - start_time) * 1000,
+                )
+
+        context = context or ProcessingContext()
+        violations: List[RailViolation] = []
+        warnings: List[str] = []
+        cacheable = True
+
+        for rail in self._rails[RailType.EXECUTION]:
+            try:
+                result = await rail.process_execution(request, context)
+            except Exception as e:
+                logger.error(
+                    "execution_rail_error",
+                    rail_name=rail.__class__.__name__,
+                    error=str(e),
+                )
+                cacheable = False
+                continue
+
+            cacheable = cacheable and result.get("cacheable", True)
+            if result.get("blocked"):
+                violations.append(RailViolation(
+                    rail_name=rail.__class__.__name__,
+                    rail_type=RailType.EXECUTION,
+                    severity=result.get("severity", "high"),
+                    message=result.get("message", "Execution blocked"),
+                    details=result.get("details"),
+                    suggestion=result.get("suggestion"),
+                ))
+                break
+            if result.get("warning"):
+                warnings.append(result["warning"])
+
+        if key is not None and cacheable:
+            self.execution_decisions.put(
+                key, (not violations, tuple(violations), tuple(warnings))
+            )
+
+        return ExecutionResult(
+            allowed=not violations,
+            violations=violations,
+            warnings=warnings,
+            processing_time_ms=(time.time() - start_time) * 1000,
+        )
+
+    def _update_execution_policy(self) -> None:
+        """Recompute the execution policy version and cached-value fields."""
+        rails = self._rails[RailType.EXECUTION]
+        configuration = json.dumps(
+            [self._policy_version]
+            + [[rail.__class__.__name__, rail.config] for rail in rails],
+            sort_keys=True,
+            default=str,
+        )
+        self._execution_policy = hashlib.blake2b(
+            configuration.encode("utf-8"), digest_size=8
+        ).hexdigest()
+
+        value_fields: Optional[Set[str]] = set()
+        for rail in rails:
+            if rail.execution_value_fields is None:
+                value_fields = None
+                break
+            value_fields |= set(rail.execution_value_fields)
+        self._execution_value_fields = value_fields
+
+    async def _check_message(
+        self,
+        message: Dict[str, str],
+        context: ProcessingContext,
+        input_outcome: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[Dict[str, Any], List[str]]:
+        """
+        Run the rails for one conversation message.
+
+        Args:
+            message: The message
+            context: Processing context, with the preceding messages
+            input_outcome: Input rail outcome of a user message already
+                checked in a batch
+
+        Returns:
+            The compact verdict remembered for the message, and its warnings
+        """
+        role = message.get("role")
+        content = message.get("content", "")
+        context.clear_signals()
+
+        if role == "user":
+            if input_outcome is None:
+                result = await self._run_input_rails(content, context)
+            else:
+                result = input_outcome
+                for name, value in input_outcome["signals"].items():
+                    context.record_signal(name, value)
+            if result["allowed"]:
+                processed = result["processed_input"]
+                dialog_result = await self._run_dialog_rails(processed, context)
+                dialog_result["warnings"] = (
+                    result["warnings"] + dialog_result.get("warnings", [])
+                )
+                result = dialog_result
+        elif role == "assistant":
+            result = await self._run_output_rails(content, context)
+            processed = result.get("processed_output", content)
+        else:
+            return {}, []
+
+        if not result["allowed"]:
+            violation = result["violations"][-1]
+            return {
+                "blocked": True,
+                "rail": violation.rail_name,
+                "rail_type": violation.rail_type.value,
+                "severity": violation.severity,
+                "message": violation.message,
+            }, []
+
+        # Only transformed messages keep their text in the session
+        verdict = {"content": processed} if processed != content else {}
+        return verdict, result.get("warnings", [])
+
+    @staticmethod
+    def _message_fingerprint(message: Dict[str, str], previous: str = "") -> str:
+        """
+        Fingerprint of a message's role and content at its place in the
+        conversation.
+
+        Chained with the previous message's fingerprint, so a message sent
+        again later (e.g. the same complaint twice) is a new turn for the
+        session-tracking dialog rails, while a resent conversation prefix
+        keeps its fingerprints.
+        """
+        data = (
+            f"{previous}\0{message.get('role', '')}\0{message.get('content', '')}"
+        ).encode("utf-8")
+        return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+    async def redact_output_stream(
+        self,
+        chunks: AsyncIterator[str],
+        context: Optional[ProcessingContext] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Redact a streamed LLM response with every output rail that supports it.
+
+        Output rails providing ``stream_redactor()`` (the PII rails) are
+        chained; text is released as soon as each of them considers it final.
+
+        Args:
+            chunks: Raw response chunks (e.g. from an adapter's generate_stream)
+            context: Processing context
+
+        Yields:
+            Redacted text
+        """
+        stream = chunks
+        for rail in self._rails[RailType.OUTPUT]:
+            factory = getattr(rail, "stream_redactor", None)
+            if factory is not None:
+                stream = redact_stream(factory(), stream)
+        async for text in stream:
+            yield text
+
+    def guard_output_stream(
+        self,
+        chunks: AsyncIterator[str],
+        context: Optional[ProcessingContext] = None,
+    ) -> GuardedStream:
+        """
+        Validate and redact a streamed LLM response.
+
+        Output rails providing ``stream_validator()`` (format validation)
+        check the raw chunks and cut the stream, closing ``chunks``, as soon
+        as one reports a violation; rails providing ``stream_redactor()``
+        then redact the released text.
+
+        Args:
+            chunks: Raw response chunks (e.g. from an adapter's generate_stream)
+            context: Processing context
+
+        Returns:
+            Async iterable of released text; after iteration, its
+            ``violations`` and ``aborted`` tell whether the stream was cut
+        """
+        rails = self._rails[RailType.OUTPUT]
+        return GuardedStream(
+            chunks,
+            [rail.stream_validator() for rail in rails if hasattr(rail, "stream_validator")],
+            [rail.stream_redactor for rail in rails if hasattr(rail, "stream_redactor")],
+        )
+
+    def _record_near_duplicate(
+        self,
+        signature: Any,
+        near_duplicate: Optional[Dict[str, Any]],
+        violations: List[RailViolation],
+        skipped_rails: Set[int],
+    ) -> None:
+        """Remember the input-stage verdict for later near-duplicates."""
+        if signature is None:
+            return
+
+        verdict = "blocked" if violations else "allowed"
+        cluster_id = near_duplicate["cluster_id"] if near_duplicate else None
+
+        if skipped_rails:
+            # Not fully evaluated, so it must not become an anchor itself
+            self.near_duplicates.observe(cluster_id, verdict)
+            return
+
+        self.near_duplicates.add(
+            signature,
+            verdict,
+            payload={"violations": list(violations)},
+            cluster_id=cluster_id,
+        )
+
     async def _run_input_rails(
-        self, user_input: str, context: ProcessingContext
+        self,
+        user_input: str,
+        context: ProcessingContext,
+        skip_rails: Optional[Set[int]] = None,
     ) -> Dict[str, Any]:
-        """Run all input rails."""
+        """Run all input rails, except those whose id() is in skip_rails."""
         violations = []
         warnings = []
-        processed_input = user_input
+        metadata: Dict[str, Any] = {}
+        base = user_input
+        plan = context.begin_edits(base)
+        context.use_policy(self._policies[RailType.INPUT])
 
         for rail in self._rails[RailType.INPUT]:
+            if skip_rails and id(rail) in skip_rails:
+                continue
             try:
-                result = await rail.process_input(processed_input, context)
+                text = base if rail.uses_edit_plan else context.edited_text(base)
+                result = await rail.process_input(text, context)
+                if rail.uses_edit_plan and plan.conflicts(result.get("edits") or ()):
+                    # The edits overlap an earlier rail's; check the edited
+                    # text instead, so neither transformation is lost
+                    base = context.edited_text(base)
+                    plan = context.begin_edits(base)
+                    result = await rail.process_input(base, context)
                 if result.get("blocked"):
                     violations.append(
                         RailViolation(
@@ -232,10 +934,12 @@ class GuardrailsEngine:
 
                 if result.get("warning"):
                     warnings.append(result["warning"])
+                metadata.update(result.get("metadata", {}))
 
-                # Apply transformations if any
-                if "transformed_input" in result:
-                    processed_input = result["transformed_input"]
+                # Collect transformations; applied once at the end
+                base, plan = self._merge_transform(
+                    rail, result, "transformed_input", base, plan, context
+                )
 
             except Exception as e:
                 logger.error(
@@ -248,15 +952,124 @@ class GuardrailsEngine:
             "allowed": True,
             "violations": violations,
             "warnings": warnings,
-            "processed_input": processed_input,
+            "metadata": metadata,
+            "processed_input": context.edited_text(base),
         }
 
+    async def _run_input_rails_batch(
+        self, user_inputs: List[str], context: ProcessingContext
+    ) -> List[Dict[str, Any]]:
+        """
+        Run all input rails over several texts, one batch call per rail.
+
+        Returns one outcome per text, shaped like ``_run_input_rails``'s,
+        plus the signals recorded for that text. Rails without a batched
+        implementation run text by text, so their signals stay per text.
+        """
+        bases = list(user_inputs)
+        plans = [EditPlan() for _ in bases]
+        violations: List[Optional[RailViolation]] = [None] * len(bases)
+        warnings: List[List[str]] = [[] for _ in bases]
+        metadata: List[Dict[str, Any]] = [{} for _ in bases]
+        signals: List[Dict[str, float]] = [{} for _ in bases]
+        context.use_policy(self._policies[RailType.INPUT])
+
+        for rail in self._rails[RailType.INPUT]:
+            pending = [i for i, violation in enumerate(violations) if violation is None]
+            if not pending:
+                break
+            texts = [
+                bases[i] if rail.uses_edit_plan else plans[i].apply(bases[i])
+                for i in pending
+            ]
+            try:
+                if type(rail).process_input_batch is BaseRail.process_input_batch:
+                    results = []
+                    for index, text in zip(pending, texts):
+                        context.clear_signals()
+                        results.append(await rail.process_input(text, context))
+                        _merge_signals(signals[index], context.recorded_signals())
+                else:
+                    results = await rail.process_input_batch(texts, context)
+
+                # Texts whose edits overlap an earlier rail's are checked
+                # again with the earlier edits applied
+                conflicting = [
+                    position for position, index in enumerate(pending)
+                    if rail.uses_edit_plan
+                    and plans[index].conflicts(results[position].get("edits") or ())
+                ]
+                if conflicting:
+                    for position in conflicting:
+                        index = pending[position]
+                        bases[index] = plans[index].apply(bases[index])
+                        plans[index] = EditPlan()
+                    rechecked = await rail.process_input_batch(
+                        [bases[pending[position]] for position in conflicting], context
+                    )
+                    for position, result in zip(conflicting, rechecked):
+                        results[position] = result
+            except Exception as e:
+                logger.error(
+                    "input_rail_error",
+                    rail_name=rail.__class__.__name__,
+                    error=str(e),
+                )
+                continue
+
+            for index, result in zip(pending, results):
+                _merge_signals(signals[index], result.get("signals", {}))
+                if result.get("blocked"):
+                    violations[index] = RailViolation(
+                        rail_name=rail.__class__.__name__,
+                        rail_type=RailType.INPUT,
+                        severity=result.get("severity", "high"),
+                        message=result.get("message", "Input blocked"),
+                        details=result.get("details"),
+                    )
+                    continue
+                if result.get("warning"):
+                    warnings[index].append(result["warning"])
+                metadata[index].update(result.get("metadata", {}))
+                edits = result.get("edits")
+                if edits:
+                    if not rail.uses_edit_plan:
+                        bases[index] = plans[index].apply(bases[index])
+                        plans[index] = EditPlan()
+                    plans[index].extend(edits)
+                elif "transformed_input" in result:
+                    bases[index] = result["transformed_input"]
+                    plans[index] = EditPlan()
+        context.clear_signals()
+
+        outcomes = []
+        for index, violation in enumerate(violations):
+            if violation is not None:
+                outcomes.append({
+                    "allowed": False,
+                    "violations": [violation],
+                    "warnings": warnings[index],
+                    "signals": signals[index],
+                })
+                continue
+            outcomes.append({
+                "allowed": True,
+                "violations": [],
+                "warnings": warnings[index],
+                "metadata": metadata[index],
+                "processed_input": plans[index].apply(bases[index]),
+                "signals": signals[index],
+            })
+        return outcomes
+
     async def _run_dialog_rails(
         self, processed_input: str, context: ProcessingContext
     ) -> Dict[str, Any]:
         """Run all dialog rails."""
         violations = []
         warnings = []
+        metadata: Dict[str, Any] = {}
+        context.use_policy(self._policies[RailType.DIALOG])
 
         for rail in self._rails[RailType.DIALOG]:
             try:
@@ -275,6 +1088,7 @@ class GuardrailsEngine:
 
                 if result.get("warning"):
                     warnings.append(result["warning"])
+                metadata.update(result.get("metadata", {}))
 
             except Exception as e:
                 logger.error(
@@ -283,7 +1097,12 @@ class GuardrailsEngine:
                     error=str(e),
                 )
 
-        return {"allowed": True, "violations": violations, "warnings": warnings}
+        return {
+            "allowed": True,
+            "violations": violations,
+            "warnings": warnings,
+            "metadata": metadata,
+        }
 
     async def _run_output_rails(
         self, output: str, context: ProcessingContext
@@ -291,11 +1110,21 @@ class GuardrailsEngine:
         """Run all output rails."""
         violations = []
         warnings = []
-        processed_output = output
+        metadata: Dict[str, Any] = {}
+        base = output
+        plan = context.begin_edits(base)
+        context.use_policy(self._policies[RailType.OUTPUT])
 
         for rail in self._rails[RailType.OUTPUT]:
             try:
-                result = await rail.process_output(processed_output, context)
+                text = base if rail.uses_edit_plan else context.edited_text(base)
+                result = await rail.process_output(text, context)
+                if rail.uses_edit_plan and plan.conflicts(result.get("edits") or ()):
+                    # The edits overlap an earlier rail's; check the edited
+                    # text instead, so neither transformation is lost
+                    base = context.edited_text(base)
+                    plan = context.begin_edits(base)
+                    result = await rail.process_output(base, context)
                 if result.get("blocked"):
                     violations.append(
                         RailViolation(
@@ -306,14 +1135,17 @@ class GuardrailsEngine:
                             details=result.get("details"),
                         )
                     )
-                    return {"allowed": False, "violations": violations}
+                    metadata.update(result.get("metadata", {}))
+                    return {"allowed": False, "violations": violations, "metadata": metadata}
 
                 if result.get("warning"):
                     warnings.append(result["warning"])
+                metadata.update(result.get("metadata", {}))
 
-                # Apply transformations if any
-                if "transformed_output" in result:
-                    processed_output = result["transformed_output"]
+                # Collect transformations; applied once at the end
+                base, plan = self._merge_transform(
+                    rail, result, "transformed_output", base, plan, context
+                )
 
             except Exception as e:
                 logger.error(
@@ -326,9 +1158,40 @@ class GuardrailsEngine:
             "allowed": True,
             "violations": violations,
             "warnings": warnings,
-            "processed_output": processed_output,
+            "metadata": metadata,
+            "processed_output": context.edited_text(base),
         }
 
+    @staticmethod
+    def _merge_transform(
+        rail: BaseRail,
+        result: Dict[str, Any],
+        key: str,
+        base: str,
+        plan: EditPlan,
+        context: ProcessingContext,
+    ) -> Tuple[str, EditPlan]:
+        """
+        Merge a rail's edits into the stage plan.
+
+        A rail that returns a whole transformed text (``key``), or edits
+        against the edited text it was given, makes that text the stage's
+        new base.
+
+        Returns:
+            The (possibly new) base text and plan
+        """
+        edits = result.get("edits")
+        if edits:
+            if not rail.uses_edit_plan:
+                base = context.edited_text(base)
+                plan = context.begin_edits(base)
+            plan.extend(edits)
+        elif key in result:
+            base = result[key]
+            plan = context.begin_edits(base)
+        return base, plan
+
     async def _generate_response(
         self, processed_input: str, context: ProcessingContext
     ) -> Optional[str]:
@@ -350,12 +1213,51 @@ class GuardrailsEngine:
             logger.error("llm_generation_error", error=str(e))
             return None
 
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get runtime metrics of the engine.
+
+        Returns:
+            Dictionary of metrics, including near-duplicate campaign clusters
+        """
+        metrics: Dict[str, Any] = {
+            "rails": {
+                rail_type.value: len(rails) for rail_type, rails in self._rails.items()
+            },
+        }
+        if self.near_duplicates is not None:
+            metrics["near_duplicates"] = self.near_duplicates.get_stats()
+        metrics["sessions"] = self.sessions.get_stats()
+        metrics["chunk_verdicts"] = self.chunk_verdicts.get_stats()
+        metrics["fused_matching"] = {
+            rail_type.value: policy.get_stats()
+            for rail_type, policy in self._policies.items()
+            if policy is not None
+        }
+        metrics["pattern_cache"] = get_pattern_cache_stats()
+        if self.execution_decisions is not None:
+            metrics["execution_decisions"] = self.execution_decisions.get_stats()
+        return metrics
+
     def add_adapter(self, adapter: BaseLLMAdapter) -> None:
         """Add an LLM adapter to the engine."""
         self.adapters.append(adapter)
+        for rails in self._rails.values():
+            for rail in rails:
+                rail.bind_adapters(self.adapters)
         logger.info("adapter_added", adapter_type=type(adapter).__name__)
 
     def add_rail(self, rail: BaseRail, rail_type: RailType) -> None:
         """Add a custom rail to the engine."""
+        rail.bind_adapters(self.adapters)
+        rail.bind_session_store(self.sessions)
         self._rails[rail_type].append(rail)
+        if rail_type in self._policies:
+            self._compile_policies()
+        if rail_type == RailType.RETRIEVAL:
+            # Cached chunk verdicts did not account for this rail
+            self.chunk_verdicts.clear()
+        elif rail_type == RailType.EXECUTION:
+            # Changes the policy version, so older decisions no longer match
+            self._update_execution_policy()
         logger.info("rail_added", rail_type=rail_type, rail_class=type(rail).__name__)
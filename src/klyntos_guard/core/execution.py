@@ -0,0 +1,61 @@
+"""Canonical keys of tool/code execution requests for decision caching."""
+
+import hashlib
+import json
+from typing import Any, Dict, Optional, Set
+
+
+def argument_shape(value: Any) -> Any:
+    """
+    Type structure of an argument value, without the values themselves.
+
+    Dicts keep their keys, lists collapse to the sorted set of their element
+    shapes, scalars become their type name.
+    """
+    if isinstance(value, dict):
+        return {str(key): argument_shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        shapes = {json.dumps(argument_shape(item), sort_keys=True) for item in value}
+        return ["list", sorted(shapes)]
+    return type(value).__name__
+
+
+def decision_key(
+    request: Dict[str, Any],
+    value_fields: Optional[Set[str]],
+    policy_version: str,
+) -> bytes:
+    """
+    Canonical hash of an execution request as seen by the execution rails.
+
+    Requests with the same tool, the same argument shape and the same values
+    in ``value_fields`` get the same key; other argument values do not
+    matter. Fields outside ``arguments`` (e.g. code, language) always count
+    with their values.
+
+    Args:
+        request: Execution request with "tool" and "arguments"
+        value_fields: Argument names whose values rails decide on, or None
+            if any value may matter
+        policy_version: Version of the rails' configuration
+
+    Returns:
+        16-byte key
+    """
+    arguments = request.get("arguments") or {}
+    if value_fields is None:
+        canonical_arguments = arguments
+    else:
+        canonical_arguments = {
+            key: value if key in value_fields else argument_shape(value)
+            for key, value in arguments.items()
+        }
+
+    payload = {
+        key: value for key, value in request.items() if key != "arguments"
+    }
+    payload["arguments"] = canonical_arguments
+    payload["policy_version"] = policy_version
+
+    data = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(data.encode("utf-8"), digest_size=16).digest()
@@ -0,0 +1,266 @@
+"""Bit-parallel approximate matching of many literal phrases at once."""
+
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from klyntos_guard.core.patterns import compile_pattern
+
+# Shortest exact piece worth prefiltering on; shorter pieces would match
+# almost everywhere, so such phrase sets are scanned in full.
+MIN_PIECE_LENGTH = 3
+
+PhraseSpec = Union[str, Tuple[str, int], Dict[str, Any]]
+
+
+def default_max_edits(phrase: str) -> int:
+    """Edits allowed for a phrase by default: one per 8 characters, 1 to 3."""
+    return max(1, min(3, len(phrase) // 8))
+
+
+def edit_distance(a: str, b: str, transpositions: bool = True) -> int:
+    """Levenshtein distance (optimal string alignment if transpositions)."""
+    previous2: Optional[List[int]] = None
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            cost = 0 if ca == cb else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (
+                transpositions and previous2 is not None and i > 1 and j > 1
+                and ca == b[j - 2] and a[i - 2] == cb
+            ):
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class FuzzyPhraseMatcher:
+    """
+    Find phrases in text allowing a bounded number of edits per phrase.
+
+    All phrases are packed side by side into one arbitrary-precision integer
+    and scanned together with the Wu-Manber bit-parallel NFA (one state
+    vector per allowed edit count, extended with transpositions). Each
+    scanned character costs a fixed number of big-integer operations whose
+    width grows with the total phrase length, so adding phrases does not
+    add Python-level work per character.
+
+    To keep long benign inputs cheap, a single regex first looks for exact
+    phrase pieces (pigeonhole filter) and only windows around those hits
+    are scanned.
+
+    Bits never leak between packed phrases: every shift is masked so a
+    phrase's top bit cannot carry into the next phrase's first bit.
+    """
+
+    def __init__(
+        self,
+        phrases: Sequence[PhraseSpec],
+        transpositions: bool = True,
+        prefilter: bool = True,
+    ):
+        """
+        Initialize the matcher.
+
+        Args:
+            phrases: Phrases as strings (default edit budget), (phrase,
+                max_edits) tuples or {"phrase", "max_edits"} dicts
+            transpositions: Count swapped adjacent characters as one edit
+            prefilter: Scan only windows around exact phrase pieces (if
+                False, every character goes through the bit-parallel scan)
+        """
+        self.transpositions = transpositions
+        self.phrases: List[Tuple[str, int]] = []
+        for spec in phrases:
+            if isinstance(spec, str):
+                phrase, max_edits = spec, default_max_edits(spec)
+            elif isinstance(spec, dict):
+                phrase = spec["phrase"]
+                max_edits = spec.get("max_edits", default_max_edits(phrase))
+            else:
+                phrase, max_edits = spec
+            if phrase:
+                # An edit budget as long as the phrase would match anything
+                self.phrases.append((phrase, min(max_edits, len(phrase) - 1)))
+
+        self.max_edits = max((k for _, k in self.phrases), default=0)
+
+        self._low = 0  # lowest bit of every phrase
+        self._tops_by_edits = [0] * (self.max_edits + 1)  # top bits, by budget
+        self._top_owner: Dict[int, int] = {}  # top bit position -> phrase index
+        self._masks: Dict[str, int] = {}
+
+        offset = 0
+        for index, (phrase, max_edits) in enumerate(self.phrases):
+            self._low |= 1 << offset
+            top = offset + len(phrase) - 1
+            self._tops_by_edits[max_edits] |= 1 << top
+            self._top_owner[top] = index
+            for position, char in enumerate(phrase):
+                self._masks[char] = self._masks.get(char, 0) | (1 << (offset + position))
+            offset += len(phrase)
+
+        self._all = (1 << offset) - 1
+        self._not_low = self._all & ~self._low
+        self._levels = [
+            (edits, tops) for edits, tops in enumerate(self._tops_by_edits) if tops
+        ]
+
+        self._reach = max((len(p) + k for p, k in self.phrases), default=0)
+        self._filter = self._build_filter() if prefilter else None
+
+    def _build_filter(self) -> Optional["re.Pattern"]:
+        """
+        Regex over exact phrase pieces, or None if pieces would be too short.
+
+        A phrase with k edits is split into k + 1 pieces; at least one piece
+        survives unchanged in any occurrence. With transpositions the pieces
+        are separated by one-character gaps, so a swap can only touch one.
+        """
+        gap = 1 if self.transpositions else 0
+        pieces = set()
+        for phrase, max_edits in self.phrases:
+            count = max_edits + 1
+            usable = len(phrase) - gap * max_edits
+            if usable // count < MIN_PIECE_LENGTH:
+                return None
+            for i in range(count):
+                start = usable * i // count + gap * i
+                end = usable * (i + 1) // count + gap * i
+                pieces.add(phrase[start:end])
+
+        ordered = sorted(pieces, key=len, reverse=True)
+        return compile_pattern("|".join(re.escape(piece) for piece in ordered))
+
+    def search(self, text: str) -> List[Dict[str, Any]]:
+        """
+        Find approximate occurrences of the phrases.
+
+        Args:
+            text: Text to search (normalized the same way as the phrases)
+
+        Returns:
+            List of matches with phrase, start, end and distance
+        """
+        if not self.phrases:
+            return []
+
+        if self._filter is None:
+            return self._locate(text, self._scan(text, 0, len(text)))
+
+        # Every occurrence contains one of its phrase's pieces verbatim, so
+        # only windows around piece hits need the bit-parallel scan.
+        hits: List[Tuple[int, int]] = []
+        reach = self._reach
+        window_start = window_end = -1
+        for match in self._filter.finditer(text):
+            start = max(0, match.start() - reach)
+            end = min(len(text), match.end() + reach)
+            if start <= window_end:
+                window_end = max(window_end, end)
+                continue
+            if window_end > window_start:
+                hits.extend(self._scan(text, window_start, window_end))
+            window_start, window_end = start, end
+        if window_end > window_start:
+            hits.extend(self._scan(text, window_start, window_end))
+        return self._locate(text, hits)
+
+    def _scan(self, text: str, begin: int, stop: int) -> List[Tuple[int, int]]:
+        """Run the bit-parallel NFA over text[begin:stop]; (phrase, end) hits."""
+        k = self.max_edits
+        low = self._low
+        not_low = self._not_low
+        masks = self._masks
+        levels = self._levels
+        top_owner = self._top_owner
+        transpositions = self.transpositions
+
+        # Row i starts with the first i phrase characters reachable by deletions
+        rows = [0] * (k + 1)
+        for i in range(1, k + 1):
+            rows[i] = ((rows[i - 1] << 1) & not_low) | low
+        before = list(rows)
+        previous_mask = 0
+
+        hits: List[Tuple[int, int]] = []
+        for end in range(begin + 1, stop + 1):
+            mask = masks.get(text[end - 1], 0)
+            # Rows are updated in place: ``above`` and ``above_new`` hold the
+            # previous row before and after this character.
+            above = rows[0]
+            above_new = rows[0] = (((above << 1) & not_low) | low) & mask
+            for i in range(1, k + 1):
+                current = rows[i]
+                value = (
+                    ((((current << 1) & not_low) | low) & mask)
+                    | above
+                    | (((above | above_new) << 1) & not_low)
+                    | low
+                )
+                if transpositions and previous_mask:
+                    swapped = ((((before[i - 1] << 1) & not_low) | low) & mask) << 1
+                    value |= swapped & not_low & previous_mask
+                before[i - 1] = above
+                rows[i] = value
+                above, above_new = current, value
+            before[k] = above
+
+            found = 0
+            for edits, tops in levels:
+                found |= rows[edits] & tops
+            while found:
+                bit = found & -found
+                hits.append((top_owner[bit.bit_length() - 1], end))
+                found ^= bit
+
+            previous_mask = mask
+
+        return hits
+
+    def _locate(self, text: str, hits: List[Tuple[int, int]]) -> List[Dict[str, Any]]:
+        """Find start offsets and distances for match end positions."""
+        matches = []
+        # Consecutive end positions of a phrase belong to the same
+        # occurrence; the end with the fewest edits is reported
+        runs: Dict[int, List[int]] = {}
+        for index, end in hits:
+            run = runs.get(index)
+            if run and run[-1] == end - 1:
+                run.append(end)
+                continue
+            if run:
+                self._add_best(text, index, run, matches)
+            runs[index] = [end]
+        for index, run in runs.items():
+            self._add_best(text, index, run, matches)
+
+        matches.sort(key=lambda match: (match["end"], match["start"], match["phrase"]))
+        return matches
+
+    def _add_best(
+        self, text: str, index: int, ends: List[int], matches: List[Dict[str, Any]]
+    ) -> None:
+        """Add the closest alignment of a phrase ending at one of ``ends``."""
+        phrase, max_edits = self.phrases[index]
+        best = None
+        for end in ends:
+            low = max(0, end - len(phrase) - max_edits)
+            for start in range(low, min(end, end - len(phrase) + max_edits + 1)):
+                distance = edit_distance(text[start:end], phrase, self.transpositions)
+                if distance > max_edits:
+                    continue
+                # Fewest edits first, then the span closest to the phrase length
+                key = (distance, abs(end - start - len(phrase)))
+                if best is None or key < best[0]:
+                    best = (key, start, end)
+        if best is None:
+            return
+        (distance, _), start, end = best
+        matches.append({
+            "phrase": phrase,
+            "start": start,
+            "end": end,
+            "distance": distance,
+        })
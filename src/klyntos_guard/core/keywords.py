@@ -0,0 +1,279 @@
+"""Aho-Corasick matching of keyword sets and literal patterns."""
+
+import re
+from collections import deque
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+# Words, and every other non-space character on its own. Keywords and text
+# are split the same way, so matches always start and end on a boundary.
+TOKEN = re.compile(r"\w+|[^\w\s]")
+_WORD_CHAR = re.compile(r"\w")
+
+
+def keyword_pattern(keyword: str) -> Optional[str]:
+    """
+    Regex matching a keyword exactly where KeywordAutomaton would.
+
+    Tokens are matched whole, whitespace between them is not significant
+    (but separates adjacent words). The pattern starts with the keyword's
+    first token, so ``re`` can search for it as a literal prefix. Keywords
+    that can overlap themselves ("ha ha" in "ha ha ha") are wrapped in a
+    lookahead, so ``finditer`` yields every occurrence, like
+    ``KeywordAutomaton.counts``.
+
+    Args:
+        keyword: Normalized keyword
+
+    Returns:
+        The pattern, or None for a keyword without tokens
+    """
+    tokens = TOKEN.findall(keyword)
+    if not tokens:
+        return None
+
+    parts = []
+    for previous, token in zip([None] + tokens, tokens):
+        if previous is not None:
+            parts.append(r"\s+" if _is_word(previous) and _is_word(token) else r"\s*")
+        parts.append(re.escape(token))
+        if previous is None and _is_word(token):
+            # The first word must not continue a longer one
+            parts.append(r"(?<!\w" + re.escape(token) + ")")
+    if _is_word(tokens[-1]):
+        parts.append(r"(?!\w)")
+
+    pattern = "".join(parts)
+    if any(tokens[:size] == tokens[-size:] for size in range(1, len(tokens))):
+        pattern = "(?=" + pattern + ")"
+    return pattern
+
+
+def _is_word(token: str) -> bool:
+    """Whether a token is a word (rather than a single symbol)."""
+    return _WORD_CHAR.match(token) is not None
+
+
+class KeywordAutomaton:
+    """
+    Find keywords of many labels in one pass over a text.
+
+    Keywords are split into tokens and inserted into a single trie whose
+    transitions are whole tokens, with Aho-Corasick failure links. Scanning
+    costs one dict lookup per token (plus amortized failure steps) however
+    many labels and keywords there are, and a keyword can only match whole
+    tokens: "vote" does not match inside "devoted". Whitespace between the
+    tokens of a multi-word keyword is not significant.
+
+    Matching is exact; callers normalize keywords and text alike.
+    """
+
+    def __init__(self, keywords: Mapping[str, Iterable[str]]):
+        """
+        Build the automaton.
+
+        Args:
+            keywords: Keywords per label
+        """
+        self.labels: List[str] = list(keywords)
+        self.keyword_count = 0
+
+        goto: List[Dict[str, int]] = [{}]
+        # (label index, keyword length in tokens) for keywords ending here
+        output: List[List[Tuple[int, int]]] = [[]]
+
+        for label_index, label in enumerate(self.labels):
+            for keyword in keywords[label]:
+                tokens = TOKEN.findall(keyword)
+                if not tokens:
+                    continue
+                state = 0
+                for token in tokens:
+                    following = goto[state].get(token)
+                    if following is None:
+                        following = len(goto)
+                        goto[state][token] = following
+                        goto.append({})
+                        output.append([])
+                    state = following
+                hit = (label_index, len(tokens))
+                if hit not in output[state]:
+                    output[state].append(hit)
+                    self.keyword_count += 1
+
+        # Breadth-first, so failure targets are complete before they are used
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, following in goto[state].items():
+                target = fail[state]
+                while target and token not in goto[target]:
+                    target = fail[target]
+                fail[following] = goto[target].get(token, 0)
+                output[following] = output[following] + output[fail[following]]
+                queue.append(following)
+
+        self._goto = goto
+        self._fail = fail
+        self._output = output
+
+    def __len__(self) -> int:
+        return self.keyword_count
+
+    def counts(self, text: str) -> Dict[str, int]:
+        """
+        Count keyword occurrences per label.
+
+        Args:
+            text: Normalized text
+
+        Returns:
+            Hit counts of the labels with at least one hit
+        """
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        hits = [0] * len(self.labels)
+
+        state = 0
+        for token in TOKEN.findall(text):
+            while True:
+                following = goto[state].get(token)
+                if following is not None:
+                    state = following
+                    break
+                if not state:
+                    break
+                state = fail[state]
+            for label_index, _ in output[state]:
+                hits[label_index] += 1
+
+        return {self.labels[i]: count for i, count in enumerate(hits) if count}
+
+    def search(self, text: str) -> List[Tuple[str, int, int]]:
+        """
+        Find all keyword occurrences, overlapping ones included.
+
+        Args:
+            text: Normalized text
+
+        Returns:
+            (label, start, end) character spans in text, by end position
+        """
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        starts: List[int] = []
+        matches = []
+
+        state = 0
+        for match in TOKEN.finditer(text):
+            token = match.group()
+            starts.append(match.start())
+            while True:
+                following = goto[state].get(token)
+                if following is not None:
+                    state = following
+                    break
+                if not state:
+                    break
+                state = fail[state]
+            for label_index, length in output[state]:
+                matches.append(
+                    (self.labels[label_index], starts[-length], match.end())
+                )
+
+        return matches
+
+
+class LiteralAutomaton:
+    """
+    Aho-Corasick automaton over the characters of literal patterns.
+
+    Unlike KeywordAutomaton, patterns match anywhere (``<script`` inside
+    ``<scripts>``). The scan state is returned to the caller, so a stream
+    can be matched chunk by chunk without rescanning or buffering it.
+    Matching is case-insensitive.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        """
+        Build the automaton.
+
+        Args:
+            patterns: Literal patterns (empty ones are ignored)
+        """
+        self.patterns: List[str] = []
+        goto: List[Dict[str, int]] = [{}]
+        # Indices of patterns ending here
+        output: List[List[int]] = [[]]
+
+        for pattern in patterns:
+            lowered = pattern.lower()
+            if not lowered or lowered in self.patterns:
+                continue
+            state = 0
+            for char in lowered:
+                following = goto[state].get(char)
+                if following is None:
+                    following = len(goto)
+                    goto[state][char] = following
+                    goto.append({})
+                    output.append([])
+                state = following
+            output[state].append(len(self.patterns))
+            self.patterns.append(lowered)
+
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, following in goto[state].items():
+                target = fail[state]
+                while target and char not in goto[target]:
+                    target = fail[target]
+                fail[following] = goto[target].get(char, 0)
+                output[following] = output[following] + output[fail[following]]
+                queue.append(following)
+
+        self._goto = goto
+        self._fail = fail
+        self._output = output
+        self.max_length = max((len(p) for p in self.patterns), default=0)
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def scan(self, text: str, state: int = 0) -> Tuple[int, List[Tuple[str, int, int]]]:
+        """
+        Continue a scan over the next piece of text.
+
+        Args:
+            text: Next piece of text
+            state: State returned by the previous call (0 to start)
+
+        Returns:
+            The new state, and (pattern, start, end) matches with offsets
+            relative to this piece (start is negative for a match that
+            began in an earlier piece)
+        """
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        matches = []
+
+        for position, char in enumerate(text):
+            for lowered in char.lower():
+                while True:
+                    following = goto[state].get(lowered)
+                    if following is not None:
+                        state = following
+                        break
+                    if not state:
+                        break
+                    state = fail[state]
+                for index in output[state]:
+                    pattern = self.patterns[index]
+                    matches.append((pattern, position + 1 - len(pattern), position + 1))
+
+        return state, matches
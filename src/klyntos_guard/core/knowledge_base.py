@@ -0,0 +1,511 @@
+"""On-disk BM25 index of knowledge-base passages."""
+
+import hashlib
+import json
+import math
+import re
+import shutil
+import threading
+from collections import Counter
+from itertools import repeat
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+FORMAT_VERSION = 1
+MANIFEST = "manifest.json"
+
+WORD = re.compile(r"\w+")
+
+# Function words carry no evidence and have the longest postings lists
+STOPWORDS = frozenset(
+    """
+    a an and are as at be been being but by can could did do does for from
+    had has have he her his i if in into is it its itself me my no nor not of
+    on or our she so than that the their them then there these they this
+    those to too us was we were what when where which while who whom why will
+    with would you your
+    """.split()
+)
+
+
+def terms(text: str) -> List[str]:
+    """Lowercased words of a text, without stopwords."""
+    return [word for word in WORD.findall(text.lower()) if word not in STOPWORDS]
+
+
+def term_id(term: str) -> int:
+    """Stable 64-bit id of a term."""
+    return int.from_bytes(
+        hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest(), "little"
+    )
+
+
+class _TermIds(dict):
+    """Memo of term ids; most terms repeat across passages."""
+
+    def __missing__(self, term: str) -> int:
+        key = self[term] = term_id(term)
+        return key
+
+
+class Segment:
+    """
+    One immutable batch of indexed passages.
+
+    All arrays are ``.npy`` files opened memory-mapped:
+
+        - ``terms``: sorted term ids (uint64)
+        - ``offsets``: start of each term's postings, plus the end (int64)
+        - ``docs`` / ``tfs``: postings, doc ids ascending within a term
+        - ``max_tfs`` / ``min_lengths``: per term, the highest frequency and
+          the shortest passage among its postings (bounds its BM25 score)
+        - ``lengths``: terms per passage (uint32)
+        - ``passages`` / ``passage_offsets``: passages as UTF-8 JSON records
+
+    Looking a term up is one binary search over ``terms``; only the postings
+    of query terms and the records of returned passages are paged in.
+    """
+
+    FILES = (
+        "terms", "offsets", "docs", "tfs", "max_tfs", "min_lengths",
+        "lengths", "passages", "passage_offsets",
+    )
+
+    def __init__(self, path: Path, arrays: Dict[str, "np.ndarray"]):
+        """
+        Initialize a segment.
+
+        Args:
+            path: Segment directory
+            arrays: Arrays by file name (see class docstring)
+        """
+        self.path = path
+        for name in self.FILES:
+            setattr(self, name, arrays[name])
+        self.size = len(self.lengths)
+        self.total_length = int(self.lengths.sum(dtype=np.int64))
+
+    @classmethod
+    def load(cls, path: Path) -> "Segment":
+        """Memory-map a segment directory."""
+        return cls(path, {
+            name: np.load(path / f"{name}.npy", mmap_mode="r") for name in cls.FILES
+        })
+
+    @staticmethod
+    def write(path: Path, arrays: Dict[str, "np.ndarray"]) -> None:
+        """Write segment arrays to a new directory."""
+        path.mkdir(parents=True)
+        for name in Segment.FILES:
+            np.save(path / f"{name}.npy", arrays[name])
+
+    @staticmethod
+    def build(passages: Iterable[Dict[str, Any]], text_field: str = "text") -> Dict[str, "np.ndarray"]:
+        """
+        Index passages in memory.
+
+        Args:
+            passages: Records with the passage text in ``text_field``; the
+                whole record is stored and returned with search hits
+            text_field: Field holding the passage text
+
+        Returns:
+            Segment arrays, ready for ``write``
+        """
+        ids = _TermIds()
+        posting_terms: List[int] = []
+        posting_docs: List[int] = []
+        posting_tfs: List[int] = []
+        lengths: List[int] = []
+        records = bytearray()
+        record_offsets = [0]
+
+        for doc, passage in enumerate(passages):
+            passage_terms = terms(passage[text_field])
+            counts = Counter(passage_terms)
+            posting_terms.extend(map(ids.__getitem__, counts))
+            posting_docs.extend(repeat(doc, len(counts)))
+            posting_tfs.extend(counts.values())
+            lengths.append(len(passage_terms))
+            records += json.dumps(passage, ensure_ascii=False).encode("utf-8")
+            record_offsets.append(len(records))
+
+        term_array = np.array(posting_terms, dtype=np.uint64)
+        # Stable, so doc ids stay ascending within each term
+        order = np.argsort(term_array, kind="stable")
+        return _postings_arrays(
+            term_array[order],
+            np.array(posting_docs, dtype=np.uint32)[order],
+            np.minimum(np.array(posting_tfs, dtype=np.int64), 0xFFFF).astype(np.uint16)[order],
+            np.array(lengths, dtype=np.uint32),
+            np.frombuffer(bytes(records), dtype=np.uint8),
+            np.array(record_offsets, dtype=np.int64),
+        )
+
+    def postings(self, key: int) -> Optional[Tuple["np.ndarray", "np.ndarray", int, int]]:
+        """
+        Postings of a term, or None if absent.
+
+        Returns:
+            Doc ids, term frequencies, highest frequency, shortest passage
+        """
+        index = int(np.searchsorted(self.terms, np.uint64(key)))
+        if index == len(self.terms) or int(self.terms[index]) != key:
+            return None
+        start, end = int(self.offsets[index]), int(self.offsets[index + 1])
+        return (
+            self.docs[start:end],
+            self.tfs[start:end],
+            int(self.max_tfs[index]),
+            int(self.min_lengths[index]),
+        )
+
+    def passage(self, doc: int) -> Dict[str, Any]:
+        """Stored record of a passage."""
+        start, end = int(self.passage_offsets[doc]), int(self.passage_offsets[doc + 1])
+        return json.loads(bytes(self.passages[start:end]).decode("utf-8"))
+
+
+def _postings_arrays(
+    posting_terms: "np.ndarray",
+    docs: "np.ndarray",
+    tfs: "np.ndarray",
+    lengths: "np.ndarray",
+    passages: "np.ndarray",
+    passage_offsets: "np.ndarray",
+) -> Dict[str, "np.ndarray"]:
+    """Segment arrays from postings sorted by term."""
+    unique_terms, starts = np.unique(posting_terms, return_index=True)
+    if len(starts):
+        max_tfs = np.maximum.reduceat(tfs, starts)
+        min_lengths = np.minimum.reduceat(lengths[docs], starts)
+    else:
+        max_tfs, min_lengths = tfs[:0], lengths[:0]
+    return {
+        "terms": unique_terms.astype(np.uint64),
+        "offsets": np.append(starts, len(posting_terms)).astype(np.int64),
+        "docs": docs,
+        "tfs": tfs,
+        "max_tfs": max_tfs,
+        "min_lengths": min_lengths,
+        "lengths": lengths,
+        "passages": passages,
+        "passage_offsets": passage_offsets,
+    }
+
+
+def _top_docs(scores: "np.ndarray", docs: "np.ndarray", k: int, copies: int) -> "np.ndarray":
+    """
+    The (up to) k distinct docs with the highest scores, best first.
+
+    Args:
+        scores: Accumulated score of every doc in the segment
+        docs: Candidate doc ids, each repeated at most ``copies`` times
+        k: Number of docs
+        copies: Bound on repetitions; the best ``k * copies`` entries then
+            cover the best k distinct docs
+
+    Returns:
+        Doc ids
+    """
+    best = k * copies
+    if len(docs) > best:
+        docs = docs[np.argpartition(-scores[docs], best - 1)[:best]]
+    distinct = np.unique(docs)
+    return distinct[np.argsort(-scores[distinct], kind="stable")[:k]]
+
+
+class KnowledgeBase:
+    """
+    BM25 search over a directory of memory-mapped index segments.
+
+    Each ``add`` writes a new segment, so a knowledge base grows without
+    re-indexing what is already there; ``compact`` merges the segments into
+    one. Document frequencies and the average passage length are summed
+    over all segments, so scores do not depend on how passages were split
+    into segments.
+
+    A query reads only the postings of its own terms and scores them with
+    vectorized numpy operations. With MaxScore pruning, the long postings of
+    frequent terms are only probed at passages that contain a rarer query
+    term, once they can no longer lift another passage into the top k; the
+    results are the same as exhaustive BM25.
+    """
+
+    def __init__(self, path: Union[str, Path], k1: float = 1.2, b: float = 0.75):
+        """
+        Open (or create) a knowledge base.
+
+        Args:
+            path: Knowledge base directory
+            k1: BM25 term-frequency saturation
+            b: BM25 length normalization
+        """
+        if not NUMPY_AVAILABLE:
+            raise ImportError(
+                "NumPy is required for KnowledgeBase. Install it with: pip install numpy"
+            )
+
+        self.path = Path(path)
+        self.k1 = k1
+        self.b = b
+        self.segments: List[Segment] = []
+        # Dense score accumulators per segment, reused across queries
+        self._local = threading.local()
+
+        manifest_path = self.path / MANIFEST
+        if manifest_path.exists():
+            manifest = json.loads(manifest_path.read_text())
+            if manifest.get("format_version") != FORMAT_VERSION:
+                raise ValueError(
+                    f"Unsupported knowledge base format: {manifest.get('format_version')}"
+                )
+            self.segments = [Segment.load(self.path / name) for name in manifest["segments"]]
+            self._next_segment = manifest["next_segment"]
+        else:
+            self._next_segment = 0
+        self._update_stats()
+
+    def add(self, passages: Iterable[Dict[str, Any]], text_field: str = "text") -> int:
+        """
+        Index passages as a new segment.
+
+        Args:
+            passages: Records with the passage text in ``text_field``
+            text_field: Field holding the passage text
+
+        Returns:
+            Number of passages added
+        """
+        arrays = Segment.build(passages, text_field)
+        if not len(arrays["lengths"]):
+            return 0
+        self._replace_segments(self.segments, arrays)
+        return len(arrays["lengths"])
+
+    def compact(self) -> None:
+        """Merge all segments into one."""
+        if len(self.segments) < 2:
+            return
+
+        posting_terms, docs, tfs, lengths, passages, passage_offsets = [], [], [], [], [], []
+        doc_base = 0
+        record_base = 0
+        for segment in self.segments:
+            counts = np.diff(segment.offsets)
+            posting_terms.append(np.repeat(segment.terms, counts))
+            docs.append(np.asarray(segment.docs, dtype=np.uint32) + np.uint32(doc_base))
+            tfs.append(np.asarray(segment.tfs))
+            lengths.append(np.asarray(segment.lengths))
+            passages.append(np.asarray(segment.passages))
+            passage_offsets.append(np.asarray(segment.passage_offsets[:-1]) + record_base)
+            doc_base += segment.size
+            record_base += len(segment.passages)
+        passage_offsets.append(np.array([record_base], dtype=np.int64))
+
+        # Segments are in doc order, so a stable sort keeps docs ascending
+        all_terms = np.concatenate(posting_terms)
+        order = np.argsort(all_terms, kind="stable")
+        arrays = _postings_arrays(
+            all_terms[order],
+            np.concatenate(docs)[order],
+            np.concatenate(tfs)[order],
+            np.concatenate(lengths),
+            np.concatenate(passages),
+            np.concatenate(passage_offsets),
+        )
+        self._replace_segments([], arrays)
+
+    def search(self, query: str, k: int = 3) -> List[Dict[str, Any]]:
+        """
+        Find the passages best matching a query.
+
+        Args:
+            query: Query text (e.g. a claim)
+            k: Number of passages to return
+
+        Returns:
+            Hits, best first, each with the stored "passage" record, its
+            BM25 "score" and "coverage": the share of the query's IDF
+            weight carried by query terms present in the passage
+        """
+        query_ids = sorted({term_id(term) for term in terms(query)})
+        if not query_ids or not self.size:
+            return []
+
+        # Postings of each query term, per segment
+        found = [
+            [(key, segment.postings(key)) for key in query_ids]
+            for segment in self.segments
+        ]
+        df = dict.fromkeys(query_ids, 0)
+        for segment_postings in found:
+            for key, postings in segment_postings:
+                if postings is not None:
+                    df[key] += len(postings[0])
+        idfs = {
+            key: math.log(1 + (self.size - count + 0.5) / (count + 0.5))
+            for key, count in df.items()
+        }
+        total_idf = sum(idfs.values())
+
+        hits = []
+        for index, segment in enumerate(self.segments):
+            term_postings = [
+                (idfs[key], *postings) for key, postings in found[index] if postings is not None
+            ]
+            for score, doc, matched in self._search_segment(segment, term_postings, k):
+                hits.append((score, index, doc, matched))
+
+        hits.sort(key=lambda hit: -hit[0])
+        return [
+            {
+                "passage": self.segments[index].passage(doc),
+                "score": score,
+                "coverage": matched / total_idf if total_idf else 0.0,
+            }
+            for score, index, doc, matched in hits[:k]
+        ]
+
+    def _search_segment(
+        self,
+        segment: Segment,
+        term_postings: List[Tuple[float, "np.ndarray", "np.ndarray", int, int]],
+        k: int,
+    ) -> List[Tuple[float, int, float]]:
+        """
+        Top-k passages of one segment, as (score, doc, matched IDF).
+
+        MaxScore pruning: candidates are collected from the rarest terms
+        first, into dense per-thread accumulators. Once the most the
+        remaining (frequent) terms could add together is below the current
+        k-th score, a passage without any of the rare terms cannot reach the
+        top k, so the frequent terms' long postings lists are only probed at
+        the candidates.
+        """
+        if not term_postings:
+            return []
+        term_postings = sorted(term_postings, key=lambda entry: len(entry[1]))
+        bounds = [
+            idf * max_tf * (self.k1 + 1)
+            / (max_tf + self.k1 * (1 - self.b + self.b * min_length / self.avg_length))
+            for idf, _, _, max_tf, min_length in term_postings
+        ]
+        remaining_bound = [sum(bounds[i:]) for i in range(len(bounds))]
+
+        total_scores, total_matched = self._accumulators(segment)
+        collected: List["np.ndarray"] = []
+        try:
+            probed = len(term_postings)
+            for i, (idf, term_docs, tfs, _, _) in enumerate(term_postings):
+                if collected:
+                    top = _top_docs(total_scores, np.concatenate(collected), k, len(collected))
+                    if len(top) == k and remaining_bound[i] < total_scores[top[-1]]:
+                        probed = i
+                        break
+                term_docs = np.asarray(term_docs)
+                # Doc ids are unique within a term, so fancy += is exact
+                total_scores[term_docs] += self._term_scores(segment, idf, term_docs, tfs)
+                total_matched[term_docs] += idf
+                collected.append(term_docs)
+
+            # Candidates may repeat; a doc gets the same increment for each
+            # copy, so fancy += still adds it once
+            candidates = np.concatenate(collected)
+            for idf, term_docs, tfs, _, _ in term_postings[probed:]:
+                positions = np.searchsorted(term_docs, candidates)
+                present = positions < len(term_docs)
+                present[present] = term_docs[positions[present]] == candidates[present]
+                positions = positions[present]
+                total_scores[candidates[present]] += self._term_scores(
+                    segment, idf, term_docs[positions], tfs[positions]
+                )
+                total_matched[candidates[present]] += idf
+
+            top = _top_docs(total_scores, candidates, k, len(collected))
+            return [
+                (float(total_scores[doc]), int(doc), float(total_matched[doc])) for doc in top
+            ]
+        finally:
+            for term_docs in collected:
+                total_scores[term_docs] = 0.0
+                total_matched[term_docs] = 0.0
+
+    def _accumulators(self, segment: Segment) -> Tuple["np.ndarray", "np.ndarray"]:
+        """Zeroed per-passage score and matched-IDF arrays of this thread."""
+        accumulators = getattr(self._local, "accumulators", None)
+        if accumulators is None:
+            accumulators = self._local.accumulators = {}
+        arrays = accumulators.get(segment.path)
+        if arrays is None or len(arrays[0]) != segment.size:
+            arrays = accumulators[segment.path] = (
+                np.zeros(segment.size), np.zeros(segment.size)
+            )
+        return arrays
+
+    def _term_scores(
+        self, segment: Segment, idf: float, docs: "np.ndarray", tfs: "np.ndarray"
+    ) -> "np.ndarray":
+        """BM25 contribution of one term to the given passages."""
+        tf = tfs.astype(np.float64)
+        norm = self.k1 * (1 - self.b + self.b * segment.lengths[docs] / self.avg_length)
+        return idf * tf * (self.k1 + 1) / (tf + norm)
+
+    def _replace_segments(self, keep: List[Segment], arrays: Dict[str, "np.ndarray"]) -> None:
+        """Write a new segment and publish a manifest of ``keep`` plus it."""
+        name = f"segment-{self._next_segment:06d}"
+        self.path.mkdir(parents=True, exist_ok=True)
+        Segment.write(self.path / name, arrays)
+        self._next_segment += 1
+
+        dropped = [segment for segment in self.segments if segment not in keep]
+        self.segments = list(keep) + [Segment.load(self.path / name)]
+        self._local = threading.local()
+
+        # Publish atomically; readers see the old or the new segment list
+        manifest = {
+            "format_version": FORMAT_VERSION,
+            "segments": [segment.path.name for segment in self.segments],
+            "next_segment": self._next_segment,
+        }
+        temporary = self.path / (MANIFEST + ".tmp")
+        temporary.write_text(json.dumps(manifest))
+        temporary.replace(self.path / MANIFEST)
+
+        for segment in dropped:
+            shutil.rmtree(segment.path, ignore_errors=True)
+        self._update_stats()
+
+        logger.info(
+            "knowledge_base_updated",
+            path=str(self.path),
+            segments=len(self.segments),
+            passages=self.size,
+        )
+
+    def _update_stats(self) -> None:
+        """Collection statistics shared by all segments."""
+        self.size = sum(segment.size for segment in self.segments)
+        total_length = sum(segment.total_length for segment in self.segments)
+        self.avg_length = total_length / self.size if self.size else 0.0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get index statistics."""
+        return {
+            "passages": self.size,
+            "segments": len(self.segments),
+            "avg_length": self.avg_length,
+        }
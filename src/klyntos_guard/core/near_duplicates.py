@@ -0,0 +1,268 @@
+"""MinHash/LSH index of recently seen prompts for campaign detection."""
+
+import itertools
+import time
+import zlib
+from collections import Counter, deque
+from typing import Any, Dict, Optional
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Prime just above 2**32: 32-bit shingle hashes times 32-bit coefficients
+# stay below 2**64, so the permutations never overflow uint64.
+_PRIME = 4294967311
+
+
+class NearDuplicateIndex:
+    """
+    Sliding-window near-duplicate index over prompts.
+
+    Prompts are reduced to MinHash signatures over character shingles and
+    bucketed by LSH bands, so a lookup only compares against prompts that
+    share at least one band. Entries expire after ``window_seconds`` or
+    when more than ``max_entries`` are held.
+
+    Near-duplicates are grouped into campaign clusters. Only prompts that
+    were actually evaluated by the rails are stored as entries; prompts
+    answered from a prior verdict are counted towards their cluster but
+    never become anchors themselves, so a chain of small mutations cannot
+    drift away from the prompt that was really checked.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        num_perm: int = 64,
+        bands: int = 16,
+        shingle_size: int = 5,
+        max_chars: int = 8192,
+        window_seconds: float = 600.0,
+        max_entries: int = 50000,
+        seed: int = 1,
+    ):
+        """
+        Initialize the index.
+
+        Args:
+            threshold: Minimum estimated Jaccard similarity for a near-duplicate
+            num_perm: Number of MinHash permutations
+            bands: Number of LSH bands (must divide num_perm)
+            shingle_size: Character shingle length
+            max_chars: Only the first max_chars characters are shingled
+            window_seconds: How long entries and cluster counts are kept
+            max_entries: Maximum number of stored entries
+            seed: Seed for the permutation coefficients
+        """
+        if not NUMPY_AVAILABLE:
+            raise ImportError(
+                "NumPy is required for near-duplicate detection. "
+                "Install it with: pip install numpy"
+            )
+        if num_perm % bands:
+            raise ValueError("bands must divide num_perm")
+
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.max_chars = max_chars
+        self.window_seconds = window_seconds
+        self.max_entries = max_entries
+
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+        self._entries: Dict[int, Dict[str, Any]] = {}
+        self._order: deque = deque()
+        self._buckets: Dict[bytes, Dict[int, None]] = {}
+        self._ids = itertools.count()
+
+        self._cluster_events: deque = deque()
+        self._cluster_counts: Counter = Counter()
+        self._cluster_verdicts: Dict[int, str] = {}
+        self.stats = {"lookups": 0, "hits_blocked": 0, "hits_allowed": 0}
+
+    def signature(self, text: str) -> "np.ndarray":
+        """
+        Compute the MinHash signature of a (normalized) text.
+
+        Args:
+            text: Text to sign
+
+        Returns:
+            uint64 array of length num_perm
+        """
+        text = text[:self.max_chars]
+        k = self.shingle_size
+        if len(text) <= k:
+            shingles = {text}
+        else:
+            shingles = {text[i:i + k] for i in range(len(text) - k + 1)}
+
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode("utf-8")) for s in shingles),
+            dtype=np.uint64,
+            count=len(shingles),
+        )
+        permuted = (hashes[:, None] * self._a[None, :] + self._b[None, :]) % _PRIME
+        return permuted.min(axis=0)
+
+    def query(self, signature: "np.ndarray") -> Optional[Dict[str, Any]]:
+        """
+        Find the most similar stored prompt.
+
+        Args:
+            signature: Signature from ``signature``
+
+        Returns:
+            Dictionary with entry_id, similarity, verdict, cluster_id and the
+            stored payload, or None if there is no near-duplicate
+        """
+        self._expire(time.monotonic())
+        self.stats["lookups"] += 1
+
+        candidates = set()
+        for key in self._band_keys(signature):
+            candidates.update(self._buckets.get(key, ()))
+
+        best = None
+        best_similarity = self.threshold
+        for entry_id in candidates:
+            entry = self._entries[entry_id]
+            similarity = float(np.mean(entry["signature"] == signature))
+            if similarity >= best_similarity:
+                best, best_similarity = entry_id, similarity
+
+        if best is None:
+            return None
+
+        entry = self._entries[best]
+        self.stats["hits_blocked" if entry["verdict"] == "blocked" else "hits_allowed"] += 1
+        return {
+            "entry_id": best,
+            "similarity": best_similarity,
+            "verdict": entry["verdict"],
+            "cluster_id": entry["cluster_id"],
+            "payload": entry["payload"],
+        }
+
+    def add(
+        self,
+        signature: "np.ndarray",
+        verdict: str,
+        payload: Optional[Dict[str, Any]] = None,
+        cluster_id: Optional[int] = None,
+    ) -> int:
+        """
+        Store an evaluated prompt.
+
+        Args:
+            signature: Signature from ``signature``
+            verdict: "blocked" or "allowed"
+            payload: Data to return on later matches (e.g. violations)
+            cluster_id: Cluster to join (a new cluster if None)
+
+        Returns:
+            The entry id
+        """
+        now = time.monotonic()
+        self._expire(now)
+
+        entry_id = next(self._ids)
+        if cluster_id is None:
+            cluster_id = entry_id
+
+        self._entries[entry_id] = {
+            "signature": signature,
+            "verdict": verdict,
+            "payload": payload,
+            "cluster_id": cluster_id,
+            "timestamp": now,
+        }
+        self._order.append(entry_id)
+        for key in self._band_keys(signature):
+            self._buckets.setdefault(key, {})[entry_id] = None
+
+        self.observe(cluster_id, verdict)
+
+        while len(self._entries) > self.max_entries:
+            self._evict(self._order.popleft())
+        return entry_id
+
+    def observe(self, cluster_id: int, verdict: str) -> None:
+        """Count a prompt towards a campaign cluster."""
+        self._cluster_events.append((time.monotonic(), cluster_id))
+        self._cluster_counts[cluster_id] += 1
+        self._cluster_verdicts[cluster_id] = verdict
+
+        # Bound memory under sustained spikes, not just by time
+        while len(self._cluster_events) > self.max_entries * 4:
+            self._drop_cluster_event()
+
+    def get_stats(self, top: int = 10) -> Dict[str, Any]:
+        """
+        Get index and campaign-cluster metrics for the current window.
+
+        Args:
+            top: Number of largest clusters to report
+
+        Returns:
+            Dictionary of metrics
+        """
+        self._expire(time.monotonic())
+        campaigns = [
+            {
+                "cluster_id": cluster_id,
+                "count": count,
+                "verdict": self._cluster_verdicts.get(cluster_id),
+            }
+            for cluster_id, count in self._cluster_counts.most_common(top)
+            if count > 1
+        ]
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "clusters": len(self._cluster_counts),
+            "campaign_clusters": sum(1 for c in self._cluster_counts.values() if c > 1),
+            "top_clusters": campaigns,
+        }
+
+    def _band_keys(self, signature: "np.ndarray"):
+        """LSH bucket keys, one per band."""
+        rows = self.rows
+        for band in range(self.bands):
+            yield band.to_bytes(2, "little") + signature[band * rows:(band + 1) * rows].tobytes()
+
+    def _expire(self, now: float) -> None:
+        """Drop entries and cluster events that left the time window."""
+        cutoff = now - self.window_seconds
+        while self._order and self._entries[self._order[0]]["timestamp"] < cutoff:
+            self._evict(self._order.popleft())
+
+        while self._cluster_events and self._cluster_events[0][0] < cutoff:
+            self._drop_cluster_event()
+
+    def _drop_cluster_event(self) -> None:
+        """Forget the oldest cluster observation."""
+        _, cluster_id = self._cluster_events.popleft()
+        self._cluster_counts[cluster_id] -= 1
+        if self._cluster_counts[cluster_id] <= 0:
+            del self._cluster_counts[cluster_id]
+            self._cluster_verdicts.pop(cluster_id, None)
+
+    def _evict(self, entry_id: int) -> None:
+        """Remove an entry and its bucket references."""
+        entry = self._entries.pop(entry_id)
+        for key in self._band_keys(entry["signature"]):
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                continue
+            bucket.pop(entry_id, None)
+            if not bucket:
+                del self._buckets[key]
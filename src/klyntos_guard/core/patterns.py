@@ -0,0 +1,120 @@
+"""Process-wide cache of compiled regex patterns."""
+
+import re
+import threading
+import weakref
+from typing import Dict, Iterable, Iterator, Pattern, Sequence, Tuple
+
+PatternKey = Tuple[str, int]
+PatternListKey = Tuple[Tuple[str, ...], int]
+
+# Entries live as long as some rail holds the compiled object
+_patterns: "weakref.WeakValueDictionary[PatternKey, Pattern]" = weakref.WeakValueDictionary()
+_lists: "weakref.WeakValueDictionary[PatternListKey, PatternList]" = weakref.WeakValueDictionary()
+_stats = {
+    "patterns_requested": 0,
+    "patterns_compiled": 0,
+    "lists_requested": 0,
+    "lists_compiled": 0,
+}
+_lock = threading.Lock()
+
+
+class PatternList(Sequence[Pattern]):
+    """
+    Immutable list of compiled patterns, shared by every rail that asks for
+    the same pattern strings and flags.
+    """
+
+    __slots__ = ("patterns", "flags", "__weakref__")
+
+    def __init__(self, patterns: Tuple[Pattern, ...], flags: int):
+        self.patterns = patterns
+        self.flags = flags
+
+    def __getitem__(self, index):  # type: ignore[override]
+        return self.patterns[index]
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def __iter__(self) -> Iterator[Pattern]:
+        return iter(self.patterns)
+
+
+def _flags(flags: int) -> int:
+    """Flags in canonical form (re.UNICODE is implied for str patterns)."""
+    return int(flags) & ~re.UNICODE
+
+
+def compile_pattern(pattern: str, flags: int = 0) -> Pattern:
+    """
+    Get the shared compiled form of a pattern, compiling it on first use.
+
+    Unlike ``re``'s own bounded cache, entries are kept while any rail still
+    uses them, however many tenants' engines hold patterns.
+
+    Args:
+        pattern: Regex source
+        flags: ``re`` flags
+
+    Returns:
+        The compiled pattern
+    """
+    key = (pattern, _flags(flags))
+    with _lock:
+        _stats["patterns_requested"] += 1
+        compiled = _patterns.get(key)
+        if compiled is None:
+            compiled = re.compile(pattern, flags)
+            _patterns[key] = compiled
+            _stats["patterns_compiled"] += 1
+    return compiled
+
+
+def compile_patterns(patterns: Iterable[str], flags: int = 0) -> PatternList:
+    """
+    Get the shared compiled form of a pattern list.
+
+    Identical lists (same patterns in the same order, same flags) resolve
+    to the same PatternList; lists that only share some patterns still
+    share those compiled patterns.
+
+    Args:
+        patterns: Regex sources
+        flags: ``re`` flags applied to every pattern
+
+    Returns:
+        The compiled patterns, in order
+    """
+    key = (tuple(patterns), _flags(flags))
+    with _lock:
+        _stats["lists_requested"] += 1
+        compiled = _lists.get(key)
+        if compiled is not None:
+            return compiled
+
+    compiled = PatternList(tuple(compile_pattern(p, flags) for p in key[0]), key[1])
+    with _lock:
+        # Another thread may have built the same list meanwhile
+        existing = _lists.get(key)
+        if existing is not None:
+            return existing
+        _lists[key] = compiled
+        _stats["lists_compiled"] += 1
+    return compiled
+
+
+def get_pattern_cache_stats() -> Dict[str, int]:
+    """
+    Requested vs actually compiled patterns and lists, process-wide.
+
+    Returns:
+        Counters since start, plus the number of entries still in use
+    """
+    with _lock:
+        return {
+            **_stats,
+            "patterns_live": len(_patterns),
+            "lists_live": len(_lists),
+        }
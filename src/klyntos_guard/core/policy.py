@@ -0,0 +1,302 @@
+"""Fused matching of the pattern rules of all rails in a stage."""
+
+import re
+import threading
+import weakref
+from typing import Any, Dict, FrozenSet, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+try:  # Python 3.11+
+    from re import _constants as sre_constants
+    from re import _parser as sre_parse
+except ImportError:  # pragma: no cover
+    import sre_constants  # type: ignore[no-redef]
+    import sre_parse  # type: ignore[no-redef]
+
+# (owner, rule name, compiled pattern); owner is the id() of the rail
+Rule = Tuple[int, Hashable, "re.Pattern"]
+
+# Anchors per pattern: more alternatives make a weak filter
+MAX_ANCHORS = 64
+# Character classes up to this size become single-character anchors
+MAX_CLASS_SIZE = 16
+
+_LITERAL = sre_constants.LITERAL
+_IN = sre_constants.IN
+_RANGE = sre_constants.RANGE
+_CATEGORY = sre_constants.CATEGORY
+_BRANCH = sre_constants.BRANCH
+_SUBPATTERN = sre_constants.SUBPATTERN
+_ASSERT = sre_constants.ASSERT
+_REPEATS = tuple(
+    op for op in (
+        sre_constants.MAX_REPEAT,
+        sre_constants.MIN_REPEAT,
+        getattr(sre_constants, "POSSESSIVE_REPEAT", None),
+    ) if op is not None
+)
+_ATOMIC_GROUP = getattr(sre_constants, "ATOMIC_GROUP", None)
+
+_NO_MATCHES: Sequence[Any] = ()
+
+# Anchors per compiled pattern; patterns are shared through
+# klyntos_guard.core.patterns, so each is parsed once per process
+_anchor_cache: "weakref.WeakKeyDictionary[re.Pattern, _Anchors]" = weakref.WeakKeyDictionary()
+_anchor_lock = threading.Lock()
+
+
+class _Anchors:
+    """
+    Literal strings of which every match of a pattern contains one.
+
+    Walks the parsed pattern: in a sequence, each run of literals and each
+    required item (group, repeat with a minimum, alternation whose branches
+    all have anchors, small character class, lookahead) is a candidate, and
+    the candidate with the longest shortest alternative wins.
+    """
+
+    def __init__(self, pattern: "re.Pattern"):
+        self.ignorecase = bool(pattern.flags & re.IGNORECASE)
+        # \d is matched as ASCII digits, which is only exact on ASCII text
+        self.ascii_only = False
+        try:
+            parsed = sre_parse.parse(pattern.pattern, pattern.flags)
+        except Exception:
+            self.strings: Optional[FrozenSet[str]] = None
+            return
+        if parsed.state.flags & re.IGNORECASE:
+            self.ignorecase = True
+
+        strings = self._sequence(list(parsed))
+        if strings is not None and self.ignorecase:
+            # Case-insensitive rules are filtered on lowercased ASCII text
+            strings = frozenset(string.lower() for string in strings)
+            if not all(string.isascii() for string in strings):
+                strings = None
+        self.strings = strings
+
+    def _sequence(self, items: List[Tuple[Any, Any]]) -> Optional[FrozenSet[str]]:
+        """Best anchor set of a sequence of parsed items."""
+        candidates = []
+        run: List[str] = []
+        for op, av in items:
+            if op is _LITERAL:
+                run.append(chr(av))
+                continue
+            if run:
+                candidates.append(frozenset(["".join(run)]))
+                run = []
+            item = self._item(op, av)
+            if item:
+                candidates.append(item)
+        if run:
+            candidates.append(frozenset(["".join(run)]))
+
+        return max(
+            candidates,
+            key=lambda strings: (min(map(len, strings)), -len(strings)),
+            default=None,
+        )
+
+    def _item(self, op: Any, av: Any) -> Optional[FrozenSet[str]]:
+        """Anchor set of one required item, or None."""
+        if op is _SUBPATTERN:
+            if av[1] & re.IGNORECASE:
+                self.ignorecase = True
+            return self._sequence(list(av[-1]))
+        if op in _REPEATS:
+            low, _, item = av
+            return self._sequence(list(item)) if low >= 1 else None
+        if op is _ATOMIC_GROUP:
+            return self._sequence(list(av))
+        if op is _ASSERT:
+            # A positive lookaround still has to match somewhere in the text
+            return self._sequence(list(av[1]))
+        if op is _BRANCH:
+            branches = [self._sequence(list(branch)) for branch in av[1]]
+            if not all(branches):
+                return None
+            union = frozenset().union(*branches)
+            return union if len(union) <= MAX_ANCHORS else None
+        if op is _IN:
+            return self._class(av)
+        return None
+
+    def _class(self, items: List[Tuple[Any, Any]]) -> Optional[FrozenSet[str]]:
+        """Characters of a small, non-negated character class."""
+        chars = set()
+        for op, av in items:
+            if op is _LITERAL:
+                chars.add(chr(av))
+            elif op is _RANGE and av[1] - av[0] < MAX_CLASS_SIZE:
+                chars.update(chr(code) for code in range(av[0], av[1] + 1))
+            elif op is _CATEGORY and av is sre_constants.CATEGORY_DIGIT:
+                self.ascii_only = True
+                chars.update("0123456789")
+            else:
+                return None
+            if len(chars) > MAX_CLASS_SIZE:
+                return None
+        return frozenset(chars) if chars else None
+
+
+def _anchors(pattern: "re.Pattern") -> _Anchors:
+    """Anchors of a pattern, extracted once per compiled pattern."""
+    with _anchor_lock:
+        anchors = _anchor_cache.get(pattern)
+    if anchors is None:
+        anchors = _Anchors(pattern)
+        with _anchor_lock:
+            _anchor_cache[pattern] = anchors
+    return anchors
+
+
+class PatternSet:
+    """
+    The pattern rules of several rails over one text form, run as one scan.
+
+    CPython's ``re`` has no multi-pattern automaton, and one alternation of
+    all patterns is slower than running them one by one. Instead, each
+    distinct pattern gets the literal anchors every match must contain.
+    A scan first checks all anchors of all rails at once, as substring
+    tests on the text, then runs only the patterns whose anchors occur.
+    Patterns are deduplicated across rails, and patterns without anchors
+    always run.
+
+    Skipping is exact: a skipped pattern cannot match. Case-insensitive
+    patterns and patterns anchored on ``\\d`` only skip on ASCII text.
+    """
+
+    def __init__(self, rules: Iterable[Rule]):
+        """
+        Build the set.
+
+        Args:
+            rules: (owner, name, pattern) rules
+        """
+        self._rules: List[Tuple[int, Hashable, int]] = []
+        self.patterns: List["re.Pattern"] = []
+        index_of: Dict[Tuple[str, int], int] = {}
+        for owner, name, pattern in rules:
+            key = (pattern.pattern, pattern.flags)
+            index = index_of.get(key)
+            if index is None:
+                index = index_of[key] = len(self.patterns)
+                self.patterns.append(pattern)
+            self._rules.append((owner, name, index))
+        self.owners = frozenset(owner for owner, _, _ in self._rules)
+
+        self._always: List[int] = []
+        # Patterns that run on non-ASCII text whatever their anchors
+        self._unicode_always: List[int] = []
+        self._anchors: Dict[str, List[int]] = {}
+        self._lowered_anchors: Dict[str, List[int]] = {}
+        for index, pattern in enumerate(self.patterns):
+            anchors = _anchors(pattern)
+            if anchors.strings is None:
+                self._always.append(index)
+                continue
+            if anchors.ignorecase or anchors.ascii_only:
+                self._unicode_always.append(index)
+            table = self._lowered_anchors if anchors.ignorecase else self._anchors
+            for string in anchors.strings:
+                table.setdefault(string, []).append(index)
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+    def candidates(self, text: str) -> List[int]:
+        """Indices of the patterns that may match the text."""
+        candidates = set(self._always)
+        is_ascii = text.isascii()
+        if not is_ascii:
+            candidates.update(self._unicode_always)
+
+        for string, indices in self._anchors.items():
+            if string in text:
+                candidates.update(indices)
+        if is_ascii and self._lowered_anchors:
+            lowered = text.lower()
+            for string, indices in self._lowered_anchors.items():
+                if string in lowered:
+                    candidates.update(indices)
+        return sorted(candidates)
+
+    def scan(self, text: str) -> Dict[int, Dict[Hashable, Sequence["re.Match"]]]:
+        """
+        Match every rule against a text.
+
+        Args:
+            text: Text in this set's form
+
+        Returns:
+            For each owner, the ``finditer`` matches of each of its rules
+            (empty for rules that cannot match)
+        """
+        patterns = self.patterns
+        found = {
+            index: matches
+            for index in self.candidates(text)
+            for matches in [list(patterns[index].finditer(text))]
+            if matches
+        }
+
+        by_owner: Dict[int, Dict[Hashable, Sequence["re.Match"]]] = {
+            owner: {} for owner in self.owners
+        }
+        for owner, name, index in self._rules:
+            by_owner[owner][name] = found.get(index, _NO_MATCHES)
+        return by_owner
+
+    def get_stats(self) -> Dict[str, int]:
+        """Rule and anchor counts."""
+        return {
+            "rules": len(self._rules),
+            "patterns": len(self.patterns),
+            "unanchored_patterns": len(self._always),
+            "anchors": len(self._anchors) + len(self._lowered_anchors),
+        }
+
+
+class StagePolicy:
+    """
+    Pattern rules of all rails of one stage, one PatternSet per text form.
+
+    Compiled by the engine from each rail's ``pattern_rules``. Rails read
+    their matches through ``ProcessingContext.pattern_matches``, which scans
+    a text form at most once per request for all rails of the stage.
+    """
+
+    def __init__(self, forms: Dict[str, PatternSet]):
+        """
+        Initialize the policy.
+
+        Args:
+            forms: Rules per TextView form name
+        """
+        self.forms = forms
+
+    @classmethod
+    def from_rails(cls, rails: Iterable[Any], stage: Any) -> Optional["StagePolicy"]:
+        """
+        Collect the pattern rules of a stage's rails.
+
+        Args:
+            rails: Rails of the stage
+            stage: RailType of the stage
+
+        Returns:
+            The policy, or None if no rail has pattern rules
+        """
+        rules: Dict[str, List[Rule]] = {}
+        for rail in rails:
+            for form, named in rail.pattern_rules(stage).items():
+                rules.setdefault(form, []).extend(
+                    (id(rail), name, pattern) for name, pattern in named.items()
+                )
+        if not rules:
+            return None
+        return cls({form: PatternSet(form_rules) for form, form_rules in rules.items()})
+
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        """Rule and anchor counts per form."""
+        return {form: patterns.get_stats() for form, patterns in self.forms.items()}
@@ -0,0 +1,110 @@
+"""Process-wide pool of Presidio analyzer engines."""
+
+import importlib.util
+import threading
+from typing import TYPE_CHECKING, Dict, Optional, Sequence, Tuple
+
+import structlog
+
+if TYPE_CHECKING:
+    from presidio_analyzer import AnalyzerEngine
+
+# Presidio pulls in spaCy, so it is only imported when an engine is created
+PRESIDIO_AVAILABLE = importlib.util.find_spec("presidio_analyzer") is not None
+
+logger = structlog.get_logger(__name__)
+
+# (language, recognizer names or None for all, spaCy model or None for the
+# default, disabled pipeline components)
+AnalyzerKey = Tuple[str, Optional[Tuple[str, ...]], Optional[str], Tuple[str, ...]]
+
+_analyzers: Dict[AnalyzerKey, "AnalyzerEngine"] = {}
+_lock = threading.Lock()
+
+
+def get_analyzer(
+    language: str = "en",
+    recognizers: Optional[Sequence[str]] = None,
+    model_name: Optional[str] = None,
+    disable: Sequence[str] = (),
+) -> "AnalyzerEngine":
+    """
+    Get a shared analyzer engine, creating it on first use.
+
+    Loading spaCy models is slow and memory-hungry, so every rail that asks
+    for the same configuration gets the same engine.
+
+    Args:
+        language: Language code
+        recognizers: Names of the recognizers to keep (all if None)
+        model_name: spaCy model to load instead of Presidio's default
+        disable: spaCy pipeline components to disable (needs model_name)
+
+    Returns:
+        The shared AnalyzerEngine
+    """
+    if not PRESIDIO_AVAILABLE:
+        raise ImportError(
+            "Presidio is required for PII analysis. "
+            "Install it with: pip install presidio-analyzer"
+        )
+
+    key: AnalyzerKey = (
+        language,
+        tuple(sorted(recognizers)) if recognizers is not None else None,
+        model_name,
+        tuple(sorted(disable)),
+    )
+    analyzer = _analyzers.get(key)
+    if analyzer is not None:
+        return analyzer
+
+    with _lock:
+        analyzer = _analyzers.get(key)
+        if analyzer is None:
+            analyzer = _create_analyzer(*key)
+            _analyzers[key] = analyzer
+            logger.info(
+                "presidio_analyzer_created",
+                language=language,
+                recognizers=key[1],
+                model_name=model_name,
+            )
+    return analyzer
+
+
+def pool_size() -> int:
+    """Number of analyzer engines currently loaded."""
+    return len(_analyzers)
+
+
+def _create_analyzer(
+    language: str,
+    recognizers: Optional[Tuple[str, ...]],
+    model_name: Optional[str],
+    disable: Tuple[str, ...],
+) -> "AnalyzerEngine":
+    """Build an analyzer for one pool key."""
+    from presidio_analyzer import AnalyzerEngine
+    from presidio_analyzer.nlp_engine import NlpEngineProvider
+
+    if model_name:
+        nlp_engine = NlpEngineProvider(nlp_configuration={
+            "nlp_engine_name": "spacy",
+            "models": [{"lang_code": language, "model_name": model_name}],
+        }).create_engine()
+        pipeline = nlp_engine.get_nlp(language)
+        for component in disable:
+            if component in pipeline.pipe_names:
+                pipeline.disable_pipe(component)
+        analyzer = AnalyzerEngine(nlp_engine=nlp_engine, supported_languages=[language])
+    else:
+        analyzer = AnalyzerEngine()
+
+    if recognizers is not None:
+        keep = set(recognizers)
+        for recognizer in list(analyzer.registry.recognizers):
+            if recognizer.name not in keep:
+                analyzer.registry.remove_recognizer(recognizer.name)
+
+    return analyzer
@@ -0,0 +1,382 @@
+"""Per-session running state for rails that look across conversation turns."""
+
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Type, TypeVar
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+T = TypeVar("T")
+
+
+def session_key(tenant_id: Optional[str], session_id: Optional[str]) -> Optional[str]:
+    """
+    Store key of a conversation.
+
+    Args:
+        tenant_id: Tenant of the request (None for the default tenant)
+        session_id: Conversation id
+
+    Returns:
+        The key, or None for requests without a session
+    """
+    if not session_id:
+        return None
+    return f"{tenant_id or 'default'}:{session_id}"
+
+
+class SessionState:
+    """
+    Compact running counters of one conversation.
+
+    Holds what dialog rails need to judge the conversation so far (streaks,
+    counts, the last few topic labels) instead of its raw history, so a
+    session costs a few hundred bytes whatever its length. The engine also
+    keeps the verdicts of already-checked messages here, by fingerprint;
+    message text is only stored when rails transformed it.
+    """
+
+    __slots__ = (
+        "turns",
+        "off_topic_streak",
+        "failed_attempts",
+        "recent_topics",
+        "counters",
+        "verdicts",
+        "history_size",
+    )
+
+    def __init__(self, history_size: int = 8):
+        """
+        Initialize an empty state.
+
+        Args:
+            history_size: Number of topic labels kept in recent_topics
+        """
+        self.turns = 0
+        self.off_topic_streak = 0
+        self.failed_attempts = 0
+        self.recent_topics: List[str] = []
+        # Named counters owned by individual rails
+        self.counters: Dict[str, float] = {}
+        # Message fingerprint -> verdict, oldest first
+        self.verdicts: Dict[str, Dict[str, Any]] = {}
+        self.history_size = history_size
+
+    def push_topic(self, topic: str) -> None:
+        """Record the topic of a turn, keeping only the last history_size."""
+        self.recent_topics.append(topic)
+        if len(self.recent_topics) > self.history_size:
+            del self.recent_topics[:-self.history_size]
+
+    def remember_verdicts(self, verdicts: Dict[str, Dict[str, Any]], limit: int) -> None:
+        """Add message verdicts, keeping only the newest limit."""
+        self.verdicts.update(verdicts)
+        excess = len(self.verdicts) - limit
+        if excess > 0:
+            for fingerprint in list(self.verdicts)[:excess]:
+                del self.verdicts[fingerprint]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializable form of the state."""
+        return {
+            "turns": self.turns,
+            "off_topic_streak": self.off_topic_streak,
+            "failed_attempts": self.failed_attempts,
+            "recent_topics": self.recent_topics,
+            "counters": self.counters,
+            "verdicts": self.verdicts,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], history_size: int = 8) -> "SessionState":
+        """Rebuild a state from ``to_dict`` output."""
+        state = cls(history_size)
+        state.turns = data.get("turns", 0)
+        state.off_topic_streak = data.get("off_topic_streak", 0)
+        state.failed_attempts = data.get("failed_attempts", 0)
+        state.recent_topics = list(data.get("recent_topics", []))[-history_size:]
+        state.counters = dict(data.get("counters", {}))
+        state.verdicts = dict(data.get("verdicts", {}))
+        return state
+
+
+class SessionStore(ABC):
+    """
+    Store of SessionState by session key.
+
+    ``update`` is the only way to change a state: it runs a function on the
+    current state and saves the result atomically, so concurrent requests of
+    one session never lose each other's updates. The function must not
+    await and may be called more than once (backends may retry on
+    conflict), so it should only touch the state it is given.
+    """
+
+    def __init__(self, ttl_seconds: float = 1800.0, history_size: int = 8):
+        """
+        Initialize the store.
+
+        Args:
+            ttl_seconds: Idle time after which a session is forgotten
+            history_size: Number of topic labels kept per session
+        """
+        self.ttl_seconds = ttl_seconds
+        self.history_size = history_size
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[SessionState]:
+        """Get a copy of a session's state, or None if unknown or expired."""
+        pass
+
+    @abstractmethod
+    async def update(self, key: str, fn: Callable[[SessionState], T]) -> T:
+        """
+        Atomically update a session's state.
+
+        Args:
+            key: Session key (see session_key)
+            fn: Mutates the state in place; its return value is passed through
+
+        Returns:
+            What fn returned
+        """
+        pass
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """Forget a session."""
+        pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get store statistics."""
+        return {"backend": self.__class__.__name__}
+
+
+class InMemorySessionStore(SessionStore):
+    """
+    Process-local session store with LRU eviction and idle expiry.
+
+    At most ``max_sessions`` states are held; the least recently used one
+    is evicted first, and states idle for longer than the TTL are dropped
+    as they reach the LRU end.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = 50000,
+        ttl_seconds: float = 1800.0,
+        history_size: int = 8,
+    ):
+        """
+        Initialize the store.
+
+        Args:
+            max_sessions: Maximum number of sessions held
+            ttl_seconds: Idle time after which a session is forgotten
+            history_size: Number of topic labels kept per session
+        """
+        super().__init__(ttl_seconds, history_size)
+        self.max_sessions = max_sessions
+        # key -> (last update time, state), least recently used first
+        self._sessions: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    async def get(self, key: str) -> Optional[SessionState]:
+        """Get a copy of a session's state, or None if unknown or expired."""
+        with self._lock:
+            state = self._live(key, time.monotonic())
+            if state is None:
+                return None
+            return SessionState.from_dict(state.to_dict(), self.history_size)
+
+    async def update(self, key: str, fn: Callable[[SessionState], T]) -> T:
+        """Atomically update a session's state."""
+        with self._lock:
+            now = time.monotonic()
+            state = self._live(key, now)
+            if state is None:
+                state = SessionState(self.history_size)
+            result = fn(state)
+            self._sessions[key] = (now, state)
+            self._sessions.move_to_end(key)
+            self._evict(now)
+            return result
+
+    async def delete(self, key: str) -> None:
+        """Forget a session."""
+        with self._lock:
+            self._sessions.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get store statistics."""
+        return {
+            "backend": "memory",
+            "sessions": len(self._sessions),
+            "max_sessions": self.max_sessions,
+            "evictions": self.evictions,
+        }
+
+    def _live(self, key: str, now: float) -> Optional[SessionState]:
+        """State of a session unless it has expired."""
+        entry = self._sessions.get(key)
+        if entry is None:
+            return None
+        if now - entry[0] > self.ttl_seconds:
+            del self._sessions[key]
+            return None
+        return entry[1]
+
+    def _evict(self, now: float) -> None:
+        """Drop expired sessions and the oldest ones beyond capacity."""
+        sessions = self._sessions
+        while sessions:
+            updated_at, _ = next(iter(sessions.values()))
+            if len(sessions) <= self.max_sessions and now - updated_at <= self.ttl_seconds:
+                break
+            sessions.popitem(last=False)
+            self.evictions += 1
+
+
+class RedisSessionStore(SessionStore):
+    """
+    Session store shared by several processes through Redis.
+
+    States are stored as small JSON strings that expire after the TTL.
+    Updates use optimistic transactions (WATCH/MULTI) and are retried on
+    conflict. ``client`` is a ``redis.asyncio`` client, or anything with the
+    same pipeline interface (e.g. fakeredis, or an in-process stand-in that
+    passes its own ``watch_error``).
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        ttl_seconds: float = 1800.0,
+        history_size: int = 8,
+        prefix: str = "kg:session:",
+        max_retries: int = 10,
+        watch_error: Optional[Type[Exception]] = None,
+    ):
+        """
+        Initialize the store.
+
+        Args:
+            client: Async Redis client
+            ttl_seconds: Idle time after which a session is forgotten
+            history_size: Number of topic labels kept per session
+            prefix: Prefix of the Redis keys
+            max_retries: Attempts per update before giving up
+            watch_error: Exception the client raises when a watched key
+                changed (default: redis.exceptions.WatchError)
+        """
+        super().__init__(ttl_seconds, history_size)
+        self.client = client
+        self.prefix = prefix
+        self.max_retries = max_retries
+        self.watch_error = watch_error
+        self.conflicts = 0
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs: Any) -> "RedisSessionStore":
+        """
+        Connect to Redis by URL.
+
+        Args:
+            url: Redis URL (e.g. redis://localhost:6379/0)
+            **kwargs: Passed to the constructor
+
+        Returns:
+            The store
+        """
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise ImportError(
+                "redis is required for the Redis session store. "
+                "Install it with: pip install redis"
+            )
+        return cls(redis.from_url(url), **kwargs)
+
+    async def get(self, key: str) -> Optional[SessionState]:
+        """Get a session's state, or None if unknown or expired."""
+        raw = await self.client.get(self.prefix + key)
+        if raw is None:
+            return None
+        return SessionState.from_dict(json.loads(raw), self.history_size)
+
+    async def update(self, key: str, fn: Callable[[SessionState], T]) -> T:
+        """Atomically update a session's state."""
+        if self.watch_error is None:
+            from redis.exceptions import WatchError
+
+            self.watch_error = WatchError
+
+        redis_key = self.prefix + key
+        ttl = max(int(self.ttl_seconds), 1)
+        for _ in range(self.max_retries):
+            async with self.client.pipeline(transaction=True) as pipe:
+                try:
+                    await pipe.watch(redis_key)
+                    raw = await pipe.get(redis_key)
+                    state = (
+                        SessionState.from_dict(json.loads(raw), self.history_size)
+                        if raw is not None else SessionState(self.history_size)
+                    )
+                    result = fn(state)
+                    pipe.multi()
+                    pipe.set(
+                        redis_key,
+                        json.dumps(state.to_dict(), separators=(",", ":")),
+                        ex=ttl,
+                    )
+                    await pipe.execute()
+                    return result
+                except self.watch_error:
+                    self.conflicts += 1
+                    continue
+
+        raise RuntimeError(f"Session update for {key!r} kept conflicting")
+
+    async def delete(self, key: str) -> None:
+        """Forget a session."""
+        await self.client.delete(self.prefix + key)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get store statistics."""
+        return {"backend": "redis", "conflicts": self.conflicts}
+
+
+def create_session_store(config: Dict[str, Any]) -> SessionStore:
+    """
+    Build the session store described by the ``sessions`` settings.
+
+    Args:
+        config: Settings with backend (memory, redis), max_sessions,
+            ttl_seconds, history_size and redis_url
+
+    Returns:
+        The configured store
+    """
+    backend = config.get("backend", "memory")
+    common = {
+        "ttl_seconds": config.get("ttl_seconds", 1800),
+        "history_size": config.get("history_size", 8),
+    }
+    if backend == "redis":
+        return RedisSessionStore.from_url(
+            config.get("redis_url", "redis://localhost:6379/0"), **common
+        )
+    if backend == "memory":
+        return InMemorySessionStore(
+            max_sessions=config.get("max_sessions", 50000), **common
+        )
+    raise ValueError(f"Unknown session store backend: {backend}")
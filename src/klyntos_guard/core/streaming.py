@@ -0,0 +1,211 @@
+"""Incremental redaction and validation of streamed text."""
+
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Pattern, Tuple
+
+# (start, end, entity type), sorted by start and non-overlapping
+Span = Tuple[int, int, str]
+
+
+class StreamingRedactor:
+    """
+    Redact entities in a text stream with bounded added latency.
+
+    Text is held back only until it is provably final: everything except
+    the last ``holdback`` characters (sized to the longest entity) can no
+    longer become part of a new entity. An optional ``tail_pattern`` shrinks
+    the hold further to the trailing run that could still be a partial
+    entity, e.g. the last non-space word. Detected spans that straddle the
+    cut are held back whole, so entities split across chunks are redacted.
+
+    The detector only ever sees the pending buffer, which stays at most
+    ``holdback`` characters plus one chunk long.
+    """
+
+    def __init__(
+        self,
+        detect: Callable[[str], List[Span]],
+        replacement: Callable[[str], str],
+        holdback: int = 64,
+        tail_pattern: Optional[Pattern] = None,
+    ):
+        """
+        Initialize the redactor.
+
+        Args:
+            detect: Returns sorted, non-overlapping entity spans in a text
+            replacement: Maps an entity type to its replacement text
+            holdback: Length of the longest entity to catch
+            tail_pattern: Regex ending in ``\\Z`` matching a possibly
+                incomplete entity at the end of the buffer
+        """
+        self.detect = detect
+        self.replacement = replacement
+        self.holdback = holdback
+        self.tail_pattern = tail_pattern
+
+        self._buffer = ""
+        self._offset = 0  # stream position of the buffer start
+        self.detections: List[Dict[str, object]] = []
+
+    def feed(self, chunk: str) -> str:
+        """
+        Add a chunk of the stream.
+
+        Args:
+            chunk: Next piece of raw text
+
+        Returns:
+            Redacted text that is now final (may be empty)
+        """
+        self._buffer += chunk
+        buffer = self._buffer
+
+        cut = max(len(buffer) - self.holdback, 0)
+        if self.tail_pattern is not None:
+            # No possible partial entity at the end means nothing to hold
+            tail = self.tail_pattern.search(buffer, cut)
+            cut = tail.start() if tail is not None else len(buffer)
+        if cut == 0:
+            return ""
+
+        spans = self.detect(buffer)
+        for start, end, _ in spans:
+            if start < cut < end:
+                cut = start
+                break
+        return self._emit(cut, [span for span in spans if span[1] <= cut])
+
+    def flush(self) -> str:
+        """
+        End the stream.
+
+        Returns:
+            The remaining redacted text
+        """
+        if not self._buffer:
+            return ""
+        return self._emit(len(self._buffer), self.detect(self._buffer))
+
+    def _emit(self, cut: int, spans: List[Span]) -> str:
+        """Redact and release buffer[:cut]."""
+        buffer = self._buffer
+        pieces = []
+        position = 0
+        for start, end, entity_type in spans:
+            pieces.append(buffer[position:start])
+            pieces.append(self.replacement(entity_type))
+            position = end
+            self.detections.append({
+                "entity_type": entity_type,
+                "start": self._offset + start,
+                "end": self._offset + end,
+            })
+        pieces.append(buffer[position:cut])
+
+        self._buffer = buffer[cut:]
+        self._offset += cut
+        return "".join(pieces)
+
+
+async def redact_stream(
+    redactor: StreamingRedactor, chunks: AsyncIterator[str]
+) -> AsyncIterator[str]:
+    """
+    Redact an async stream of chunks (e.g. from an adapter's generate_stream).
+
+    Args:
+        redactor: A fresh redactor for this stream
+        chunks: Raw text chunks
+
+    Yields:
+        Redacted, final text as soon as it is available
+    """
+    async for chunk in chunks:
+        text = redactor.feed(chunk)
+        if text:
+            yield text
+    text = redactor.flush()
+    if text:
+        yield text
+
+
+class GuardedStream:
+    """
+    Validated and redacted view of a streamed LLM response.
+
+    Validators (e.g. from ``FormatValidationRail.stream_validator``) see the
+    raw text first; they release text that is final and may end the stream
+    with a violation. When that happens the upstream iterator is closed
+    right away, so the provider stops generating, and the violation is
+    available in ``violations`` once iteration ends. Released text is then
+    passed through the redactors.
+
+    Validators provide ``feed(chunk) -> (text, violation or None)`` and
+    ``flush() -> text``.
+    """
+
+    def __init__(
+        self,
+        chunks: AsyncIterator[str],
+        validators: List[Any],
+        redactor_factories: List[Callable[[], StreamingRedactor]],
+    ):
+        """
+        Initialize the stream.
+
+        Args:
+            chunks: Raw response chunks
+            validators: Fresh validators for this stream
+            redactor_factories: Create a fresh redactor each
+        """
+        self.chunks = chunks
+        self.validators = validators
+        self.redactor_factories = redactor_factories
+        self.violations: List[Dict[str, Any]] = []
+        self.aborted = False
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        stream = self._validated()
+        for factory in self.redactor_factories:
+            stream = redact_stream(factory(), stream)
+        async for text in stream:
+            yield text
+
+    async def _validated(self) -> AsyncIterator[str]:
+        """Run the validators, stopping upstream at the first violation."""
+        try:
+            async for chunk in self.chunks:
+                text, violation = self._feed(chunk)
+                if text:
+                    yield text
+                if violation is not None:
+                    self.violations.append(violation)
+                    self.aborted = True
+                    return
+
+            # Text held back by a validator still passes the later ones
+            text = ""
+            for validator in self.validators:
+                if text:
+                    text, violation = validator.feed(text)
+                    if violation is not None:
+                        self.violations.append(violation)
+                        self.aborted = True
+                        if text:
+                            yield text
+                        return
+                text += validator.flush()
+            if text:
+                yield text
+        finally:
+            close = getattr(self.chunks, "aclose", None)
+            if close is not None:
+                await close()
+
+    def _feed(self, chunk: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """Pass a chunk through the validators in order."""
+        for validator in self.validators:
+            chunk, violation = validator.feed(chunk)
+            if violation is not None:
+                return chunk, violation
+        return chunk, None
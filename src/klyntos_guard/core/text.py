@@ -0,0 +1,240 @@
+"""Shared normalized views of request text for guardrails."""
+
+import re
+import unicodedata
+from array import array
+from typing import Callable, Dict, Optional, Tuple
+
+# Characters that render as nothing and are used to split keywords
+ZERO_WIDTH_CHARS = (
+    "\u00ad"  # soft hyphen
+    "\u180e"  # mongolian vowel separator
+    "\u200b"  # zero width space
+    "\u200c"  # zero width non-joiner
+    "\u200d"  # zero width joiner
+    "\u2060"  # word joiner
+    "\ufeff"  # zero width no-break space / BOM
+)
+
+# Common homoglyphs (Cyrillic, Greek) that NFKC leaves untouched
+CONFUSABLES = {
+    # Cyrillic
+    "\u0430": "a", "\u0432": "b", "\u0435": "e", "\u0451": "e", "\u043a": "k",
+    "\u043c": "m", "\u043d": "h", "\u043e": "o", "\u0440": "p", "\u0441": "c",
+    "\u0442": "t", "\u0443": "y", "\u0445": "x", "\u0456": "i", "\u0457": "i",
+    "\u0458": "j", "\u0455": "s", "\u0501": "d", "\u051b": "q", "\u051d": "w",
+    "\u0261": "g",
+    # Greek
+    "\u03b1": "a", "\u03b2": "b", "\u03b5": "e", "\u03b7": "n", "\u03b9": "i",
+    "\u03ba": "k", "\u03bd": "v", "\u03bf": "o", "\u03c1": "p", "\u03c4": "t",
+    "\u03c5": "u", "\u03c7": "x", "\u03c9": "w", "\u03c2": "s",
+}
+
+# Leetspeak substitutions, applied only in the ``leet`` form
+LEETSPEAK = {
+    "0": "o", "1": "i", "3": "e", "4": "a", "5": "s",
+    "7": "t", "8": "b", "@": "a", "$": "s", "!": "i", "|": "l",
+}
+
+_ZERO_WIDTH_TABLE = {ord(c): None for c in ZERO_WIDTH_CHARS}
+_CONFUSABLE_TABLE = str.maketrans(CONFUSABLES)
+_LEET_TABLE = str.maketrans(LEETSPEAK)
+_WHITESPACE_RUN = re.compile(r"\s+")
+
+# Offsets map each character of a form to its index in the original text.
+# ``None`` means the identity mapping (form and original are aligned).
+Offsets = Optional[array]
+
+
+def _expand(
+    text: str, offsets: Offsets, transform: Callable[[str], str]
+) -> Tuple[str, Offsets]:
+    """Apply a per-character transform, tracking where each output came from."""
+    pieces = []
+    new_offsets = array("q")
+    for index, char in enumerate(text):
+        out = transform(char)
+        if not out:
+            continue
+        pieces.append(out)
+        source = index if offsets is None else offsets[index]
+        new_offsets.extend([source] * len(out))
+    return "".join(pieces), new_offsets
+
+
+def _nfkc(text: str, offsets: Offsets) -> Tuple[str, Offsets]:
+    """Character-wise NFKC with zero-width characters removed."""
+    if text.isascii():
+        return text, offsets
+
+    stripped = text.translate(_ZERO_WIDTH_TABLE)
+    if len(stripped) == len(text) and unicodedata.is_normalized("NFKC", text):
+        return text, offsets
+
+    return _expand(
+        text,
+        offsets,
+        lambda c: "" if c in ZERO_WIDTH_CHARS else unicodedata.normalize("NFKC", c),
+    )
+
+
+def _casefold(text: str, offsets: Offsets) -> Tuple[str, Offsets]:
+    """Unicode casefolding (may expand characters such as ``ß``)."""
+    folded = text.casefold()
+    if len(folded) == len(text):
+        # casefold never shrinks a character, so equal length means 1:1
+        return folded, offsets
+    return _expand(text, offsets, str.casefold)
+
+
+def _skeleton(text: str, offsets: Offsets) -> Tuple[str, Offsets]:
+    """Fold confusable homoglyphs and strip combining marks."""
+    if text.isascii():
+        return text, offsets
+
+    def fold(char: str) -> str:
+        decomposed = unicodedata.normalize("NFD", char.translate(_CONFUSABLE_TABLE))
+        return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+    return _expand(text, offsets, fold)
+
+
+def _collapse_whitespace(text: str, offsets: Offsets) -> Tuple[str, Offsets]:
+    """Collapse runs of whitespace into a single space."""
+    if not _WHITESPACE_RUN.search(text):
+        return text, offsets
+
+    pieces = []
+    new_offsets = array("q")
+    position = 0
+    for match in _WHITESPACE_RUN.finditer(text):
+        start, end = match.span()
+        if end - start == 1 and text[start] == " ":
+            continue
+        pieces.append(text[position:start])
+        pieces.append(" ")
+        keep = range(position, start + 1)
+        new_offsets.extend(keep if offsets is None else (offsets[i] for i in keep))
+        position = end
+    pieces.append(text[position:])
+    tail = range(position, len(text))
+    new_offsets.extend(tail if offsets is None else (offsets[i] for i in tail))
+    return "".join(pieces), new_offsets
+
+
+def _leet(text: str, offsets: Offsets) -> Tuple[str, Offsets]:
+    """Replace leetspeak digits and symbols with letters (1:1)."""
+    return text.translate(_LEET_TABLE), offsets
+
+
+# form name -> (source form, builder)
+_FORMS: Dict[str, Tuple[str, Callable[[str, Offsets], Tuple[str, Offsets]]]] = {
+    "nfkc": ("original", _nfkc),
+    "casefolded": ("nfkc", _casefold),
+    "skeleton": ("casefolded", _skeleton),
+    "collapsed": ("skeleton", _collapse_whitespace),
+    "leet": ("collapsed", _leet),
+}
+
+
+class TextView:
+    """
+    Lazily computed, cached normalized forms of a single text.
+
+    Each form is derived from the previous one and keeps an offset map back
+    to the original string, so matches found on a normalized form can be
+    reported and redacted at their true position.
+
+    Forms:
+        - nfkc: NFKC (full-width, ligatures) with zero-width characters removed
+        - casefolded: ``nfkc`` casefolded
+        - skeleton: ``casefolded`` with homoglyphs and diacritics folded
+        - collapsed: ``skeleton`` with whitespace runs collapsed to one space
+        - leet: ``collapsed`` with leetspeak substitutions undone
+    """
+
+    FORMS = ("original",) + tuple(_FORMS)
+
+    def __init__(self, text: str):
+        """
+        Initialize the view.
+
+        Args:
+            text: The original text
+        """
+        self.original = text
+        self._forms: Dict[str, Tuple[str, Offsets]] = {"original": (text, None)}
+
+    def form(self, name: str) -> str:
+        """
+        Get a normalized form of the text.
+
+        Args:
+            name: Name of the form (see ``TextView.FORMS``)
+
+        Returns:
+            The normalized text
+        """
+        return self._get(name)[0]
+
+    @property
+    def nfkc(self) -> str:
+        """NFKC-normalized text without zero-width characters."""
+        return self.form("nfkc")
+
+    @property
+    def casefolded(self) -> str:
+        """Casefolded NFKC text."""
+        return self.form("casefolded")
+
+    @property
+    def skeleton(self) -> str:
+        """Casefolded text with confusable characters folded."""
+        return self.form("skeleton")
+
+    @property
+    def collapsed(self) -> str:
+        """Confusable-folded text with whitespace collapsed."""
+        return self.form("collapsed")
+
+    @property
+    def leet(self) -> str:
+        """Collapsed text with leetspeak substitutions undone."""
+        return self.form("leet")
+
+    def span(self, name: str, start: int, end: int) -> Tuple[int, int]:
+        """
+        Map a span of a normalized form back to the original text.
+
+        Args:
+            name: Name of the form the span refers to
+            start: Start index in the form
+            end: End index (exclusive) in the form
+
+        Returns:
+            (start, end) in the original text
+        """
+        _, offsets = self._get(name)
+        if offsets is None:
+            return start, end
+
+        if start >= len(offsets):
+            return len(self.original), len(self.original)
+        original_start = offsets[start]
+        if end <= start:
+            return original_start, original_start
+        return original_start, offsets[end - 1] + 1
+
+    def _get(self, name: str) -> Tuple[str, Offsets]:
+        """Compute (or fetch the cached) form and its offsets."""
+        cached = self._forms.get(name)
+        if cached is not None:
+            return cached
+
+        if name not in _FORMS:
+            raise ValueError(f"Unknown text form: {name}")
+
+        source, builder = _FORMS[name]
+        result = builder(*self._get(source))
+        self._forms[name] = result
+        return result
@@ -2,9 +2,13 @@
 
 from datetime import datetime
 from enum import Enum
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Union
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
+
+from klyntos_guard.core.edits import EditPlan
+from klyntos_guard.core.policy import StagePolicy
+from klyntos_guard.core.text import TextView
 
 
 class RailType(str, Enum):
@@ -35,6 +39,142 @@ class ProcessingContext(BaseModel):
     metadata: Dict[str, Any] = Field(default_factory=dict)
     timestamp: datetime = Field(default_factory=datetime.utcnow)
 
+    # Messages preceding the one being checked (bounded window), set by
+    # GuardrailsEngine.check_conversation for rails that need context
+    conversation: List[Dict[str, str]] = Field(default_factory=list)
+
+    _text_views: Dict[str, TextView] = PrivateAttr(default_factory=dict)
+    # Scores computed by earlier rails for the message being checked
+    _signals: Dict[str, float] = PrivateAttr(default_factory=dict)
+
+    # Fused pattern rules of the running stage, and their matches by
+    # (pattern set, text)
+    _policy: Optional[StagePolicy] = PrivateAttr(default=None)
+    _pattern_matches: Dict[tuple, Dict[int, Dict[Hashable, Sequence[Any]]]] = PrivateAttr(
+        default_factory=dict
+    )
+
+    # Edit plan of the running stage: (base text, plan, (version, edited text))
+    _edit_base: Optional[str] = PrivateAttr(default=None)
+    _edit_plan: Optional[EditPlan] = PrivateAttr(default=None)
+    _edited: Optional[tuple] = PrivateAttr(default=None)
+
+    def text_view(self, text: str) -> TextView:
+        """
+        Get the shared normalized view of a text for this request.
+
+        Rails call this instead of normalizing on their own, so each form
+        is computed at most once per text per request.
+
+        Args:
+            text: Text being processed (input, transformed input or output)
+
+        Returns:
+            The cached TextView for the text
+        """
+        view = self._text_views.get(text)
+        if view is None:
+            view = TextView(text)
+            self._text_views[text] = view
+        return view
+
+    def record_signal(self, name: str, value: float) -> None:
+        """
+        Share a score with later rails checking the same message.
+
+        Rails that compute something others can reuse (e.g. toxicity)
+        record it here, so later rails read it instead of recomputing it.
+        The highest value recorded for a name is kept.
+
+        Args:
+            name: Signal name, e.g. "toxicity"
+            value: Score
+        """
+        if value > self._signals.get(name, float("-inf")):
+            self._signals[name] = value
+
+    def signal(self, name: str) -> Optional[float]:
+        """Get a score recorded for the current message, or None."""
+        return self._signals.get(name)
+
+    def recorded_signals(self) -> Dict[str, float]:
+        """Get a copy of all scores recorded for the current message."""
+        return dict(self._signals)
+
+    def clear_signals(self) -> None:
+        """Forget recorded scores; called by the engine before each message."""
+        self._signals.clear()
+
+    def use_policy(self, policy: Optional[StagePolicy]) -> None:
+        """Set the fused pattern rules of the stage about to run (engine only)."""
+        self._policy = policy
+
+    def pattern_matches(
+        self, rail: Any, view: TextView, form: str
+    ) -> Dict[Hashable, Sequence[Any]]:
+        """
+        Get a rail's pattern matches from the running stage's fused scan.
+
+        The first call for a text form scans it once for the rules of
+        every rail in the stage; later calls reuse the result.
+
+        Args:
+            rail: The rail asking
+            view: View of the text being checked
+            form: TextView form the rail's rules match against
+
+        Returns:
+            ``finditer`` matches per rule name; rules missing from the
+            result are not part of the stage policy and the rail runs them
+            itself
+        """
+        patterns = self._policy.forms.get(form) if self._policy is not None else None
+        if patterns is None or id(rail) not in patterns.owners:
+            return {}
+
+        key = (patterns, view.original)
+        scanned = self._pattern_matches.get(key)
+        if scanned is None:
+            scanned = self._pattern_matches[key] = patterns.scan(view.form(form))
+        return scanned[id(rail)]
+
+    def begin_edits(self, text: str) -> EditPlan:
+        """
+        Start collecting edits against a stage's base text.
+
+        Called by the engine at the start of a transforming stage.
+
+        Args:
+            text: Base text the stage's edits refer to
+
+        Returns:
+            The (empty) plan for the stage
+        """
+        self._edit_base = text
+        self._edit_plan = EditPlan()
+        self._edited = None
+        return self._edit_plan
+
+    def edited_text(self, text: str) -> str:
+        """
+        Get a text with the running stage's pending edits applied.
+
+        Rails that must see earlier rails' transformations call this; the
+        edited text is built lazily and reused until new edits arrive.
+
+        Args:
+            text: The stage's base text
+
+        Returns:
+            The edited text (``text`` itself if there is nothing to apply)
+        """
+        plan = self._edit_plan
+        if plan is None or not plan or text != self._edit_base:
+            return text
+        if self._edited is None or self._edited[0] != plan.version:
+            self._edited = (plan.version, plan.apply(text))
+        return self._edited[1]
+
 
 class RailViolation(BaseModel):
     """Details about a guardrail violation."""
@@ -61,6 +201,37 @@ class GuardrailResult(BaseModel):
     timestamp: datetime = Field(default_factory=datetime.utcnow)
 
 
+class ChunkVerdict(BaseModel):
+    """Retrieval-rail verdict on one retrieved chunk."""
+
+    index: int  # Position in the retrieved list
+    allowed: bool
+    redacted: bool = False
+    reasons: List[str] = Field(default_factory=list)
+    cached: bool = False
+
+
+class RetrievalResult(BaseModel):
+    """Result of running retrieval rails over retrieved chunks."""
+
+    allowed: bool
+    chunks: List[Dict[str, Any]] = Field(default_factory=list)  # Kept, possibly redacted
+    verdicts: List[ChunkVerdict] = Field(default_factory=list)
+    violations: List[RailViolation] = Field(default_factory=list)
+    metadata: Dict[str, Any] = Field(default_factory=dict)
+    processing_time_ms: Optional[float] = None
+
+
+class ExecutionResult(BaseModel):
+    """Result of vetting a tool or code execution request."""
+
+    allowed: bool
+    violations: List[RailViolation] = Field(default_factory=list)
+    warnings: List[str] = Field(default_factory=list)
+    cached: bool = False
+    processing_time_ms: Optional[float] = None
+
+
 class LLMRequest(BaseModel):
     """Request to an LLM provider."""
 
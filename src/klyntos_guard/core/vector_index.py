@@ -0,0 +1,305 @@
+"""Memory-mapped dense vector index for similarity search."""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+
+class VectorIndex:
+    """
+    Cosine-similarity index over a contiguous float32 matrix.
+
+    The matrix is stored as ``<name>.npy`` with unit-length rows and is
+    memory-mapped, so large corpora are paged in on demand. Labels (for
+    example the original attack prompts) are stored next to it as
+    ``<name>.labels.json``.
+
+    Search is one vectorized matmul over the whole matrix. Optionally the
+    matrix can be quantized to int8 with per-row scales (4x less memory),
+    and corpora above ``ivf_threshold`` vectors get an IVF-style coarse
+    partition so only the ``nprobe`` closest partitions are scanned.
+    """
+
+    # Rows converted from int8 per block during quantized search
+    BLOCK_SIZE = 65536
+
+    def __init__(
+        self,
+        vectors: "np.ndarray",
+        labels: Optional[List[str]] = None,
+        quantize: bool = False,
+        ivf_threshold: int = 100_000,
+        nprobe: int = 8,
+        ivf_cache_path: Optional[Path] = None,
+        source_path: Optional[Path] = None,
+    ):
+        """
+        Initialize the index.
+
+        Args:
+            vectors: (n, dim) float32 matrix with unit-length rows
+            labels: Optional label per row
+            quantize: Store the matrix as int8 with per-row scales
+            ivf_threshold: Build a coarse partition above this many vectors
+            nprobe: Number of partitions scanned per query when partitioned
+            ivf_cache_path: Where to cache the coarse partition
+            source_path: File the vectors were loaded from; a cached
+                partition is only reused while its size and mtime match
+        """
+        if not NUMPY_AVAILABLE:
+            raise ImportError(
+                "NumPy is required for VectorIndex. Install it with: pip install numpy"
+            )
+
+        if vectors.ndim != 2:
+            raise ValueError("vectors must be a 2-D matrix")
+
+        self.labels = labels
+        self.dim = vectors.shape[1]
+        self.size = vectors.shape[0]
+        self.nprobe = nprobe
+        self.quantized = quantize
+
+        if quantize:
+            self._matrix, self._scales = self._quantize(vectors)
+        else:
+            self._matrix = vectors
+            self._scales = None
+
+        self._centroids = None
+        self._order = None
+        self._offsets = None
+        if self.size > ivf_threshold:
+            self._build_partition(vectors, ivf_cache_path, source_path)
+
+    @classmethod
+    def load(
+        cls,
+        path: Union[str, Path],
+        quantize: bool = False,
+        ivf_threshold: int = 100_000,
+        nprobe: int = 8,
+    ) -> "VectorIndex":
+        """
+        Load an index saved with ``VectorIndex.save``.
+
+        Args:
+            path: Path to the ``.npy`` matrix
+            quantize: Quantize the matrix to int8 after loading
+            ivf_threshold: Build a coarse partition above this many vectors
+            nprobe: Number of partitions scanned per query
+
+        Returns:
+            The loaded index
+        """
+        path = Path(path)
+        vectors = np.load(path, mmap_mode="r")
+        if vectors.dtype != np.float32:
+            raise ValueError(f"Index matrix must be float32, got {vectors.dtype}")
+
+        labels = None
+        labels_path = path.with_suffix(".labels.json")
+        if labels_path.exists():
+            labels = json.loads(labels_path.read_text())
+
+        logger.info(
+            "vector_index_loaded",
+            path=str(path),
+            size=vectors.shape[0],
+            dim=vectors.shape[1],
+            quantize=quantize,
+        )
+        return cls(
+            vectors,
+            labels=labels,
+            quantize=quantize,
+            ivf_threshold=ivf_threshold,
+            nprobe=nprobe,
+            ivf_cache_path=path.with_suffix(".ivf.npz"),
+            source_path=path,
+        )
+
+    @staticmethod
+    def save(
+        path: Union[str, Path],
+        vectors: "np.ndarray",
+        labels: Optional[List[str]] = None,
+    ) -> None:
+        """
+        Save vectors (normalized to unit length) and labels to disk.
+
+        Args:
+            path: Path to the ``.npy`` matrix
+            vectors: (n, dim) matrix
+            labels: Optional label per row
+        """
+        path = Path(path)
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.save(path, np.ascontiguousarray(vectors / np.maximum(norms, 1e-12)))
+        if labels is not None:
+            path.with_suffix(".labels.json").write_text(json.dumps(labels))
+
+    def search(
+        self, queries: "np.ndarray", k: int = 5
+    ) -> Tuple["np.ndarray", "np.ndarray"]:
+        """
+        Find the k most similar rows for each query.
+
+        Args:
+            queries: (m, dim) float32 matrix with unit-length rows
+            k: Number of neighbours per query
+
+        Returns:
+            (scores, ids), each of shape (m, k), best match first
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        k = min(k, self.size)
+
+        if self._centroids is None:
+            return self._top_k(self._scores(queries, None), k, None)
+
+        all_scores = []
+        all_ids = []
+        for query in queries:
+            ids = self._probe(query)
+            scores = self._scores(query[None, :], ids)
+            top_scores, top_ids = self._top_k(scores, min(k, len(ids)), ids)
+            all_scores.append(self._pad(top_scores[0], k, -np.inf))
+            all_ids.append(self._pad(top_ids[0], k, -1))
+        return np.stack(all_scores), np.stack(all_ids)
+
+    def _scores(
+        self, queries: "np.ndarray", ids: Optional["np.ndarray"]
+    ) -> "np.ndarray":
+        """Similarity of queries against all rows (or the given rows)."""
+        matrix = self._matrix if ids is None else self._matrix[ids]
+        if self._scales is None:
+            return queries @ matrix.T
+
+        scales = self._scales if ids is None else self._scales[ids]
+        scores = np.empty((queries.shape[0], matrix.shape[0]), dtype=np.float32)
+        for start in range(0, matrix.shape[0], self.BLOCK_SIZE):
+            block = matrix[start:start + self.BLOCK_SIZE].astype(np.float32)
+            scores[:, start:start + self.BLOCK_SIZE] = queries @ block.T
+        return scores * scales[None, :]
+
+    @staticmethod
+    def _top_k(
+        scores: "np.ndarray", k: int, ids: Optional["np.ndarray"]
+    ) -> Tuple["np.ndarray", "np.ndarray"]:
+        """Select the k best columns per row without a full sort."""
+        if k < scores.shape[1]:
+            part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            part = np.tile(np.arange(scores.shape[1]), (scores.shape[0], 1))
+        part_scores = np.take_along_axis(scores, part, axis=1)
+        order = np.argsort(-part_scores, axis=1)
+        top = np.take_along_axis(part, order, axis=1)
+        top_scores = np.take_along_axis(part_scores, order, axis=1)
+        return top_scores, (top if ids is None else ids[top])
+
+    @staticmethod
+    def _pad(values: "np.ndarray", k: int, fill) -> "np.ndarray":
+        """Pad a result row to length k."""
+        if len(values) >= k:
+            return values
+        return np.concatenate([values, np.full(k - len(values), fill, dtype=values.dtype)])
+
+    def _quantize(self, vectors: "np.ndarray") -> Tuple["np.ndarray", "np.ndarray"]:
+        """Symmetric per-row int8 quantization, done block by block."""
+        quantized = np.empty(vectors.shape, dtype=np.int8)
+        scales = np.empty(vectors.shape[0], dtype=np.float32)
+        for start in range(0, vectors.shape[0], self.BLOCK_SIZE):
+            block = np.asarray(vectors[start:start + self.BLOCK_SIZE], dtype=np.float32)
+            block_scales = np.maximum(np.abs(block).max(axis=1), 1e-12) / 127.0
+            quantized[start:start + len(block)] = np.round(block / block_scales[:, None])
+            scales[start:start + len(block)] = block_scales
+        return quantized, scales
+
+    def _probe(self, query: "np.ndarray") -> "np.ndarray":
+        """Row ids of the nprobe partitions closest to the query."""
+        nprobe = min(self.nprobe, len(self._centroids))
+        centroid_scores = self._centroids @ query
+        lists = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+        return np.sort(np.concatenate([
+            self._order[self._offsets[i]:self._offsets[i + 1]] for i in lists
+        ]))
+
+    def _fingerprint(self, vectors: "np.ndarray", source_path: Optional[Path]) -> str:
+        """
+        Identify the matrix a cached partition was built from.
+
+        Covers the shape, a strided sample of rows and, for a matrix loaded
+        from disk, the file's size and mtime, so a rebuilt matrix of the
+        same size does not reuse stale centroids.
+        """
+        digest = hashlib.blake2b(repr(vectors.shape).encode("utf-8"), digest_size=16)
+        step = max(self.size // 1024, 1)
+        digest.update(np.ascontiguousarray(vectors[::step], dtype=np.float32).tobytes())
+        if source_path is not None:
+            stat = Path(source_path).stat()
+            digest.update(f"{stat.st_size}:{stat.st_mtime_ns}".encode("utf-8"))
+        return digest.hexdigest()
+
+    def _build_partition(
+        self,
+        vectors: "np.ndarray",
+        cache_path: Optional[Path],
+        source_path: Optional[Path] = None,
+    ) -> None:
+        """Cluster rows with spherical k-means and group row ids by cluster."""
+        fingerprint = self._fingerprint(vectors, source_path)
+        if cache_path is not None and cache_path.exists():
+            cached = np.load(cache_path)
+            if "fingerprint" in cached.files and str(cached["fingerprint"]) == fingerprint:
+                self._centroids = cached["centroids"]
+                self._order = cached["order"]
+                self._offsets = cached["offsets"]
+                return
+            logger.info("vector_index_partition_stale", path=str(cache_path))
+
+        nlist = max(int(np.sqrt(self.size)), 1)
+        rng = np.random.default_rng(0)
+        sample_ids = np.sort(rng.choice(self.size, size=min(self.size, nlist * 40), replace=False))
+        sample = np.asarray(vectors[sample_ids], dtype=np.float32)
+
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)]
+        for _ in range(10):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            empty = ~sums.any(axis=1)
+            sums[empty] = centroids[empty]
+            centroids = sums / np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)
+
+        assignment = np.empty(self.size, dtype=np.int32)
+        for start in range(0, self.size, self.BLOCK_SIZE):
+            block = np.asarray(vectors[start:start + self.BLOCK_SIZE], dtype=np.float32)
+            assignment[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+
+        self._centroids = centroids.astype(np.float32)
+        self._order = np.argsort(assignment, kind="stable")
+        self._offsets = np.searchsorted(assignment[self._order], np.arange(nlist + 1))
+
+        if cache_path is not None:
+            np.savez(
+                cache_path,
+                centroids=self._centroids,
+                order=self._order,
+                offsets=self._offsets,
+                fingerprint=np.array(fingerprint),
+            )
+
+        logger.info("vector_index_partitioned", size=self.size, nlist=nlist)
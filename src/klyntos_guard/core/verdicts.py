@@ -0,0 +1,87 @@
+"""Content-addressed cache of rail verdicts."""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+def content_key(*parts: str) -> bytes:
+    """
+    Hash identifying some content, e.g. a chunk's text and source.
+
+    Parts are length-prefixed, so ("ab", "c") and ("a", "bc") differ.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        data = part.encode("utf-8")
+        digest.update(len(data).to_bytes(8, "little"))
+        digest.update(data)
+    return digest.digest()
+
+
+class VerdictCache:
+    """
+    Bounded LRU cache of verdicts, with optional expiry.
+
+    Callers key verdicts by the content they were computed on (see
+    content_key) and must ``clear`` the cache when the rails that produced
+    them change.
+    """
+
+    def __init__(self, max_entries: int = 100000, ttl_seconds: Optional[float] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached verdicts
+            ttl_seconds: Age after which a verdict is recomputed (None: never)
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        # key -> (stored at, verdict), least recently used first
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Get a cached verdict, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (
+                self.ttl_seconds is not None
+                and time.monotonic() - entry[0] > self.ttl_seconds
+            ):
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, verdict: Any) -> None:
+        """Store a verdict, evicting the least recently used one if full."""
+        with self._lock:
+            self._entries[key] = (time.monotonic(), verdict)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all verdicts."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -1,9 +1,11 @@
 """Base classes for guardrails."""
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Hashable, List, Optional, Pattern, Set
 
-from klyntos_guard.core.types import ProcessingContext
+from klyntos_guard.core.edits import EditPlan
+from klyntos_guard.core.sessions import SessionStore
+from klyntos_guard.core.types import ProcessingContext, RailType
 
 
 class BaseRail(ABC):
@@ -12,8 +14,23 @@ class BaseRail(ABC):
 
     Subclasses should implement one or more of the processing methods
     depending on which rail types they support.
+
+    Rails that set ``uses_edit_plan`` receive the stage's base text (edits
+    of earlier rails are pending, see ``ProcessingContext.edited_text``)
+    and report transformations as ``edits`` against it. Other rails receive
+    the text with earlier edits applied and may return a transformed text.
     """
 
+    uses_edit_plan: bool = False
+
+    # Per-conversation state, bound by the engine
+    sessions: Optional[SessionStore] = None
+
+    # Execution-request arguments whose values process_execution decides
+    # on; other arguments only count by type when caching decisions. None
+    # means any value may matter.
+    execution_value_fields: Optional[Set[str]] = None
+
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         """
         Initialize the rail with configuration.
@@ -39,13 +56,39 @@ class BaseRail(ABC):
                 - message (str): Reason for blocking (if blocked)
                 - severity (str): Severity level if blocked
                 - warning (str): Warning message if not blocked but concerning
-                - transformed_input (str): Modified input if transformation applied
+                - edits (list): (start, end, replacement) spans to replace,
+                  for rails with ``uses_edit_plan``
+                - transformed_input (str): Modified input if transformation
+                  applied, for other rails
                 - details (dict): Additional details about the decision
+                - metadata (dict): Entries merged into the GuardrailResult
+                  metadata (e.g. routing decisions)
         """
         raise NotImplementedError(
             f"{self.__class__.__name__} does not implement input rail processing"
         )
 
+    async def process_input_batch(
+        self, input_texts: List[str], context: ProcessingContext
+    ) -> List[Dict[str, Any]]:
+        """
+        Process several user inputs through this rail.
+
+        The default calls process_input for each text; rails with a cheaper
+        batched implementation (e.g. batched NLP pipelines) override this.
+        Since one context serves the whole batch, overrides return scores
+        for later rails under a "signals" key of each result instead of
+        calling ``context.record_signal``.
+
+        Args:
+            input_texts: The texts to process
+            context: Processing context
+
+        Returns:
+            One dictionary per text, with the same structure as process_input
+        """
+        return [await self.process_input(text, context) for text in input_texts]
+
     async def process_output(
         self, output_text: str, context: ProcessingContext
     ) -> Dict[str, Any]:
@@ -86,20 +129,50 @@ class BaseRail(ABC):
         """
         Process retrieved chunks in RAG scenarios.
 
+        The default checks the chunks' content with process_input_batch,
+        so any input rail can also vet retrieved chunks, all in one batch:
+        blocked chunks are dropped, transformed chunks are redacted.
+
         Args:
-            retrieved_chunks: List of retrieved text chunks
+            retrieved_chunks: Chunks as dicts with "content" and optional
+                "source" and "metadata"
             context: Processing context
 
         Returns:
             Dictionary with:
-                - blocked (bool): Whether to block the retrieval
+                - blocked (bool): Whether to block the whole retrieval
                 - message (str): Reason for blocking
+                - chunk_verdicts (list): One dict per chunk with allowed
+                  (bool), and optionally reason (str) and content (str, the
+                  redacted text)
                 - filtered_chunks (list): Filtered/modified chunks
                 - details (dict): Additional details
         """
-        raise NotImplementedError(
-            f"{self.__class__.__name__} does not implement retrieval rail processing"
-        )
+        contents = [chunk["content"] for chunk in retrieved_chunks]
+        results = await self.process_input_batch(contents, context)
+
+        verdicts = []
+        filtered = []
+        for chunk, content, result in zip(retrieved_chunks, contents, results):
+            if result.get("blocked"):
+                verdicts.append({"allowed": False, "reason": result.get("message")})
+                continue
+            if result.get("edits"):
+                content = EditPlan(result["edits"]).apply(content)
+            elif "transformed_input" in result:
+                content = result["transformed_input"]
+            else:
+                verdicts.append({"allowed": True})
+                filtered.append(chunk)
+                continue
+            verdicts.append({"allowed": True, "content": content})
+            filtered.append({**chunk, "content": content})
+
+        return {
+            "blocked": False,
+            "chunk_verdicts": verdicts,
+            "filtered_chunks": filtered,
+        }
 
     async def process_execution(
         self, execution_request: Dict[str, Any], context: ProcessingContext
@@ -108,16 +181,60 @@ class BaseRail(ABC):
         Process code/tool execution requests.
 
         Args:
-            execution_request: Details of the execution request
+            execution_request: Details of the execution request, with
+                "tool" and "arguments" (and e.g. "code", "language")
             context: Processing context
 
         Returns:
-            Dictionary with same structure as process_input
+            Dictionary with same structure as process_input, plus optional
+            cacheable (bool, default True): whether the engine may reuse
+            the decision for requests with the same canonical key
         """
         raise NotImplementedError(
             f"{self.__class__.__name__} does not implement execution rail processing"
         )
 
+    def bind_adapters(self, adapters: List[Any]) -> None:
+        """
+        Give the rail access to the engine's LLM adapters.
+
+        Called by the engine when the rail is added and whenever an adapter
+        is added. Rails that need an LLM (e.g. for embeddings) override this.
+
+        Args:
+            adapters: The engine's BaseLLMAdapter instances
+        """
+
+    def bind_session_store(self, store: SessionStore) -> None:
+        """
+        Give the rail access to the engine's per-session state.
+
+        Called by the engine when the rail is added. Dialog rails keep their
+        running counters there (see ``SessionStore.update``).
+
+        Args:
+            store: The engine's session store
+        """
+        self.sessions = store
+
+    def pattern_rules(self, stage: RailType) -> Dict[str, Dict[Hashable, Pattern]]:
+        """
+        Regex rules the engine may run for this rail in a fused scan.
+
+        The engine compiles the rules of all rails of a stage into one
+        StagePolicy; the rail then reads its matches with
+        ``ProcessingContext.pattern_matches`` instead of scanning the text
+        itself, and runs any rule missing from the result on its own.
+
+        Args:
+            stage: Stage the rail is attached to
+
+        Returns:
+            Compiled patterns by rule name, per TextView form they match
+            against. The default declares none.
+        """
+        return {}
+
     def get_metadata(self) -> Dict[str, Any]:
         """
         Get metadata about this rail.
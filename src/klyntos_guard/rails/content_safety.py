@@ -1,12 +1,10 @@
 """Content safety rail using Detoxify for toxicity detection."""
 
+import importlib.util
 from typing import Any, Dict, List, Optional
 
-try:
-    from detoxify import Detoxify
-    DETOXIFY_AVAILABLE = True
-except ImportError:
-    DETOXIFY_AVAILABLE = False
+# Detoxify pulls in torch, so it is only imported when the rail is created
+DETOXIFY_AVAILABLE = importlib.util.find_spec("detoxify") is not None
 
 from klyntos_guard.core.types import ProcessingContext
 from klyntos_guard.rails.base import BaseRail
@@ -27,6 +25,8 @@ class ContentSafetyRail(BaseRail):
     - Identity hate
     """
 
+    uses_edit_plan = True
+
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         """Initialize content safety rail."""
         super().__init__(config)
@@ -37,6 +37,8 @@ class ContentSafetyRail(BaseRail):
                 "Install it with: pip install detoxify"
             )
 
+        from detoxify import Detoxify
+
         # Initialize Detoxify model
         model_type = self.config.get("model_type", "original")
         self.model = Detoxify(model_type)
@@ -77,7 +79,36 @@ class ContentSafetyRail(BaseRail):
         """
         # Run toxicity detection
         results = self.model.predict(input_text)
+        if results:
+            context.record_signal("toxicity", float(max(results.values())))
+        return self._evaluate(results)
+
+    async def process_input_batch(
+        self, input_texts: List[str], context: ProcessingContext
+    ) -> List[Dict[str, Any]]:
+        """Score a batch of texts with a single model call."""
+        if not input_texts:
+            return []
+        batch = self.model.predict(input_texts)
+        results = []
+        for i in range(len(input_texts)):
+            scores = {category: values[i] for category, values in batch.items()}
+            result = self._evaluate(scores)
+            if scores:
+                result["signals"] = {"toxicity": float(max(scores.values()))}
+            results.append(result)
+        return results
+
+    def _evaluate(self, results: Dict[str, float]) -> Dict[str, Any]:
+        """
+        Decide on one text's category scores.
+
+        Args:
+            results: Score per toxicity category
 
+        Returns:
+            Dictionary with blocking decision and details
+        """
         # Check each category against thresholds
         violations = []
         max_score = 0.0
@@ -0,0 +1,270 @@
+"""Escalation detection rail for handing conversations to humans."""
+
+import asyncio
+import hashlib
+import inspect
+from typing import Any, Callable, Dict, List, Optional, Set
+
+import structlog
+
+from klyntos_guard.core.keywords import KeywordAutomaton
+from klyntos_guard.core.sessions import SessionState, session_key
+from klyntos_guard.core.text import TextView
+from klyntos_guard.core.types import ProcessingContext
+from klyntos_guard.rails.base import BaseRail
+from klyntos_guard.rails.registry import register_rail
+
+logger = structlog.get_logger(__name__)
+
+# SessionState.counters keys owned by this rail
+FRUSTRATION = "escalation.frustration"
+COMPLEXITY = "escalation.complexity"
+LAST_TURN = "escalation.last_turn"
+ESCALATED = "escalation.escalated"
+
+DEFAULT_PHRASES = {
+    "frustration": [
+        "ridiculous", "useless", "annoying", "frustrating", "frustrated",
+        "waste of time", "fed up", "terrible", "awful", "unacceptable",
+        "are you kidding", "come on", "seriously",
+    ],
+    "failure": [
+        "doesn't work", "does not work", "didn't work", "did not work",
+        "not working", "still broken", "still not", "didn't help",
+        "did not help", "that's wrong", "that is wrong", "same error",
+        "same problem", "tried that", "already tried",
+    ],
+    "resolution": [
+        "thanks", "thank you", "that worked", "it works", "works now",
+        "solved", "fixed it", "perfect",
+    ],
+    "explicit_request": [
+        "speak to a human", "talk to a human", "speak to a person",
+        "talk to a person", "real person", "human agent", "live agent",
+        "representative", "your manager", "supervisor", "talk to someone",
+    ],
+}
+
+
+@register_rail("escalation_detection")
+class EscalationDetectionRail(BaseRail):
+    """
+    Detect when a conversation should be handed to a human.
+
+    Each trigger is a running value in the session state, updated in O(1)
+    per turn from the new turn alone; history is never rescanned:
+
+        - ``user_frustration``: score decayed by ``decay`` each turn, plus
+          the turn's frustration (toxicity already computed for the message
+          by an earlier rail, frustration phrases, shouting)
+        - ``complex_request``: decayed score of long, many-question turns
+        - ``multiple_failed_attempts``: turns reporting failure or repeating
+          the previous turn since the last resolution phrase
+        - ``explicit_request``: the user asks for a human
+
+    On escalation, listeners added with ``add_listener`` are notified in a
+    background task, so they never delay the response. A session escalates
+    once until its triggers have all cleared again.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """Initialize escalation detection rail."""
+        super().__init__(config)
+
+        self.triggers = set(self.config.get("escalation_triggers", [
+            "user_frustration",
+            "complex_request",
+            "multiple_failed_attempts",
+            "explicit_request",
+        ]))
+
+        # Per-turn decay of the frustration and complexity scores
+        self.decay = self.config.get("decay", 0.6)
+        self.frustration_threshold = self.config.get("frustration_threshold", 1.5)
+        self.complexity_threshold = self.config.get("complexity_threshold", 1.5)
+        # Words per unit of complexity
+        self.complex_request_words = self.config.get("complex_request_words", 120)
+        self.max_failed_attempts = self.config.get("max_failed_attempts", 3)
+
+        self.action = self.config.get("action", "notify_human_agent")  # notify_human_agent, block
+
+        phrases = {**DEFAULT_PHRASES, **self.config.get("trigger_phrases", {})}
+        self._phrases = KeywordAutomaton({
+            label: [TextView(phrase).collapsed for phrase in label_phrases]
+            for label, label_phrases in phrases.items()
+        })
+
+        self._listeners: List[Callable[[Dict[str, Any]], Any]] = []
+        self._pending: Set["asyncio.Task"] = set()
+
+    def add_listener(self, listener: Callable[[Dict[str, Any]], Any]) -> None:
+        """
+        Call a function (sync or async) with each escalation event.
+
+        Coroutine functions run on the event loop; plain functions run in
+        the default executor, so a blocking listener cannot stall the loop.
+
+        Args:
+            listener: Receives the event dict
+        """
+        self._listeners.append(listener)
+
+    async def process_dialog(
+        self, text: str, context: ProcessingContext
+    ) -> Dict[str, Any]:
+        """
+        Update the session's triggers with a user turn.
+
+        Args:
+            text: The user's turn
+            context: Processing context
+
+        Returns:
+            Dictionary with the escalation decision; escalations are
+            reported under the "escalation" metadata key
+        """
+        key = session_key(context.tenant_id, context.session_id)
+        signals = self._turn_signals(context.text_view(text), context)
+        if self.sessions is None or key is None:
+            # Without a session only the turn itself counts
+            state = SessionState()
+            outcome = self._track_turn(state, signals)
+        else:
+            outcome = await self.sessions.update(
+                key, lambda state: self._track_turn(state, signals)
+            )
+
+        details = {"triggers": outcome["triggered"], "scores": outcome["scores"]}
+        if not outcome["escalate"]:
+            return {"blocked": False, "details": details}
+
+        event = {
+            "tenant_id": context.tenant_id,
+            "session_id": context.session_id,
+            "user_id": context.user_id,
+            "triggers": outcome["triggered"],
+            "scores": outcome["scores"],
+            "action": self.action,
+        }
+        self._emit(event)
+
+        message = f"Escalation to a human agent: {', '.join(outcome['triggered'])}"
+        if self.action == "block":
+            return {
+                "blocked": True,
+                "severity": "medium",
+                "message": message,
+                "details": details,
+            }
+        return {
+            "blocked": False,
+            "warning": message,
+            "details": details,
+            "metadata": {"escalation": event},
+        }
+
+    def _turn_signals(self, view: TextView, context: ProcessingContext) -> Dict[str, float]:
+        """Everything the triggers need from one turn, computed once."""
+        hits = self._phrases.counts(view.collapsed)
+        text = view.original
+
+        letters = [char for char in text if char.isalpha()]
+        uppercase = sum(char.isupper() for char in letters)
+        shouting = len(letters) >= 12 and uppercase > 0.7 * len(letters)
+        frustration = (
+            (context.signal("toxicity") or 0.0)
+            + 0.5 * min(hits.get("frustration", 0), 3)
+            + (0.5 if shouting else 0.0)
+            + (0.25 if "!!" in text else 0.0)
+        )
+
+        words = len(text.split())
+        complexity = words / self.complex_request_words + 0.5 * max(text.count("?") - 1, 0)
+
+        digest = hashlib.blake2b(view.collapsed.encode("utf-8"), digest_size=6).digest()
+        return {
+            "frustration": frustration,
+            "complexity": complexity,
+            "failure": float(hits.get("failure", 0)),
+            "resolution": float(hits.get("resolution", 0)),
+            "explicit_request": float(hits.get("explicit_request", 0)),
+            # 48 bits, exact in a float counter
+            "fingerprint": float(int.from_bytes(digest, "little")),
+        }
+
+    def _track_turn(self, state: SessionState, signals: Dict[str, float]) -> Dict[str, Any]:
+        """Fold one turn into the session's counters and evaluate triggers."""
+        counters = state.counters
+        frustration = counters.get(FRUSTRATION, 0.0) * self.decay + signals["frustration"]
+        complexity = counters.get(COMPLEXITY, 0.0) * self.decay + signals["complexity"]
+
+        repeated = counters.get(LAST_TURN) == signals["fingerprint"]
+        if signals["resolution"] and not signals["failure"]:
+            state.failed_attempts = 0
+        elif signals["failure"] or repeated:
+            state.failed_attempts += 1
+
+        counters[FRUSTRATION] = round(frustration, 4)
+        counters[COMPLEXITY] = round(complexity, 4)
+        counters[LAST_TURN] = signals["fingerprint"]
+
+        fired = {
+            "user_frustration": frustration >= self.frustration_threshold,
+            "complex_request": complexity >= self.complexity_threshold,
+            "multiple_failed_attempts": state.failed_attempts >= self.max_failed_attempts,
+            "explicit_request": signals["explicit_request"] > 0,
+        }
+        triggered = [name for name, hit in fired.items() if hit and name in self.triggers]
+
+        # Escalate once; re-arm when every trigger has cleared
+        escalate = bool(triggered) and not counters.get(ESCALATED)
+        counters[ESCALATED] = 1.0 if triggered else 0.0
+
+        return {
+            "triggered": triggered,
+            "escalate": escalate,
+            "scores": {
+                "frustration": counters[FRUSTRATION],
+                "complexity": counters[COMPLEXITY],
+                "failed_attempts": state.failed_attempts,
+            },
+        }
+
+    def _emit(self, event: Dict[str, Any]) -> None:
+        """Notify listeners in the background."""
+        logger.info(
+            "escalation_triggered",
+            session_id=event["session_id"],
+            triggers=event["triggers"],
+        )
+        if not self._listeners:
+            return
+        task = asyncio.get_running_loop().create_task(self._notify(event))
+        # Keep a reference until done; the loop only holds weak ones
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _notify(self, event: Dict[str, Any]) -> None:
+        """Call every listener, logging (not raising) their failures."""
+        loop = asyncio.get_running_loop()
+        for listener in self._listeners:
+            try:
+                if inspect.iscoroutinefunction(listener):
+                    result = listener(event)
+                else:
+                    result = await loop.run_in_executor(None, listener, event)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.error("escalation_listener_error", error=str(e))
+
+    def get_metadata(self) -> Dict[str, Any]:
+        """Get metadata about this rail."""
+        return {
+            "name": "escalation_detection",
+            "version": "1.0.0",
+            "triggers": sorted(self.triggers),
+            "action": self.action,
+            "listeners": len(self._listeners),
+            "capabilities": ["dialog"],
+        }
@@ -0,0 +1,211 @@
+"""Fact checking rail backed by local knowledge bases."""
+
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import structlog
+
+from klyntos_guard.core.knowledge_base import MANIFEST, KnowledgeBase, terms
+from klyntos_guard.core.types import ProcessingContext
+from klyntos_guard.rails.base import BaseRail
+from klyntos_guard.rails.registry import register_rail
+
+logger = structlog.get_logger(__name__)
+
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+|\n+")
+
+# Openings of sentences that are not assertions about the world
+NON_CLAIM_OPENINGS = (
+    "i think", "i believe", "i'm not sure", "i am not sure", "maybe", "perhaps",
+    "please", "let me", "let's", "here is", "here are", "sure", "feel free",
+    "hope this", "if you",
+)
+
+# Verbs typical of factual statements
+FACTUAL_VERBS = frozenset(
+    """
+    is are was were has have had contains contain includes include consists
+    founded established born died located invented discovered released
+    published won reached measures equals holds became
+    """.split()
+)
+
+
+def extract_claims(text: str, min_terms: int = 3) -> List[str]:
+    """
+    Sentences of a text that state checkable facts.
+
+    A claim is a declarative sentence with at least ``min_terms`` content
+    words that contains a number, a factual verb or a proper noun, and does
+    not open with a hedge or a conversational phrase.
+
+    Args:
+        text: LLM output
+        min_terms: Minimum number of non-stopword terms
+
+    Returns:
+        Claim sentences in order of appearance
+    """
+    claims = []
+    for sentence in SENTENCE_BOUNDARY.split(text):
+        sentence = sentence.strip().lstrip("-*• ").strip()
+        if not sentence or sentence.endswith("?"):
+            continue
+        lowered = sentence.lower()
+        if lowered.startswith(NON_CLAIM_OPENINGS):
+            continue
+        if len(terms(sentence)) < min_terms:
+            continue
+
+        words = sentence.split()
+        if (
+            any(char.isdigit() for char in sentence)
+            or any(word.strip(",;:").lower() in FACTUAL_VERBS for word in words)
+            or any(word[:1].isupper() for word in words[1:])
+        ):
+            claims.append(sentence)
+    return claims
+
+
+@register_rail("fact_checking")
+class FactCheckingRail(BaseRail):
+    """
+    Check factual claims in LLM output against a local knowledge base.
+
+    Claim sentences are extracted from the output and each is searched in
+    the tenant's BM25 knowledge base (built with ``kg kb build``). A claim's
+    confidence is the share of its IDF weight found in the best passage, so
+    a passage containing all of the claim's distinctive terms scores 1.0.
+    Claims below ``confidence_threshold`` are unsupported.
+
+    The index is memory-mapped and a search reads only the postings of the
+    claim's terms, which keeps the rail in the synchronous output path for
+    knowledge bases of millions of passages. A knowledge base is reopened
+    when its manifest changes, so a rebuilt or extended index is picked up
+    without restarting.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """Initialize fact checking rail."""
+        super().__init__(config)
+
+        self.confidence_threshold = self.config.get("confidence_threshold", 0.85)
+        # Supporting passages must name their source
+        self.require_sources = self.config.get("require_sources", True)
+        self.top_k = self.config.get("top_k", 3)
+        self.max_claims = self.config.get("max_claims", 20)
+        self.min_claim_terms = self.config.get("min_claim_terms", 3)
+        self.action = self.config.get("action", "warn")  # warn, block
+
+        methods = self.config.get("verification_methods", ["knowledge_base"])
+        unsupported = [method for method in methods if method != "knowledge_base"]
+        if unsupported:
+            logger.warning("fact_checking_methods_unsupported", methods=unsupported)
+
+        # Knowledge base per tenant, and one for tenants without their own
+        self.knowledge_base_paths: Dict[str, str] = dict(self.config.get("knowledge_bases", {}))
+        self.default_knowledge_base_path = self.config.get("knowledge_base_path")
+        # Open knowledge bases with the manifest modification time they were read at
+        self._knowledge_bases: Dict[Optional[str], Tuple[Optional[int], KnowledgeBase]] = {}
+
+    def _knowledge_base(self, tenant_id: Optional[str]) -> Optional[KnowledgeBase]:
+        """The knowledge base of a tenant, reopened if its manifest changed."""
+        if tenant_id not in self.knowledge_base_paths:
+            tenant_id = None
+        path = (
+            self.knowledge_base_paths[tenant_id] if tenant_id is not None
+            else self.default_knowledge_base_path
+        )
+        if path is None:
+            return None
+
+        try:
+            mtime: Optional[int] = (Path(path) / MANIFEST).stat().st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        cached = self._knowledge_bases.get(tenant_id)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        knowledge_base = KnowledgeBase(path)
+        self._knowledge_bases[tenant_id] = (mtime, knowledge_base)
+        if cached is not None:
+            logger.info("fact_checking_knowledge_base_reloaded", path=str(path))
+        return knowledge_base
+
+    def reload(self) -> None:
+        """Reopen every knowledge base on its next use."""
+        self._knowledge_bases.clear()
+
+    async def process_output(
+        self, output_text: str, context: ProcessingContext
+    ) -> Dict[str, Any]:
+        """
+        Check claims in LLM output.
+
+        Args:
+            output_text: The LLM's output text
+            context: Processing context
+
+        Returns:
+            Dictionary with blocking decision, warning and the per-claim
+            evidence under "metadata"
+        """
+        knowledge_base = self._knowledge_base(context.tenant_id)
+        if knowledge_base is None or not len(knowledge_base):
+            return {"blocked": False}
+
+        claims = extract_claims(output_text, self.min_claim_terms)[:self.max_claims]
+        if not claims:
+            return {"blocked": False}
+
+        checked = [self._check_claim(knowledge_base, claim) for claim in claims]
+        unsupported = [claim["claim"] for claim in checked if not claim["supported"]]
+        metadata = {
+            "fact_check": {
+                "claims": checked,
+                "unsupported_count": len(unsupported),
+            }
+        }
+
+        if not unsupported:
+            return {"blocked": False, "metadata": metadata}
+
+        message = f"Unsupported claims: {len(unsupported)} of {len(claims)}"
+        if self.action == "block":
+            return {
+                "blocked": True,
+                "severity": "medium",
+                "message": message,
+                "details": {"unsupported_claims": unsupported},
+                "metadata": metadata,
+            }
+        return {"blocked": False, "warning": message, "metadata": metadata}
+
+    def _check_claim(self, knowledge_base: KnowledgeBase, claim: str) -> Dict[str, Any]:
+        """Evidence for one claim."""
+        hits = knowledge_base.search(claim, self.top_k)
+        if self.require_sources:
+            hits = [hit for hit in hits if hit["passage"].get("source")]
+
+        confidence = max((hit["coverage"] for hit in hits), default=0.0)
+        return {
+            "claim": claim,
+            "confidence": round(confidence, 3),
+            "supported": confidence >= self.confidence_threshold,
+            "passages": [
+                {**hit["passage"], "score": round(hit["score"], 3)} for hit in hits
+            ],
+        }
+
+    def get_metadata(self) -> Dict[str, Any]:
+        """Get metadata about this rail."""
+        return {
+            "name": "fact_checking",
+            "version": "1.0.0",
+            "confidence_threshold": self.confidence_threshold,
+            "tenant_knowledge_bases": len(self.knowledge_base_paths),
+            "action": self.action,
+            "capabilities": ["output"],
+        }
@@ -0,0 +1,204 @@
+"""Output format validation rail."""
+
+import re
+from typing import Any, Dict, Hashable, List, Optional, Pattern, Tuple
+
+from klyntos_guard.core.keywords import LiteralAutomaton
+from klyntos_guard.core.patterns import compile_pattern
+from klyntos_guard.core.types import ProcessingContext, RailType
+from klyntos_guard.rails.base import BaseRail
+from klyntos_guard.rails.registry import register_rail
+
+
+@register_rail("format_validation")
+class FormatValidationRail(BaseRail):
+    """
+    Enforce a maximum length and forbidden patterns on LLM output.
+
+    Forbidden patterns are literals (e.g. ``<script``, ``javascript:``)
+    matched case-insensitively by one automaton. For streamed output,
+    ``stream_validator()`` checks chunks as they arrive: the automaton state
+    is carried across chunks, and the stream is cut as soon as the length
+    limit is crossed or a pattern completes, so oversized or unsafe
+    generations stop early.
+
+    With action ``truncate`` an over-long output is cut to ``max_length``
+    instead of being blocked; forbidden patterns always block.
+    """
+
+    uses_edit_plan = True
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """Initialize format validation rail."""
+        super().__init__(config)
+
+        self.max_length: Optional[int] = self.config.get("max_length")
+        self.forbidden_patterns = self.config.get("forbidden_patterns", [])
+        self.patterns = LiteralAutomaton(self.forbidden_patterns)
+        self.action = self.config.get("action", "block")  # block, truncate
+
+        # On ASCII text, case-insensitive regexes of ASCII literals match
+        # exactly where the automaton does; used by the fused pattern scan
+        self._literal_rules: Dict[Hashable, Pattern] = {}
+        if all(pattern.isascii() for pattern in self.patterns.patterns):
+            self._literal_rules = {
+                pattern: compile_pattern(re.escape(pattern), re.IGNORECASE)
+                for pattern in self.patterns.patterns
+            }
+
+    async def process_output(
+        self, output_text: str, context: ProcessingContext
+    ) -> Dict[str, Any]:
+        """
+        Validate a complete LLM output.
+
+        Args:
+            output_text: The LLM's output text
+            context: Processing context
+
+        Returns:
+            Dictionary with blocking decision and details
+        """
+        checked = output_text
+        if self.max_length is not None and self.action == "truncate":
+            checked = output_text[:self.max_length]
+
+        found = {}
+        if output_text.isascii():
+            found = context.pattern_matches(self, context.text_view(output_text), "original")
+        if found:
+            # The leftmost occurrence of a literal ends first
+            matches = [
+                (pattern, hits[0].start(), hits[0].end())
+                for pattern, hits in found.items()
+                if hits and hits[0].end() <= len(checked)
+            ]
+        else:
+            _, matches = self.patterns.scan(checked)
+        if matches:
+            return self._pattern_violation(matches)
+
+        if self.max_length is not None and len(output_text) > self.max_length:
+            if self.action == "truncate":
+                return {
+                    "blocked": False,
+                    "edits": [(self.max_length, len(output_text), "")],
+                    "warning": f"Output truncated to {self.max_length} characters",
+                    "details": {"length": len(output_text), "max_length": self.max_length},
+                }
+            return self._length_violation(len(output_text))
+
+        return {"blocked": False}
+
+    def pattern_rules(self, stage: RailType) -> Dict[str, Dict[Hashable, Pattern]]:
+        """Forbidden literals, on output."""
+        if stage != RailType.OUTPUT:
+            return {}
+        return {"original": self._literal_rules}
+
+    def stream_validator(self) -> "FormatStreamValidator":
+        """Create a validator for one streamed output."""
+        return FormatStreamValidator(self)
+
+    def _pattern_violation(self, matches: List[Tuple[str, int, int]]) -> Dict[str, Any]:
+        """Result for output containing forbidden patterns."""
+        found = sorted({pattern for pattern, _, _ in matches})
+        return {
+            "blocked": True,
+            "severity": "high",
+            "message": f"Output contains forbidden patterns: {', '.join(found)}",
+            "details": {"forbidden_patterns": found},
+        }
+
+    def _length_violation(self, length: int) -> Dict[str, Any]:
+        """Result for output longer than max_length."""
+        return {
+            "blocked": True,
+            "severity": "low",
+            "message": f"Output exceeds maximum length of {self.max_length} characters",
+            "details": {"length": length, "max_length": self.max_length},
+        }
+
+    def get_metadata(self) -> Dict[str, Any]:
+        """Get metadata about this rail."""
+        return {
+            "name": "format_validation",
+            "version": "1.0.0",
+            "max_length": self.max_length,
+            "forbidden_patterns": len(self.patterns),
+            "action": self.action,
+            "capabilities": ["output", "output_stream"],
+        }
+
+
+class FormatStreamValidator:
+    """
+    Incremental format validation of one streamed output.
+
+    Only the last ``longest pattern - 1`` characters are held back, so a
+    pattern split across chunks is never partially released.
+    """
+
+    def __init__(self, rail: FormatValidationRail):
+        """
+        Initialize the validator.
+
+        Args:
+            rail: Rail providing the limits and patterns
+        """
+        self.rail = rail
+        self.holdback = max(rail.patterns.max_length - 1, 0)
+        self._state = 0
+        self._pending = ""
+        self._length = 0  # characters received so far
+
+    def feed(self, chunk: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """
+        Check the next chunk.
+
+        Args:
+            chunk: Raw output text
+
+        Returns:
+            Text that is now final, and a violation if the stream must stop
+        """
+        rail = self.rail
+        received = self._length
+        self._length += len(chunk)
+
+        over = rail.max_length is not None and self._length > rail.max_length
+        if over:
+            # Characters beyond the limit are never scanned or released
+            chunk = chunk[:rail.max_length - received]
+
+        self._state, matches = rail.patterns.scan(chunk, self._state)
+        if matches:
+            # Match offsets are relative to the chunk; a pattern that began
+            # in an earlier chunk starts inside the held-back text
+            start = min(start for _, start, _ in matches)
+            cut = max(len(self._pending) + start, 0)
+            text, self._pending = self._pending + chunk, ""
+            return text[:cut], self._violation(rail._pattern_violation(matches))
+
+        text = self._pending + chunk
+        if over:
+            self._pending = ""
+            if rail.action == "truncate":
+                return text, self._violation({
+                    "blocked": False,
+                    "message": f"Output truncated to {rail.max_length} characters",
+                })
+            return text, self._violation(rail._length_violation(self._length))
+
+        cut = max(len(text) - self.holdback, 0)
+        self._pending = text[cut:]
+        return text[:cut], None
+
+    def flush(self) -> str:
+        """Release the held-back text at the end of the stream."""
+        text, self._pending = self._pending, ""
+        return text
+
+    def _violation(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Rail result as a stream violation, tagged with the rail."""
+        return {"rail_name": self.rail.__class__.__name__, **result}
@@ -0,0 +1,127 @@
+"""Intent classification and routing rail."""
+
+from typing import Any, Dict, List, Optional
+
+from klyntos_guard.core.centroids import CentroidClassifier
+from klyntos_guard.core.embeddings import TextEmbedder
+from klyntos_guard.core.text import TextView
+from klyntos_guard.core.types import ProcessingContext
+from klyntos_guard.rails.base import BaseRail
+from klyntos_guard.rails.registry import register_rail
+
+
+@register_rail("intent_classification")
+class IntentClassificationRail(BaseRail):
+    """
+    Classify user intents and attach a routing decision.
+
+    Each intent is a centroid of its example utterances (``intent_examples``,
+    falling back to the intent name), embedded with a local sentence
+    encoder. Centroids are cached on disk (``centroid_cache_path``) and
+    input embeddings in memory, so classifying costs one encoder pass for
+    unseen texts and one matrix product; no LLM is called per request.
+
+    The nearest intent above ``similarity_threshold`` wins, otherwise
+    ``fallback_intent``. The decision, including the route from
+    ``routing_rules``, is returned under the "intent" metadata key. The
+    rail never blocks.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """Initialize intent classification rail."""
+        super().__init__(config)
+
+        self.intents = self.config.get("intents", [])
+        self.routing_rules = self.config.get("routing_rules", {})
+        self.fallback_intent = self.config.get("fallback_intent", "unknown")
+        self.default_route = self.config.get("default_route")
+
+        examples = self.config.get("intent_examples", {})
+        embedder = TextEmbedder(
+            backend="local",
+            model_name=self.config.get(
+                "model_name", "sentence-transformers/all-MiniLM-L6-v2"
+            ),
+            cache_size=self.config.get("cache_size", 10000),
+        )
+        self.classifier = CentroidClassifier(
+            embedder,
+            {
+                intent: [
+                    TextView(example).collapsed
+                    for example in examples.get(intent) or [intent.replace("_", " ")]
+                ]
+                for intent in self.intents
+            },
+            thresholds=self.config.get("intent_thresholds"),
+            default_threshold=self.config.get("similarity_threshold", 0.3),
+            cache_path=self.config.get("centroid_cache_path"),
+        )
+
+    async def process_input(
+        self, input_text: str, context: ProcessingContext
+    ) -> Dict[str, Any]:
+        """
+        Classify the intent of user input.
+
+        Args:
+            input_text: The user's input text
+            context: Processing context
+
+        Returns:
+            Dictionary with the intent and route under "metadata"
+        """
+        return (await self.process_input_batch([input_text], context))[0]
+
+    async def process_input_batch(
+        self, input_texts: List[str], context: ProcessingContext
+    ) -> List[Dict[str, Any]]:
+        """Classify a batch with one embedding call."""
+        batch_scores = await self.classifier.classify(
+            [context.text_view(text).collapsed for text in input_texts]
+        )
+        return [self._route(intent_scores) for intent_scores in batch_scores]
+
+    async def process_dialog(
+        self, text: str, context: ProcessingContext
+    ) -> Dict[str, Any]:
+        """
+        Classify the intent of a dialog turn.
+
+        Args:
+            text: The user's turn
+            context: Processing context
+
+        Returns:
+            Dictionary with the intent and route under "metadata"
+        """
+        return await self.process_input(text, context)
+
+    def _route(self, intent_scores: Dict[str, float]) -> Dict[str, Any]:
+        """Routing decision for the best-scoring intent."""
+        if intent_scores:
+            intent, confidence = next(iter(intent_scores.items()))
+        else:
+            intent, confidence = self.fallback_intent, 0.0
+
+        return {
+            "blocked": False,
+            "details": {"intent_scores": intent_scores},
+            "metadata": {
+                "intent": {
+                    "name": intent,
+                    "confidence": confidence,
+                    "route": self.routing_rules.get(intent, self.default_route),
+                }
+            },
+        }
+
+    def get_metadata(self) -> Dict[str, Any]:
+        """Get metadata about this rail."""
+        return {
+            "name": "intent_classification",
+            "version": "1.0.0",
+            "intents": self.intents,
+            "routing_rules": self.routing_rules,
+            "capabilities": ["input", "dialog"],
+        }
@@ -0,0 +1,124 @@
+"""Embedding-similarity jailbreak detection against known attack prompts."""
+
+from typing import Any, Dict, List, Optional
+
+from klyntos_guard.core.embeddings import TextEmbedder
+from klyntos_guard.core.types import ProcessingContext
+from klyntos_guard.core.vector_index import VectorIndex
+from klyntos_guard.rails.base import BaseRail
+from klyntos_guard.rails.registry import register_rail
+
+
+@register_rail("jailbreak_similarity")
+class JailbreakSimilarityRail(BaseRail):
+    """
+    Detect paraphrased jailbreaks by similarity to known attack prompts.
+
+    Complements ``jailbreak_prevention``: inputs are embedded (through the
+    engine's LLM adapter or a local sentence-transformers model) and compared
+    against a memory-mapped index of embedded attack prompts. Inputs whose
+    best cosine similarity reaches the threshold are blocked.
+
+    The index is built with ``VectorIndex.save`` from embeddings produced by
+    the same encoder.
+    """
+
+    uses_edit_plan = True
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """Initialize jailbreak similarity rail."""
+        super().__init__(config)
+
+        index_path = self.config.get("index_path")
+        if not index_path:
+            raise ValueError("JailbreakSimilarityRail requires 'index_path'")
+
+        self.threshold = self.config.get("threshold", 0.85)
+        self.top_k = self.config.get("top_k", 5)
+        self.action = self.config.get("action", "block")  # block, warn
+
+        self.index = VectorIndex.load(
+            index_path,
+            quantize=self.config.get("quantize", False),
+            ivf_threshold=self.config.get("ivf_threshold", 100_000),
+            nprobe=self.config.get("nprobe", 8),
+        )
+
+        self.embedder = TextEmbedder(
+            backend=self.config.get("encoder", "local"),  # local, adapter
+            model_name=self.config.get(
+                "model_name", "sentence-transformers/all-MiniLM-L6-v2"
+            ),
+            cache_size=self.config.get("cache_size", 10000),
+        )
+
+    def bind_adapters(self, adapters: List[Any]) -> None:
+        """Use the engine's first LLM adapter for adapter embeddings."""
+        if adapters and self.embedder.adapter is None:
+            self.embedder.adapter = adapters[0]
+
+    async def process_input(
+        self, input_text: str, context: ProcessingContext
+    ) -> Dict[str, Any]:
+        """
+        Compare user input against the index of known attack prompts.
+
+        Args:
+            input_text: The user's input text
+            context: Processing context
+
+        Returns:
+            Dictionary with blocking decision and nearest attack prompts
+        """
+        text = context.text_view(input_text).collapsed
+        query = await self.embedder.embed([text])
+        scores, ids = self.index.search(query, self.top_k)
+
+        matches = [
+            {
+                "id": int(row_id),
+                "prompt": self.index.labels[row_id] if self.index.labels else None,
+                "score": float(score),
+            }
+            for score, row_id in zip(scores[0], ids[0])
+            if row_id >= 0
+        ]
+        top_score = matches[0]["score"] if matches else 0.0
+
+        if top_score < self.threshold:
+            return {
+                "blocked": False,
+                "details": {"top_score": top_score}
+            }
+
+        details = {
+            "top_score": top_score,
+            "threshold": self.threshold,
+            "matches": [m for m in matches if m["score"] >= self.threshold],
+        }
+
+        if self.action == "warn":
+            return {
+                "blocked": False,
+                "warning": f"Input resembles a known jailbreak (similarity: {top_score:.2f})",
+                "details": details
+            }
+
+        return {
+            "blocked": True,
+            "severity": "high" if top_score >= 0.95 else "medium",
+            "message": f"Input resembles a known jailbreak (similarity: {top_score:.2f})",
+            "details": details
+        }
+
+    def get_metadata(self) -> Dict[str, Any]:
+        """Get metadata about this rail."""
+        return {
+            "name": "jailbreak_similarity",
+            "version": "1.0.0",
+            "threshold": self.threshold,
+            "index_size": self.index.size,
+            "quantized": self.index.quantized,
+            "encoder": self.embedder.backend,
+            "capabilities": ["input"],
+        }
@@ -1,20 +1,73 @@
 """PII detection and redaction rail using Presidio."""
 
 import re
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Pattern, Tuple
 
-try:
-    from presidio_analyzer import AnalyzerEngine
-    from presidio_anonymizer import AnonymizerEngine
-    from presidio_anonymizer.entities import OperatorConfig
-    PRESIDIO_AVAILABLE = True
-except ImportError:
-    PRESIDIO_AVAILABLE = False
-
-from klyntos_guard.core.types import ProcessingContext
+from klyntos_guard.core.patterns import compile_pattern
+from klyntos_guard.core.presidio import PRESIDIO_AVAILABLE, get_analyzer
+from klyntos_guard.core.streaming import StreamingRedactor
+from klyntos_guard.core.text import TextView
+from klyntos_guard.core.types import ProcessingContext, RailType
 from klyntos_guard.rails.base import BaseRail
 from klyntos_guard.rails.registry import register_rail
 
+# Entities found by the spaCy NER model
+NER_ENTITIES = {"PERSON", "LOCATION", "NRP", "ORGANIZATION", "DATE_TIME"}
+
+_DIGIT = re.compile(r"\d")
+_DATE_WORD = re.compile(
+    r"\b(?:today|tomorrow|yesterday|tonight|morning|afternoon|evening|noon|midnight"
+    r"|week|month|year|(?:mon|tues|wednes|thurs|fri|satur|sun)day"
+    r"|jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?"
+    r"|aug(?:ust)?|sep(?:tember)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\b",
+    re.IGNORECASE,
+)
+
+
+def _plausible_entities(text: str, entities: List[str]) -> Tuple[List[str], bool]:
+    """
+    Entities that could possibly occur in the text, by cheap checks.
+
+    Digit-based identifiers need a digit, emails an ``@``, and names,
+    places and organizations a capitalized token. Entity types without
+    a known check are always considered possible.
+
+    Returns:
+        (possible entities, whether spaCy NER is needed to find them);
+        numeric dates are left to Presidio's regex date recognizer
+    """
+    has_digit = _DIGIT.search(text) is not None
+    has_upper = text != text.lower()
+    has_at = "@" in text or "\uff20" in text
+
+    plausible = []
+    needs_ner = False
+    for entity in entities:
+        if entity == "EMAIL_ADDRESS":
+            possible = has_at
+        elif entity in NER_ENTITIES and entity != "DATE_TIME":
+            possible = has_upper
+            needs_ner = needs_ner or possible
+        elif entity == "DATE_TIME":
+            named = has_upper or _DATE_WORD.search(text) is not None
+            possible = has_digit or named
+            needs_ner = needs_ner or named
+        elif entity == "IP_ADDRESS":
+            possible = has_digit or ":" in text
+        elif entity == "URL":
+            possible = "." in text
+        elif entity in (
+            "PHONE_NUMBER", "CREDIT_CARD", "US_SSN", "US_BANK_NUMBER",
+            "US_DRIVER_LICENSE", "US_PASSPORT", "US_ITIN", "IBAN_CODE",
+            "MEDICAL_LICENSE", "UK_NHS",
+        ):
+            possible = has_digit
+        else:
+            possible = True
+        if possible:
+            plausible.append(entity)
+    return plausible, needs_ner
+
 
 @register_rail("pii_detection")
 class PIIDetectionRail(BaseRail):
@@ -32,6 +85,8 @@ class PIIDetectionRail(BaseRail):
     - And more...
     """
 
+    uses_edit_plan = True
+
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         """Initialize PII detection rail."""
         super().__init__(config)
@@ -39,12 +94,21 @@ class PIIDetectionRail(BaseRail):
         if not PRESIDIO_AVAILABLE:
             raise ImportError(
                 "Presidio is required for PIIDetectionRail. "
-                "Install it with: pip install presidio-analyzer presidio-anonymizer"
+                "Install it with: pip install presidio-analyzer"
             )
 
-        # Initialize Presidio engines
-        self.analyzer = AnalyzerEngine()
-        self.anonymizer = AnonymizerEngine()
+        self.locale = self.config.get("locale", "en")
+
+        # Presidio engines are shared by all rails with the same language,
+        # recognizer set and spaCy pipeline (optionally a lighter one)
+        nlp = self.config.get("nlp", {})
+        self.analyzer = get_analyzer(
+            self.locale,
+            recognizers=self.config.get("recognizers"),
+            model_name=nlp.get("model_name"),
+            disable=nlp.get("disable", ()),
+        )
+        self.batch_size = self.config.get("batch_size", 32)
 
         # Configuration
         self.entities_to_detect = self.config.get("detect", [
@@ -59,9 +123,13 @@ class PIIDetectionRail(BaseRail):
         ])
 
         self.action = self.config.get("action", "redact")  # redact, block, warn
-        self.locale = self.config.get("locale", "en")
         self.score_threshold = self.config.get("score_threshold", 0.5)
 
+        # Tiered detection: skip Presidio, or run it without NER, when the
+        # configured entities cannot occur in the text
+        self.prefilter = self.config.get("prefilter", True)
+        self.stats = {"requests": 0, "skipped": 0, "ner_skipped": 0}
+
         # Redaction template
         self.redaction_template = self.config.get(
             "redaction_template",
@@ -82,18 +150,73 @@ class PIIDetectionRail(BaseRail):
             Dictionary with blocking decision, redacted text, and details
         """
         # Analyze for PII
-        analyzer_results = self.analyzer.analyze(
-            text=input_text,
-            entities=self.entities_to_detect,
-            language=self.locale,
-            score_threshold=self.score_threshold
+        analyzer_results, tier = self._analyze(input_text)
+        return self._build_result(input_text, analyzer_results, tier)
+
+    async def process_input_batch(
+        self, input_texts: List[str], context: ProcessingContext
+    ) -> List[Dict[str, Any]]:
+        """
+        Process several texts, running spaCy over them as one batch.
+
+        Args:
+            input_texts: Texts to check
+            context: Processing context
+
+        Returns:
+            One result dictionary per text, as from process_input
+        """
+        return [
+            self._build_result(text, analyzer_results, tier)
+            for text, (analyzer_results, tier) in zip(
+                input_texts, self._analyze_batch(input_texts)
+            )
+        ]
+
+    def stream_redactor(self) -> StreamingRedactor:
+        """
+        Create a redactor for one streamed text (e.g. LLM output chunks).
+
+        Only the last ``stream_holdback`` characters are held back, so NER
+        sees a short window around each entity; raise the holdback for
+        better recall on long names and addresses.
+        """
+        return StreamingRedactor(
+            self._detect_spans,
+            self.redaction_template.format,
+            holdback=self.config.get("stream_holdback", 64),
         )
 
+    def _detect_spans(self, text: str) -> List[Tuple[int, int, str]]:
+        """
+        Sorted, non-overlapping (start, end, entity type) spans.
+
+        Overlapping results are merged into one span over their union,
+        labelled with the highest-scoring entity type.
+        """
+        analyzer_results, _ = self._analyze(text)
+        spans: List[Tuple[int, int, str]] = []
+        best_score = 0.0
+        for result in sorted(analyzer_results, key=lambda r: (r.start, -r.score)):
+            if spans and result.start < spans[-1][1]:
+                start, end, entity_type = spans[-1]
+                if result.score > best_score:
+                    entity_type, best_score = result.entity_type, result.score
+                spans[-1] = (start, max(end, result.end), entity_type)
+                continue
+            spans.append((result.start, result.end, result.entity_type))
+            best_score = result.score
+        return spans
+
+    def _build_result(
+        self, input_text: str, analyzer_results: List[Any], tier: str
+    ) -> Dict[str, Any]:
+        """Turn analyzer results into the rail result for the configured action."""
         # Check if PII was found
         if not analyzer_results:
             return {
                 "blocked": False,
-                "details": {"pii_found": False}
+                "details": {"pii_found": False, "tier": tier}
             }
 
         # PII detected - handle based on action
@@ -121,30 +244,20 @@ class PIIDetectionRail(BaseRail):
             }
 
         elif self.action == "redact":
-            # Redact PII
-            operators = {
-                entity_type: OperatorConfig(
-                    "replace",
-                    {"new_value": self.redaction_template.format(entity_type)}
-                )
-                for entity_type in self.entities_to_detect
-            }
-
-            anonymized_result = self.anonymizer.anonymize(
-                text=input_text,
-                analyzer_results=analyzer_results,
-                operators=operators
-            )
-
+            # Overlapping results are redacted as one span, labelled with
+            # the highest-scoring entity
+            ranked = sorted(analyzer_results, key=lambda r: -r.score)
             return {
                 "blocked": False,
-                "transformed_input": anonymized_result.text,
+                "edits": [
+                    (r.start, r.end, self.redaction_template.format(r.entity_type))
+                    for r in ranked
+                ],
                 "warning": f"PII redacted: {len(analyzer_results)} instances",
                 "details": {
                     "pii_found": True,
                     "pii_entities": pii_details,
-                    "redacted_count": len(analyzer_results),
-                    "original_text": input_text
+                    "redacted_count": len(analyzer_results)
                 }
             }
 
@@ -160,6 +273,134 @@ class PIIDetectionRail(BaseRail):
 
         return {"blocked": False}
 
+    def _analyze(self, text: str) -> Tuple[List[Any], str]:
+        """
+        Run the cheapest Presidio tier that can find the configured entities.
+
+        Returns:
+            (analyzer results, tier) where tier is "skipped" (no entity is
+            possible), "regex" (NER entities not possible, spaCy NER is not
+            run) or "full"
+        """
+        self.stats["requests"] += 1
+        entities = self.entities_to_detect
+        if not self.prefilter:
+            return self._run_analyzer(text, entities), "full"
+
+        entities, needs_ner = _plausible_entities(text, entities)
+        if not entities:
+            self.stats["skipped"] += 1
+            self.stats["ner_skipped"] += 1
+            return [], "skipped"
+
+        if not needs_ner:
+            self.stats["ner_skipped"] += 1
+            return self._run_analyzer(text, entities, self._artifacts_without_ner(text)), "regex"
+
+        return self._run_analyzer(text, entities), "full"
+
+    def _analyze_batch(self, texts: List[str]) -> List[Tuple[List[Any], str]]:
+        """
+        Tiered analysis of many texts with batched spaCy processing.
+
+        Texts are grouped by tier; each group goes through the spaCy
+        pipeline once via ``nlp.pipe``.
+
+        Returns:
+            (analyzer results, tier) per text
+        """
+        self.stats["requests"] += len(texts)
+        if not self.prefilter:
+            from presidio_analyzer import BatchAnalyzerEngine
+
+            batch_analyzer = BatchAnalyzerEngine(analyzer_engine=self.analyzer)
+            return [
+                (analyzer_results, "full")
+                for analyzer_results in batch_analyzer.analyze_iterator(
+                    texts,
+                    language=self.locale,
+                    batch_size=self.batch_size,
+                    entities=self.entities_to_detect,
+                    score_threshold=self.score_threshold,
+                )
+            ]
+
+        outcomes: List[Tuple[List[Any], str]] = [([], "skipped")] * len(texts)
+        regex_group = []
+        full_group = []
+        for index, text in enumerate(texts):
+            entities, needs_ner = _plausible_entities(text, self.entities_to_detect)
+            if not entities:
+                self.stats["skipped"] += 1
+                self.stats["ner_skipped"] += 1
+            elif needs_ner:
+                full_group.append((index, entities))
+            else:
+                self.stats["ner_skipped"] += 1
+                regex_group.append((index, entities))
+
+        if regex_group:
+            artifacts = self._artifacts_without_ner_batch([texts[i] for i, _ in regex_group])
+            for (index, entities), nlp_artifacts in zip(regex_group, artifacts):
+                outcomes[index] = (
+                    self._run_analyzer(texts[index], entities, nlp_artifacts), "regex"
+                )
+
+        if full_group:
+            artifacts = self.analyzer.nlp_engine.process_batch(
+                [texts[i] for i, _ in full_group],
+                language=self.locale,
+                batch_size=self.batch_size,
+            )
+            for (index, entities), (_, nlp_artifacts) in zip(full_group, artifacts):
+                outcomes[index] = (
+                    self._run_analyzer(texts[index], entities, nlp_artifacts), "full"
+                )
+
+        return outcomes
+
+    def _run_analyzer(
+        self, text: str, entities: List[str], nlp_artifacts: Any = None
+    ) -> List[Any]:
+        """Call the Presidio analyzer for the given entities."""
+        return self.analyzer.analyze(
+            text=text,
+            entities=entities,
+            language=self.locale,
+            score_threshold=self.score_threshold,
+            nlp_artifacts=nlp_artifacts
+        )
+
+    def _artifacts_without_ner(self, text: str) -> Any:
+        """
+        NLP artifacts from the spaCy pipeline with NER and parser disabled.
+
+        Tokens and lemmas are still produced, so recognizers keep their
+        context-word score boosts (e.g. "phone" next to a number).
+        """
+        nlp_engine = self.analyzer.nlp_engine
+        if not hasattr(nlp_engine, "_doc_to_nlp_artifact"):
+            # Not a spaCy-based engine: let the analyzer run its own pipeline
+            return None
+
+        pipeline = nlp_engine.get_nlp(self.locale)
+        disable = [name for name in ("ner", "parser") if name in pipeline.pipe_names]
+        doc = pipeline(text, disable=disable)
+        return nlp_engine._doc_to_nlp_artifact(doc, self.locale)
+
+    def _artifacts_without_ner_batch(self, texts: List[str]) -> List[Any]:
+        """Batched ``_artifacts_without_ner`` using ``nlp.pipe``."""
+        nlp_engine = self.analyzer.nlp_engine
+        if not hasattr(nlp_engine, "_doc_to_nlp_artifact"):
+            return [None] * len(texts)
+
+        pipeline = nlp_engine.get_nlp(self.locale)
+        disable = [name for name in ("ner", "parser") if name in pipeline.pipe_names]
+        return [
+            nlp_engine._doc_to_nlp_artifact(doc, self.locale)
+            for doc in pipeline.pipe(texts, batch_size=self.batch_size, disable=disable)
+        ]
+
     async def process_output(
         self, output_text: str, context: ProcessingContext
     ) -> Dict[str, Any]:
@@ -178,6 +419,12 @@ class PIIDetectionRail(BaseRail):
             "entities": self.entities_to_detect,
             "action": self.action,
             "locale": self.locale,
+            "prefilter": self.prefilter,
+            "stats": dict(self.stats),
+            "ner_skip_fraction": (
+                self.stats["ner_skipped"] / self.stats["requests"]
+                if self.stats["requests"] else 0.0
+            ),
             "capabilities": ["input", "output"],
         }
 
@@ -194,48 +441,64 @@ class SimplePIIDetectionRail(BaseRail):
     - Credit card numbers
     """
 
+    uses_edit_plan = True
+
     # Regex patterns
     EMAIL_PATTERN = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
     PHONE_PATTERN = r'\b(?:\+?1[-.]?)?\(?([0-9]{3})\)?[-.]?([0-9]{3})[-.]?([0-9]{4})\b'
     SSN_PATTERN = r'\b(?!000|666|9\d{2})\d{3}[-]?(?!00)\d{2}[-]?(?!0000)\d{4}\b'
     CC_PATTERN = r'\b(?:\d{4}[-\s]?){3}\d{4}\b'
 
+    # Entity types in overlap priority order (first wins)
+    DEFAULT_PRIORITY = ["CREDIT_CARD", "SSN", "PHONE", "EMAIL"]
+
+    # A possibly incomplete entity at the end of a stream buffer: the last
+    # non-space run, or a run of space-separated card digit groups
+    STREAM_TAIL = re.compile(r"(?:(?:\d{4}[-\s]){1,3}\d{0,4}|\S*)\Z")
+
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         """Initialize simple PII detection rail."""
         super().__init__(config)
 
         self.action = self.config.get("action", "redact")
         self.patterns = {
-            "EMAIL": re.compile(self.EMAIL_PATTERN),
-            "PHONE": re.compile(self.PHONE_PATTERN),
-            "SSN": re.compile(self.SSN_PATTERN),
-            "CREDIT_CARD": re.compile(self.CC_PATTERN),
+            "EMAIL": compile_pattern(self.EMAIL_PATTERN),
+            "PHONE": compile_pattern(self.PHONE_PATTERN),
+            "SSN": compile_pattern(self.SSN_PATTERN),
+            "CREDIT_CARD": compile_pattern(self.CC_PATTERN),
         }
 
+        priority = self.config.get("priority", self.DEFAULT_PRIORITY)
+        self.priority = [t for t in priority if t in self.patterns] + [
+            t for t in self.patterns if t not in priority
+        ]
+        self._rank = {entity_type: rank for rank, entity_type in enumerate(self.priority)}
+
+        # One pass over the text: a lookahead at each position reports the
+        # highest-priority entity starting there, so overlapping candidates
+        # that start at different positions are all seen.
+        self._combined = compile_pattern(
+            "(?=" + "|".join(
+                f"(?P<{entity_type}>{self.patterns[entity_type].pattern})"
+                for entity_type in self.priority
+            ) + ")"
+        )
+
     async def process_input(
         self, input_text: str, context: ProcessingContext
     ) -> Dict[str, Any]:
         """Process input for PII using regex patterns."""
-        detections = []
-        redacted_text = input_text
-
-        # Check each pattern
-        for entity_type, pattern in self.patterns.items():
-            matches = pattern.finditer(input_text)
-            for match in matches:
-                detections.append({
-                    "entity_type": entity_type,
-                    "text": match.group(),
-                    "start": match.start(),
-                    "end": match.end()
-                })
-
-                # Redact if configured
-                if self.action == "redact":
-                    redacted_text = redacted_text.replace(
-                        match.group(),
-                        f"[{entity_type} REDACTED]"
-                    )
+        detections = [
+            {
+                "entity_type": entity_type,
+                "text": input_text[start:end],
+                "start": start,
+                "end": end
+            }
+            for start, end, entity_type in self._detect_spans(
+                context.text_view(input_text), context
+            )
+        ]
 
         if not detections:
             return {"blocked": False}
@@ -251,13 +514,83 @@ class SimplePIIDetectionRail(BaseRail):
         elif self.action == "redact":
             return {
                 "blocked": False,
-                "transformed_input": redacted_text,
+                "edits": [
+                    (d["start"], d["end"], f"[{d['entity_type']} REDACTED]")
+                    for d in detections
+                ],
                 "warning": f"PII redacted: {len(detections)} instances",
                 "details": {"detections": detections}
             }
 
         return {"blocked": False, "warning": "PII detected"}
 
+    def stream_redactor(self) -> StreamingRedactor:
+        """Create a redactor for one streamed text (e.g. LLM output chunks)."""
+        return StreamingRedactor(
+            lambda text: self._detect_spans(TextView(text)),
+            lambda entity_type: f"[{entity_type} REDACTED]",
+            holdback=self.config.get("stream_holdback", 64),
+            tail_pattern=self.STREAM_TAIL,
+        )
+
+    def pattern_rules(self, stage: RailType) -> Dict[str, Dict[Hashable, Pattern]]:
+        """The combined entity pattern, on input and output."""
+        if stage in (RailType.INPUT, RailType.OUTPUT):
+            return {"nfkc": {"entities": self._combined}}
+        return {}
+
+    def _detect_spans(
+        self, view: TextView, context: Optional[ProcessingContext] = None
+    ) -> List[Tuple[int, int, str]]:
+        """
+        Sorted, non-overlapping PII spans in the original text.
+
+        Matching runs on the NFKC form (full-width digits, zero-width
+        separators); offsets are mapped back to the original text.
+        """
+        found = context.pattern_matches(self, view, "nfkc") if context else {}
+        spans = []
+        for entity_type, start, end in self._collect(view.nfkc, found.get("entities")):
+            start, end = view.span("nfkc", start, end)
+            spans.append((start, end, entity_type))
+        return spans
+
+    def _collect(
+        self, text: str, matches: Optional[Iterable[Any]] = None
+    ) -> List[Tuple[str, int, int]]:
+        """
+        Collect non-overlapping PII spans in one scan of the text.
+
+        The combined pattern reports the highest-priority entity starting at
+        each position; lower-priority entities starting there are matched
+        directly, since they may extend further (a phone number that starts
+        an email address). Overlapping candidates are merged into one span
+        covering their union, labelled with the highest-priority type, so no
+        part of a detected entity is left in cleartext. ``matches`` are the
+        combined pattern's matches from a fused scan, if already known.
+        """
+        rank = self._rank
+        ranked = [(entity_type, self.patterns[entity_type]) for entity_type in self.priority]
+        spans: List[Tuple[str, int, int]] = []
+        if matches is None:
+            matches = self._combined.finditer(text)
+        for match in matches:
+            entity_type = match.lastgroup
+            start, end = match.span(entity_type)
+            for _, pattern in ranked[rank[entity_type] + 1:]:
+                longer = pattern.match(text, start)
+                if longer is not None and longer.end() > end:
+                    end = longer.end()
+
+            if spans and start < spans[-1][2]:
+                kept_type, kept_start, kept_end = spans[-1]
+                if rank[entity_type] < rank[kept_type]:
+                    kept_type = entity_type
+                spans[-1] = (kept_type, kept_start, max(kept_end, end))
+                continue
+            spans.append((entity_type, start, end))
+        return spans
+
     async def process_output(
         self, output_text: str, context: ProcessingContext
     ) -> Dict[str, Any]:
@@ -0,0 +1,82 @@
+"""Blocklist rail for confirmed-malicious prompts."""
+
+from typing import Any, Dict, Optional
+
+from klyntos_guard.core.blocklist import BloomBlocklist, fingerprint
+from klyntos_guard.core.types import ProcessingContext
+from klyntos_guard.rails.base import BaseRail
+from klyntos_guard.rails.registry import register_rail
+
+
+@register_rail("prompt_blocklist")
+class PromptBlocklistRail(BaseRail):
+    """
+    Block prompts that exactly match a known-malicious prompt after normalization.
+
+    Prompts are normalized through the shared TextView (NFKC, casefolding,
+    homoglyphs, whitespace, leetspeak), fingerprinted, and checked against
+    a memory-mapped Bloom filter built with ``kg blocklist build``. Filter
+    positives are confirmed against the exact fingerprint set, so there are
+    no false blocks.
+    """
+
+    uses_edit_plan = True
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """Initialize prompt blocklist rail."""
+        super().__init__(config)
+
+        filter_path = self.config.get("filter_path")
+        if not filter_path:
+            raise ValueError("PromptBlocklistRail requires 'filter_path'")
+
+        self.blocklist = BloomBlocklist.load(filter_path)
+        self.action = self.config.get("action", "block")  # block, warn
+
+    async def process_input(
+        self, input_text: str, context: ProcessingContext
+    ) -> Dict[str, Any]:
+        """
+        Check user input against the blocklist.
+
+        Args:
+            input_text: The user's input text
+            context: Processing context
+
+        Returns:
+            Dictionary with blocking decision and fingerprint
+        """
+        key = fingerprint(context.text_view(input_text))
+        if key not in self.blocklist:
+            return {"blocked": False}
+
+        details = {
+            "fingerprint": f"{key:016x}",
+            "blocklist_created_at": self.blocklist.created_at,
+        }
+
+        if self.action == "warn":
+            return {
+                "blocked": False,
+                "warning": "Input matches a known malicious prompt",
+                "details": details
+            }
+
+        return {
+            "blocked": True,
+            "severity": "high",
+            "message": "Input matches a known malicious prompt",
+            "details": details
+        }
+
+    def get_metadata(self) -> Dict[str, Any]:
+        """Get metadata about this rail."""
+        return {
+            "name": "prompt_blocklist",
+            "version": "1.0.0",
+            "entries": len(self.blocklist),
+            "num_bits": self.blocklist.num_bits,
+            "num_hashes": self.blocklist.num_hashes,
+            "created_at": self.blocklist.created_at,
+            "capabilities": ["input"],
+        }
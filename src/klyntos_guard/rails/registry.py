@@ -1,6 +1,7 @@
 """Registry for guardrail implementations."""
 
-from typing import Dict, Optional, Type
+import importlib
+from typing import Any, Dict, Mapping, Optional, Type
 
 import structlog
 
@@ -13,12 +14,38 @@ class RailRegistry:
     """
     Registry for managing guardrail implementations.
 
-    Allows dynamic registration and retrieval of rail classes.
+    Allows dynamic registration and retrieval of rail classes. Rails can
+    also be declared by name without being imported: ``sources`` maps rail
+    names to the modules that register them, and third-party packages can
+    publish rails as setuptools entry points in ``entry_point_group``::
+
+        entry_points={
+            "klyntos_guard.rails": [
+                "profanity_filter = my_package.rails:ProfanityFilterRail",
+            ],
+        }
+
+    A declared rail is imported the first time it is looked up, so loading
+    the registry costs nothing and only configured rails (and their heavy
+    optional dependencies) are ever imported.
     """
 
-    def __init__(self):
-        """Initialize the registry."""
+    def __init__(
+        self,
+        sources: Optional[Mapping[str, str]] = None,
+        entry_point_group: Optional[str] = None,
+    ):
+        """
+        Initialize the registry.
+
+        Args:
+            sources: Module path per rail name, imported on first lookup
+            entry_point_group: Entry point group searched for unknown names
+        """
         self._rails: Dict[str, Type[BaseRail]] = {}
+        self._sources: Dict[str, str] = dict(sources or {})
+        self.entry_point_group = entry_point_group
+        self._entry_points: Optional[Dict[str, Any]] = None
 
     def register(self, name: str, rail_class: Type[BaseRail]) -> None:
         """
@@ -54,15 +81,22 @@ class RailRegistry:
         Returns:
             The rail class, or None if not found
         """
-        return self._rails.get(name)
+        rail_class = self._rails.get(name)
+        if rail_class is None:
+            self._load(name)
+            rail_class = self._rails.get(name)
+        return rail_class
 
     def list_rails(self) -> Dict[str, Type[BaseRail]]:
         """
-        Get all registered rails.
+        Get all registered rails, importing every declared one.
 
         Returns:
             Dictionary mapping rail names to classes
         """
+        for name in list(self._sources) + list(self._get_entry_points()):
+            if name not in self._rails:
+                self._load(name)
         return self._rails.copy()
 
     def unregister(self, name: str) -> bool:
@@ -75,28 +109,112 @@ class RailRegistry:
         Returns:
             True if the rail was unregistered, False if it wasn't registered
         """
+        # A declared rail must not be imported again on the next lookup
+        self._sources.pop(name, None)
+        if self._entry_points is not None:
+            self._entry_points.pop(name, None)
         if name in self._rails:
             del self._rails[name]
             logger.info("rail_unregistered", name=name)
             return True
         return False
 
+    def _load(self, name: str) -> None:
+        """Import a declared rail; its module registers it."""
+        module_name = self._sources.get(name)
+        if module_name is not None:
+            importlib.import_module(module_name)
+            return
+
+        entry_point = self._get_entry_points().get(name)
+        if entry_point is None:
+            return
+        loaded = entry_point.load()
+        # An entry point may name the class itself rather than a module
+        # whose decorators register it
+        if (
+            name not in self._rails
+            and isinstance(loaded, type)
+            and issubclass(loaded, BaseRail)
+        ):
+            self.register(name, loaded)
+        logger.info("rail_entry_point_loaded", name=name, value=entry_point.value)
+
+    def _get_entry_points(self) -> Dict[str, Any]:
+        """Entry points of the group by name, read once from package metadata."""
+        if self._entry_points is None:
+            self._entry_points = (
+                {entry.name: entry for entry in _entry_points(self.entry_point_group)}
+                if self.entry_point_group else {}
+            )
+        return self._entry_points
+
+
+def _entry_points(group: str) -> list:
+    """Installed entry points of a group."""
+    from importlib.metadata import entry_points
+
+    found = entry_points()
+    if hasattr(found, "select"):  # Python 3.10+
+        return list(found.select(group=group))
+    return list(found.get(group, ()))
+
+
+# Built-in rails and the modules that register them, imported on first use
+BUILTIN_RAILS = {
+    "content_safety": "klyntos_guard.rails.content_safety",
+    "escalation_detection": "klyntos_guard.rails.escalation_detection",
+    "fact_checking": "klyntos_guard.rails.fact_checking",
+    "format_validation": "klyntos_guard.rails.format_validation",
+    "intent_classification": "klyntos_guard.rails.intent_classification",
+    "jailbreak_prevention": "klyntos_guard.rails.jailbreak_prevention",
+    "jailbreak_similarity": "klyntos_guard.rails.jailbreak_similarity",
+    "pii_detection": "klyntos_guard.rails.pii_detection",
+    "pii_detection_simple": "klyntos_guard.rails.pii_detection",
+    "prompt_blocklist": "klyntos_guard.rails.prompt_blocklist",
+    "source_verification": "klyntos_guard.rails.source_verification",
+    "topic_control": "klyntos_guard.rails.topic_control",
+    "topic_steering": "klyntos_guard.rails.topic_control",
+    "toxicity_filter": "klyntos_guard.rails.toxicity_filter",
+}
+
+# Entry point group through which installed packages provide rails
+RAIL_ENTRY_POINT_GROUP = "klyntos_guard.rails"
 
 # Global registry instance
-_global_registry = RailRegistry()
+_global_registry = RailRegistry(BUILTIN_RAILS, entry_point_group=RAIL_ENTRY_POINT_GROUP)
+
 
+def get_registry() -> RailRegistry:
+    """
+    Get the global registry.
+
+    Built-in and entry point rails are imported when first looked up.
 
-def register_rail(name: str, rail_class: Type[BaseRail]) -> None:
+    Returns:
+        The global RailRegistry
+    """
+    return _global_registry
+
+
+def register_rail(name: str, rail_class: Optional[Type[BaseRail]] = None):
     """
     Register a rail in the global registry.
 
-    This is a convenience function for the decorator pattern.
+    Can be called directly or used as a class decorator:
+
+        @register_rail("my_custom_rail")
+        class MyCustomRail(BaseRail):
+            ...
 
     Args:
         name: Name to register the rail under
-        rail_class: The rail class to register
+        rail_class: The rail class to register (omit when used as a decorator)
     """
+    if rail_class is None:
+        return rail(name)
     _global_registry.register(name, rail_class)
+    return rail_class
 
 
 def get_rail(name: str) -> Optional[Type[BaseRail]]:
@@ -0,0 +1,114 @@
+"""Source verification rail for retrieved content."""
+
+from typing import Any, Dict, Optional
+
+from klyntos_guard.core.domains import DomainTrie, url_host
+from klyntos_guard.core.types import ProcessingContext
+from klyntos_guard.rails.base import BaseRail
+from klyntos_guard.rails.registry import register_rail
+
+TRUSTED = "trusted"
+BLOCKED = "blocked"
+
+
+@register_rail("source_verification")
+class SourceVerificationRail(BaseRail):
+    """
+    Keep retrieved chunks only if they come from trusted domains.
+
+    Trusted and blocked domains (exact hosts, or ``*.example.com`` for any
+    subdomain) are compiled into one reversed-label trie, so checking a
+    chunk costs a few dict lookups however long the lists are. The most
+    specific matching pattern decides; a domain listed as both trusted and
+    blocked is blocked. Each distinct source in a batch is parsed and looked
+    up once.
+
+    With ``trusted_domains`` empty, every source that is not blocked is
+    accepted.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """Initialize source verification rail."""
+        super().__init__(config)
+
+        self.trusted_domains = self.config.get("trusted_domains", [])
+        self.blocked_domains = self.config.get("blocked_domains", [])
+
+        self.domains = DomainTrie()
+        self.domains.update(self.trusted_domains, TRUSTED)
+        self.domains.update(self.blocked_domains, BLOCKED)
+
+        # Drop chunks without a (parsable) source
+        self.require_verification = self.config.get("require_verification", True)
+
+        self.action = self.config.get("action", "filter")  # filter, block
+
+    async def process_retrieval(
+        self, retrieved_chunks: list, context: ProcessingContext
+    ) -> Dict[str, Any]:
+        """
+        Filter retrieved chunks by the domain of their source.
+
+        Args:
+            retrieved_chunks: Chunks as dicts with "content" and "source"
+            context: Processing context
+
+        Returns:
+            Dictionary with per-chunk verdicts and the kept chunks
+        """
+        reasons_by_source: Dict[Any, Optional[str]] = {}
+        verdicts = []
+        filtered = []
+        rejected_sources = []
+
+        for chunk in retrieved_chunks:
+            source = chunk.get("source")
+            if source not in reasons_by_source:
+                reasons_by_source[source] = self._check_source(source)
+            reason = reasons_by_source[source]
+
+            if reason is None:
+                verdicts.append({"allowed": True})
+                filtered.append(chunk)
+            else:
+                verdicts.append({"allowed": False, "reason": reason})
+                rejected_sources.append(source)
+
+        if rejected_sources and self.action == "block":
+            return {
+                "blocked": True,
+                "severity": "high",
+                "message": f"Retrieved content from unverified sources: {len(rejected_sources)}",
+                "details": {"rejected_sources": sorted(set(map(str, rejected_sources)))},
+            }
+
+        return {
+            "blocked": False,
+            "chunk_verdicts": verdicts,
+            "filtered_chunks": filtered,
+            "details": {"rejected_count": len(rejected_sources)},
+        }
+
+    def _check_source(self, source: Optional[str]) -> Optional[str]:
+        """Reason to reject a source, or None if it is acceptable."""
+        host = url_host(source) if source else None
+        if host is None:
+            return "unverified source" if self.require_verification else None
+
+        verdict = self.domains.lookup(host)
+        if verdict == BLOCKED:
+            return f"blocked domain: {host}"
+        if verdict is None and self.trusted_domains:
+            return f"untrusted domain: {host}"
+        return None
+
+    def get_metadata(self) -> Dict[str, Any]:
+        """Get metadata about this rail."""
+        return {
+            "name": "source_verification",
+            "version": "1.0.0",
+            "domain_patterns": len(self.domains),
+            "require_verification": self.require_verification,
+            "action": self.action,
+            "capabilities": ["retrieval"],
+        }
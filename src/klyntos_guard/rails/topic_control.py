@@ -1,11 +1,21 @@
 """Topic control and classification rail."""
 
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Hashable, List, Optional, Pattern
 
-from klyntos_guard.core.types import ProcessingContext
+import structlog
+
+from klyntos_guard.core.centroids import CentroidClassifier
+from klyntos_guard.core.embeddings import TextEmbedder
+from klyntos_guard.core.keywords import TOKEN, KeywordAutomaton, keyword_pattern
+from klyntos_guard.core.patterns import compile_pattern
+from klyntos_guard.core.sessions import SessionState, session_key
+from klyntos_guard.core.text import TextView
+from klyntos_guard.core.types import ProcessingContext, RailType
 from klyntos_guard.rails.base import BaseRail
 from klyntos_guard.rails.registry import register_rail
 
+logger = structlog.get_logger(__name__)
+
 
 @register_rail("topic_control")
 class TopicControlRail(BaseRail):
@@ -14,8 +24,18 @@ class TopicControlRail(BaseRail):
 
     Ensures conversations stay within allowed domains and prevents
     discussion of blocked topics.
+
+    In ``keyword`` mode topics are detected by keyword hits. In
+    ``embedding`` mode each input is embedded once and compared with one
+    centroid per topic, built from example phrases (``topic_examples``,
+    falling back to the topic keywords).
+
+    Results report ``detected_topics`` and ``topic_scores`` in their
+    details: keyword hit counts or centroid similarities per topic.
     """
 
+    uses_edit_plan = True
+
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         """Initialize topic control rail."""
         super().__init__(config)
@@ -36,6 +56,23 @@ class TopicControlRail(BaseRail):
             "technical_questions": ["how to", "technical", "setup", "configure"],
         })
 
+        # One automaton over all keywords, normalized the same way as the
+        # text they are matched against
+        normalized = {
+            topic: [TextView(keyword).collapsed for keyword in keywords]
+            for topic, keywords in self.topic_keywords.items()
+        }
+        self._keywords = KeywordAutomaton(normalized)
+        # The same keywords as rules for the stage's fused pattern scan,
+        # named (topic, tokens)
+        self._keyword_rules: Dict[Hashable, Pattern] = {}
+        for topic, keywords in normalized.items():
+            for keyword in keywords:
+                pattern = keyword_pattern(keyword)
+                if pattern is not None:
+                    name = (topic, tuple(TOKEN.findall(keyword)))
+                    self._keyword_rules.setdefault(name, compile_pattern(pattern))
+
         # Action to take
         self.action = self.config.get("action", "block")  # block, warn, redirect
 
@@ -45,8 +82,53 @@ class TopicControlRail(BaseRail):
             "I'm here to help with {allowed_topics}. How can I assist you with that?"
         )
 
+        # Off-topic dialog turns in a row tolerated before acting
+        self.max_topic_drift = self.config.get("max_topic_drift", 0)
+
         # Detection mode
-        self.detection_mode = self.config.get("detection_mode", "keyword")  # keyword, llm
+        self.detection_mode = self.config.get("detection_mode", "keyword")  # keyword, embedding
+        if self.detection_mode not in ("keyword", "embedding"):
+            raise ValueError(
+                f"Unknown detection_mode '{self.detection_mode}' for TopicControlRail "
+                "(expected 'keyword' or 'embedding')"
+            )
+
+        # An allowed topic without keywords (or examples) is never detected,
+        # so every text about it would count as off-topic
+        self.undetectable_topics = self._undetectable(self.allowed_topics)
+        if self.undetectable_topics:
+            logger.warning(
+                "topic_control_undetectable_topics",
+                topics=self.undetectable_topics,
+                detection_mode=self.detection_mode,
+            )
+
+        self._centroids: Optional[CentroidClassifier] = None
+        if self.detection_mode == "embedding":
+            embedder = TextEmbedder(
+                backend=self.config.get("encoder", "local"),  # local, adapter
+                model_name=self.config.get(
+                    "model_name", "sentence-transformers/all-MiniLM-L6-v2"
+                ),
+                cache_size=self.config.get("cache_size", 10000),
+            )
+            examples = self.config.get("topic_examples", self.topic_keywords)
+            self._centroids = CentroidClassifier(
+                embedder,
+                {
+                    topic: [TextView(example).collapsed for example in phrases]
+                    for topic, phrases in examples.items()
+                },
+                thresholds=self.config.get("topic_thresholds"),
+                default_threshold=self.config.get("similarity_threshold", 0.5),
+                cache_path=self.config.get("centroid_cache_path"),
+            )
+
+    def bind_adapters(self, adapters: List[Any]) -> None:
+        """Use the engine's first LLM adapter for adapter embeddings."""
+        if self._centroids is not None and adapters:
+            if self._centroids.embedder.adapter is None:
+                self._centroids.embedder.adapter = adapters[0]
 
     async def process_input(
         self, input_text: str, context: ProcessingContext
@@ -61,8 +143,43 @@ class TopicControlRail(BaseRail):
         Returns:
             Dictionary with blocking decision and topic information
         """
-        # Classify the topic
-        detected_topics = self._classify_topic(input_text)
+        return self._decide(await self._score(context.text_view(input_text), context))
+
+    async def process_input_batch(
+        self, input_texts: List[str], context: ProcessingContext
+    ) -> List[Dict[str, Any]]:
+        """Classify a batch with one embedding call in embedding mode."""
+        if self._centroids is None:
+            return await super().process_input_batch(input_texts, context)
+
+        batch_scores = await self._centroids.classify(
+            [context.text_view(text).collapsed for text in input_texts]
+        )
+        return [self._decide(topic_scores) for topic_scores in batch_scores]
+
+    async def _score(self, view: TextView, context: ProcessingContext) -> Dict[str, float]:
+        """Keyword hits or centroid similarity per detected topic."""
+        if self._centroids is not None:
+            return (await self._centroids.classify([view.collapsed]))[0]
+        return self._keyword_scores(view, context)
+
+    def pattern_rules(self, stage: RailType) -> Dict[str, Dict[Hashable, Pattern]]:
+        """Topic keywords, in keyword mode."""
+        if self._centroids is not None or stage not in (RailType.INPUT, RailType.DIALOG):
+            return {}
+        return {"collapsed": self._keyword_rules}
+
+    def _decide(self, topic_scores: Dict[str, float]) -> Dict[str, Any]:
+        """
+        Apply the allow/block lists to the detected topics.
+
+        Args:
+            topic_scores: Keyword hits or similarity per detected topic
+
+        Returns:
+            Dictionary with blocking decision and topic information
+        """
+        detected_topics = self._classify_topic(topic_scores)
 
         # Check if any blocked topics detected
         blocked_topic_found = any(
@@ -81,6 +198,7 @@ class TopicControlRail(BaseRail):
                     "details": {
                         "detected_topics": detected_topics,
                         "blocked_topics": blocked_list,
+                        "topic_scores": topic_scores,
                     },
                     "suggestion": self._get_redirect_message()
                 }
@@ -89,7 +207,7 @@ class TopicControlRail(BaseRail):
                 return {
                     "blocked": False,
                     "warning": f"Off-topic detected: {', '.join(blocked_list)}",
-                    "details": {"detected_topics": detected_topics}
+                    "details": {"detected_topics": detected_topics, "topic_scores": topic_scores}
                 }
 
             elif self.action == "redirect":
@@ -98,7 +216,7 @@ class TopicControlRail(BaseRail):
                     "severity": "low",
                     "message": "Topic outside allowed scope",
                     "suggestion": self._get_redirect_message(),
-                    "details": {"detected_topics": detected_topics}
+                    "details": {"detected_topics": detected_topics, "topic_scores": topic_scores}
                 }
 
         # Check if allowed topics are specified and none match
@@ -112,39 +230,101 @@ class TopicControlRail(BaseRail):
                 "message": "Topic not in allowed list",
                 "details": {
                     "detected_topics": detected_topics,
-                    "allowed_topics": self.allowed_topics
+                    "allowed_topics": self.allowed_topics,
+                    "topic_scores": topic_scores,
                 },
                 "suggestion": self._get_redirect_message()
             }
 
         return {
             "blocked": False,
-            "details": {"detected_topics": detected_topics}
+            "details": {"detected_topics": detected_topics, "topic_scores": topic_scores}
         }
 
     async def process_dialog(
         self, text: str, context: ProcessingContext
     ) -> Dict[str, Any]:
-        """Process dialog flow for topic steering."""
-        return await self.process_input(text, context)
+        """
+        Process dialog flow for topic steering.
+
+        Off-topic turns are tracked per session: up to ``max_topic_drift``
+        of them in a row only produce a warning, and an on-topic turn resets
+        the streak. Without a session the turn is judged on its own.
+
+        Args:
+            text: The user's turn
+            context: Processing context
+
+        Returns:
+            Dictionary with blocking decision and topic information
+        """
+        key = session_key(context.tenant_id, context.session_id)
+        result = await self.process_input(text, context)
+        if self.sessions is None or key is None:
+            return result
+
+        off_topic = result["blocked"] or "warning" in result
+        topic = result["details"]["detected_topics"][0]
+        streak = await self.sessions.update(
+            key, lambda state: self._track_turn(state, topic, off_topic)
+        )
+        result["details"]["off_topic_streak"] = streak
+
+        if off_topic and streak <= self.max_topic_drift:
+            return {
+                "blocked": False,
+                "warning": (
+                    f"Off-topic turn {streak} of {self.max_topic_drift} allowed"
+                ),
+                "details": result["details"],
+            }
+        return result
+
+    @staticmethod
+    def _track_turn(state: SessionState, topic: str, off_topic: bool) -> int:
+        """Record a dialog turn and return the off-topic streak."""
+        state.turns += 1
+        state.push_topic(topic)
+        state.off_topic_streak = state.off_topic_streak + 1 if off_topic else 0
+        return state.off_topic_streak
 
-    def _classify_topic(self, text: str) -> List[str]:
+    def _keyword_scores(self, view: TextView, context: ProcessingContext) -> Dict[str, int]:
         """
-        Classify the topic of the text.
+        Count keyword hits per topic in a single pass.
+
+        Hits come from the stage's fused pattern scan when it covers this
+        rail, otherwise from the keyword automaton.
 
         Args:
-            text: Text to classify
+            view: Shared normalized view of the text to classify
+            context: Processing context
 
         Returns:
-            List of detected topic labels
+            Hit counts of the topics with at least one keyword match
+        """
+        found = context.pattern_matches(self, view, "collapsed")
+        if not found:
+            return self._keywords.counts(view.collapsed)
+
+        hits: Dict[str, int] = {}
+        for (topic, _), matches in found.items():
+            if matches:
+                hits[topic] = hits.get(topic, 0) + len(matches)
+        # Topic order as configured, like the automaton
+        return {topic: hits[topic] for topic in self.topic_keywords if topic in hits}
+
+    def _classify_topic(self, topic_scores: Dict[str, float]) -> List[str]:
         """
-        text_lower = text.lower()
-        detected = []
+        Classify the topic of the text.
+
+        Args:
+            topic_scores: Keyword hits or similarity per detected topic
 
-        for topic, keywords in self.topic_keywords.items():
-            # Check if any keyword is in the text
-            if any(keyword.lower() in text_lower for keyword in keywords):
-                detected.append(topic)
+        Returns:
+            List of detected topic labels, best first
+        """
+        # sorted() is stable, so ties keep the configured topic order
+        detected = sorted(topic_scores, key=lambda topic: -topic_scores[topic])
 
         # If no topics detected, mark as "general"
         if not detected:
@@ -152,6 +332,14 @@ class TopicControlRail(BaseRail):
 
         return detected
 
+    def _undetectable(self, topics: List[str]) -> List[str]:
+        """Topics with no keywords (or, in embedding mode, examples)."""
+        if self.detection_mode == "embedding":
+            known = self.config.get("topic_examples", self.topic_keywords)
+        else:
+            known = self.topic_keywords
+        return [topic for topic in topics if not known.get(topic)]
+
     def _get_redirect_message(self) -> str:
         """Get redirect message with allowed topics."""
         if self.allowed_topics:
@@ -167,5 +355,40 @@ class TopicControlRail(BaseRail):
             "allowed_topics": self.allowed_topics,
             "blocked_topics": self.blocked_topics,
             "detection_mode": self.detection_mode,
+            "keyword_count": len(self._keywords),
+            "max_topic_drift": self.max_topic_drift,
             "capabilities": ["input", "dialog"],
         }
+
+
+@register_rail("topic_steering")
+class TopicSteeringRail(TopicControlRail):
+    """
+    Keep a conversation within its domains, tolerating brief drift.
+
+    Dialog-rail flavour of topic control: ``conversation_domains`` are the
+    allowed topics, off-topic turns are redirected once more than
+    ``max_topic_drift`` (default 2) follow each other in a session. Every
+    domain needs keywords (or examples in embedding mode).
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """Initialize topic steering rail."""
+        config = dict(config or {})
+        config.setdefault("allowed_topics", config.get("conversation_domains", []))
+        config.setdefault("action", "redirect")
+        config.setdefault("max_topic_drift", 2)
+        super().__init__(config)
+
+        if self.undetectable_topics:
+            raise ValueError(
+                "TopicSteeringRail domains without topic_keywords or topic_examples: "
+                f"{', '.join(self.undetectable_topics)}"
+            )
+
+    def get_metadata(self) -> Dict[str, Any]:
+        """Get metadata about this rail."""
+        metadata = super().get_metadata()
+        metadata["name"] = "topic_steering"
+        metadata["capabilities"] = ["dialog"]
+        return metadata
@@ -1,12 +1,10 @@
 """Toxicity filtering rail for LLM outputs."""
 
+import importlib.util
 from typing import Any, Dict, Optional
 
-try:
-    from detoxify import Detoxify
-    DETOXIFY_AVAILABLE = True
-except ImportError:
-    DETOXIFY_AVAILABLE = False
+# Checked without importing detoxify (and torch) until a rail is built
+DETOXIFY_AVAILABLE = importlib.util.find_spec("detoxify") is not None
 
 from klyntos_guard.core.types import ProcessingContext
 from klyntos_guard.rails.base import BaseRail
@@ -33,6 +31,8 @@ class ToxicityFilterRail(BaseRail):
             )
 
         # Initialize model
+        from detoxify import Detoxify
+
         model_type = self.config.get("model_type", "original")
         self.model = Detoxify(model_type)
 
@@ -123,8 +123,7 @@ class ToxicityFilterRail(BaseRail):
                     "transformed_output": sanitized_text,
                     "warning": f"Output sanitized due to {max_category}",
                     "details": {
-                        "violations": violations,
-                        "original_text": output_text
+                        "violations": violations
                     }
                 }
 
@@ -0,0 +1,84 @@
+"""Tests for batched input rails."""
+
+import asyncio
+
+from klyntos_guard.core.engine import GuardrailsEngine
+from klyntos_guard.core.types import ProcessingContext, RailType
+from klyntos_guard.rails.base import BaseRail
+from klyntos_guard.rails.pii_detection import SimplePIIDetectionRail
+
+
+class CountingBatchRail(BaseRail):
+    """Blocks texts containing "forbidden", scoring each in one batch call."""
+
+    def __init__(self, config=None):
+        super().__init__(config)
+        self.batches = []
+
+    async def process_input(self, input_text, context):
+        [result] = await self.process_input_batch([input_text], context)
+        return result
+
+    async def process_input_batch(self, input_texts, context):
+        self.batches.append(list(input_texts))
+        return [
+            {"blocked": True, "message": "Forbidden"} if "forbidden" in text
+            else {"blocked": False, "signals": {"toxicity": len(text) / 100}}
+            for text in input_texts
+        ]
+
+
+class SignalRail(BaseRail):
+    """Records a per-text signal, without a batched implementation."""
+
+    async def process_input(self, input_text, context):
+        context.record_signal("length", float(len(input_text)))
+        return {"blocked": False}
+
+
+def make_engine(*rails):
+    engine = GuardrailsEngine()
+    for rail in rails:
+        engine.add_rail(rail, RailType.INPUT)
+    return engine
+
+
+def test_check_inputs_runs_each_rail_once_per_batch():
+    counting = CountingBatchRail()
+    engine = make_engine(SimplePIIDetectionRail(), counting)
+    texts = ["mail a@b.com", "a forbidden request", "hello"]
+
+    results = asyncio.run(engine.check_inputs(texts))
+
+    # Rails without the edit plan see earlier redactions applied
+    assert counting.batches == [["mail [EMAIL REDACTED]", "a forbidden request", "hello"]]
+    assert [r.allowed for r in results] == [True, False, True]
+    assert results[0].metadata["processed_input"] == "mail [EMAIL REDACTED]"
+    assert results[1].violations[0].message == "Forbidden"
+
+
+def test_batch_outcomes_keep_signals_per_text():
+    engine = make_engine(SignalRail(), CountingBatchRail())
+
+    outcomes = asyncio.run(
+        engine._run_input_rails_batch(["ab", "abcdef"], ProcessingContext())
+    )
+
+    assert [o["signals"]["length"] for o in outcomes] == [2.0, 6.0]
+    assert [o["signals"]["toxicity"] for o in outcomes] == [0.02, 0.06]
+
+
+def test_check_conversation_batches_new_user_messages():
+    counting = CountingBatchRail()
+    engine = make_engine(SimplePIIDetectionRail(), counting)
+    messages = [
+        {"role": "user", "content": "hi, I am a@b.com"},
+        {"role": "assistant", "content": "hello"},
+        {"role": "user", "content": "what is new"},
+    ]
+
+    result = asyncio.run(engine.check_conversation(messages, ProcessingContext(session_id="s1")))
+
+    assert counting.batches == [["hi, I am [EMAIL REDACTED]", "what is new"]]
+    assert result.allowed
+    assert result.metadata["processed_messages"][0]["content"] == "hi, I am [EMAIL REDACTED]"
@@ -0,0 +1,133 @@
+"""Tests for incremental conversation checking."""
+
+import asyncio
+
+from klyntos_guard.core.engine import GuardrailsEngine
+from klyntos_guard.core.types import ProcessingContext, RailType
+from klyntos_guard.rails.base import BaseRail
+from klyntos_guard.rails.pii_detection import SimplePIIDetectionRail
+
+
+class RecordingRail(BaseRail):
+    """Records what it checks and blocks texts containing "forbidden"."""
+
+    def __init__(self, config=None):
+        super().__init__(config)
+        self.inputs = []
+        self.dialogs = []
+        self.outputs = []
+
+    async def process_input(self, input_text, context):
+        self.inputs.append(input_text)
+        return self._verdict(input_text)
+
+    async def process_dialog(self, text, context):
+        self.dialogs.append((text, [m["content"] for m in context.conversation]))
+        return self._verdict(text)
+
+    async def process_output(self, output_text, context):
+        self.outputs.append(output_text)
+        return self._verdict(output_text)
+
+    @staticmethod
+    def _verdict(text):
+        if "forbidden" in text:
+            return {"blocked": True, "message": "Forbidden"}
+        return {"blocked": False}
+
+
+def make_engine():
+    rail = RecordingRail()
+    engine = GuardrailsEngine()
+    engine.add_rail(rail, RailType.INPUT)
+    engine.add_rail(rail, RailType.DIALOG)
+    engine.add_rail(rail, RailType.OUTPUT)
+    return engine, rail
+
+
+def check(engine, messages, session_id="s1"):
+    return asyncio.run(
+        engine.check_conversation(messages, ProcessingContext(session_id=session_id))
+    )
+
+
+def turns(*contents):
+    roles = ["user", "assistant"]
+    return [{"role": roles[i % 2], "content": c} for i, c in enumerate(contents)]
+
+
+def test_resent_prefix_reuses_verdicts():
+    engine, rail = make_engine()
+
+    first = check(engine, turns("hi", "hello"))
+    second = check(engine, turns("hi", "hello", "how are you"))
+
+    assert first.metadata["checked_messages"] == 2
+    assert (second.metadata["checked_messages"], second.metadata["reused_verdicts"]) == (1, 2)
+    assert rail.inputs == ["hi", "how are you"]
+    assert rail.outputs == ["hello"]
+
+
+def test_repeated_message_is_a_new_turn():
+    engine, rail = make_engine()
+
+    check(engine, turns("it broke", "sorry"))
+    result = check(engine, turns("it broke", "sorry", "it broke"))
+
+    assert result.metadata["checked_messages"] == 1
+    assert rail.inputs == ["it broke", "it broke"]
+    # The dialog rails see the repeat with its conversation window
+    assert rail.dialogs[-1] == ("it broke", ["it broke", "sorry"])
+
+
+def test_edited_history_is_checked_again():
+    engine, rail = make_engine()
+
+    check(engine, turns("hi", "hello", "thanks"))
+    result = check(engine, turns("hey", "hello", "thanks"))
+
+    assert result.metadata["checked_messages"] == 3
+    assert rail.outputs == ["hello", "hello"]
+
+
+def test_without_a_session_every_message_is_checked():
+    engine, rail = make_engine()
+
+    check(engine, turns("hi", "hello"), session_id=None)
+    result = check(engine, turns("hi", "hello"), session_id=None)
+
+    assert result.metadata["reused_verdicts"] == 0
+    assert rail.inputs == ["hi", "hi"]
+
+
+def test_sessions_do_not_share_verdicts():
+    engine, rail = make_engine()
+
+    check(engine, turns("hi"), session_id="a")
+    check(engine, turns("hi"), session_id="b")
+
+    assert rail.inputs == ["hi", "hi"]
+
+
+def test_blocked_message_is_remembered_and_stops_the_check():
+    engine, rail = make_engine()
+
+    first = check(engine, turns("forbidden topic", "reply", "more"))
+    second = check(engine, turns("forbidden topic", "reply", "more"))
+
+    assert not first.allowed and not second.allowed
+    assert first.violations[0].rail_type == RailType.INPUT
+    assert rail.outputs == []
+    assert second.metadata["reused_verdicts"] == 1
+    assert first.metadata["processed_messages"] == []
+
+
+def test_redacted_messages_keep_their_redaction_when_reused():
+    engine = GuardrailsEngine()
+    engine.add_rail(SimplePIIDetectionRail(), RailType.INPUT)
+
+    check(engine, turns("mail me at a@b.com"))
+    result = check(engine, turns("mail me at a@b.com", "ok"))
+
+    assert result.metadata["reused_verdicts"] == 1
+    assert result.metadata["processed_messages"][0]["content"] == "mail me at [EMAIL REDACTED]"
@@ -0,0 +1,95 @@
+"""Tests for the deferred edit plan and its use by the engine."""
+
+import asyncio
+import random
+import re
+
+import pytest
+
+from klyntos_guard.core.edits import EditConflictError, EditPlan, _overlaps
+from klyntos_guard.core.engine import GuardrailsEngine
+from klyntos_guard.core.types import ProcessingContext, RailType
+from klyntos_guard.rails.base import BaseRail
+from klyntos_guard.rails.pii_detection import SimplePIIDetectionRail
+
+
+class DigitMaskRail(BaseRail):
+    """Replaces every digit run with ``#``, as edits."""
+
+    uses_edit_plan = True
+
+    async def process_input(self, input_text, context):
+        edits = [(m.start(), m.end(), "#") for m in re.finditer(r"\d+", input_text)]
+        return {"blocked": False, "edits": edits} if edits else {"blocked": False}
+
+
+def test_edits_are_applied_in_one_pass():
+    plan = EditPlan()
+    plan.extend([(6, 11, "[B]")])
+    plan.extend([(0, 5, "[A]")])
+    assert plan.apply("hello world") == "[A] [B]"
+
+
+def test_overlapping_edits_of_one_group_are_merged():
+    # The first edit is the rail's preferred one; its replacement covers
+    # the union, so no part of either span survives
+    plan = EditPlan([(4, 9, "[PHONE]"), (0, 14, "[EMAIL]"), (12, 16, "[X]")])
+    assert plan.resolved() == [(0, 16, "[PHONE]")]
+    assert plan.apply("abc.555@mail.com tail") == "[PHONE] tail"
+
+
+def test_overlapping_edits_of_different_groups_raise():
+    plan = EditPlan()
+    plan.extend([(0, 5, "[A]")])
+    plan.extend([(3, 8, "[B]")])
+    with pytest.raises(EditConflictError):
+        plan.resolved()
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_conflicts_matches_pairwise_check(seed):
+    rng = random.Random(seed)
+
+    def random_edits(count):
+        edits = []
+        for _ in range(count):
+            start = rng.randint(0, 30)
+            edits.append((start, start + rng.choice([0, 0, 1, 2, 5, 10]), "x"))
+        return edits
+
+    plan = EditPlan()
+    for _ in range(rng.randint(0, 3)):
+        plan.extend(random_edits(rng.randint(0, 5)))
+    incoming = random_edits(rng.randint(0, 5))
+
+    expected = any(_overlaps(a, b) for a in incoming for b in plan._edits)
+    assert plan.conflicts(incoming) == expected
+
+    # The sorted spans are rebuilt after the plan grows
+    plan.extend(incoming)
+    more = random_edits(3)
+    assert plan.conflicts(more) == any(_overlaps(a, b) for a in more for b in plan._edits)
+
+
+def make_engine(*rails):
+    engine = GuardrailsEngine()
+    for rail in rails:
+        engine.add_rail(rail, RailType.INPUT)
+    return engine
+
+
+def test_conflicting_rail_is_rerun_on_the_edited_text():
+    engine = make_engine(SimplePIIDetectionRail(), DigitMaskRail())
+    text = "call 555-123-4567 ext 42"
+
+    single = asyncio.run(engine._run_input_rails(text, ProcessingContext()))
+    [batched] = asyncio.run(engine.check_inputs([text]))
+
+    assert single["processed_input"] == "call [PHONE REDACTED] ext #"
+    assert batched.metadata["processed_input"] == "call [PHONE REDACTED] ext #"
+
+
+def test_non_overlapping_edits_of_two_rails_share_one_plan():
+    engine = make_engine(SimplePIIDetectionRail(), DigitMaskRail())
+    [result] = asyncio.run(engine.check_inputs(["room 7, mail a@b.com"]))
+    assert result.metadata["processed_input"] == "room #, mail [EMAIL REDACTED]"
@@ -0,0 +1,52 @@
+"""Tests for escalation listeners."""
+
+import asyncio
+import threading
+
+from klyntos_guard.core.types import ProcessingContext
+from klyntos_guard.rails.escalation_detection import EscalationDetectionRail
+
+
+def test_sync_listeners_run_off_the_event_loop():
+    rail = EscalationDetectionRail()
+    threads = {}
+
+    def blocking_listener(event):
+        threads["sync"] = threading.get_ident()
+
+    async def async_listener(event):
+        threads["async"] = threading.get_ident()
+
+    rail.add_listener(blocking_listener)
+    rail.add_listener(async_listener)
+
+    async def run():
+        context = ProcessingContext(session_id="s1")
+        result = await rail.process_dialog("I want to talk to a human", context)
+        await asyncio.gather(*rail._pending)
+        return result
+
+    result = asyncio.run(run())
+
+    assert result["metadata"]["escalation"]["triggers"] == ["explicit_request"]
+    assert threads["async"] == threading.get_ident()
+    assert threads["sync"] != threading.get_ident()
+
+
+def test_listener_failure_does_not_stop_others():
+    rail = EscalationDetectionRail()
+    events = []
+
+    def failing_listener(event):
+        raise RuntimeError("pager down")
+
+    rail.add_listener(failing_listener)
+    rail.add_listener(events.append)
+
+    async def run():
+        await rail.process_dialog("let me speak to a real person", ProcessingContext())
+        await asyncio.gather(*rail._pending)
+
+    asyncio.run(run())
+
+    assert [event["triggers"] for event in events] == [["explicit_request"]]
@@ -0,0 +1,124 @@
+"""Tests for execution rails and the decision cache."""
+
+import asyncio
+
+from klyntos_guard.core.config import GuardrailsConfig
+from klyntos_guard.core.engine import GuardrailsEngine
+from klyntos_guard.core.execution import argument_shape, decision_key
+from klyntos_guard.core.types import RailType
+from klyntos_guard.rails.base import BaseRail
+
+
+class PathRail(BaseRail):
+    """Blocks file reads outside /data; only the path value matters."""
+
+    execution_value_fields = {"path"}
+
+    def __init__(self, config=None):
+        super().__init__(config)
+        self.calls = 0
+
+    async def process_execution(self, execution_request, context):
+        self.calls += 1
+        path = execution_request["arguments"].get("path", "")
+        if not path.startswith("/data/"):
+            return {"blocked": True, "message": f"Path not allowed: {path}"}
+        if execution_request["arguments"].get("volatile"):
+            return {"blocked": False, "cacheable": False}
+        return {"blocked": False, "warning": "Reading a file"}
+
+
+class AnyValueRail(BaseRail):
+    """Declares no value fields, so every value counts."""
+
+    async def process_execution(self, execution_request, context):
+        return {"blocked": False}
+
+
+def read(path, **arguments):
+    return {"tool": "read_file", "arguments": {"path": path, "limit": 10, **arguments}}
+
+
+def make_engine(*rails, settings=None):
+    engine = GuardrailsEngine(config=GuardrailsConfig(config_dict={"settings": settings or {}}))
+    for rail in rails:
+        engine.add_rail(rail, RailType.EXECUTION)
+    return engine
+
+
+def execute(engine, request):
+    return asyncio.run(engine.check_execution(request))
+
+
+def test_argument_shape_keeps_structure_not_values():
+    assert argument_shape({"a": 1, "b": ["x", "y", 2], "c": {"d": None}}) == {
+        "a": "int", "b": ["list", ['"int"', '"str"']], "c": {"d": "NoneType"},
+    }
+
+
+def test_decision_key_ignores_values_outside_the_value_fields():
+    key = decision_key(read("/data/a"), {"path"}, "v1")
+
+    assert decision_key(read("/data/a", limit=99), {"path"}, "v1") == key
+    assert decision_key(read("/data/b"), {"path"}, "v1") != key
+    assert decision_key(read("/data/a", limit="99"), {"path"}, "v1") != key
+    assert decision_key(read("/data/a"), {"path"}, "v2") != key
+    assert decision_key(read("/data/a", limit=99), None, "v1") != key
+
+
+def test_decisions_are_cached_by_request_shape():
+    rail = PathRail()
+    engine = make_engine(rail)
+
+    first = execute(engine, read("/data/a"))
+    second = execute(engine, read("/data/a", limit=500))
+    blocked = execute(engine, read("/etc/passwd"))
+    blocked_again = execute(engine, read("/etc/passwd", limit=1))
+
+    assert first.allowed and not first.cached
+    assert second.allowed and second.cached and second.warnings == ["Reading a file"]
+    assert not blocked.allowed and blocked_again.cached
+    assert blocked_again.violations[0].message == "Path not allowed: /etc/passwd"
+    assert rail.calls == 2
+
+
+def test_a_rail_without_value_fields_makes_every_value_count():
+    rail = PathRail()
+    engine = make_engine(rail, AnyValueRail())
+
+    execute(engine, read("/data/a"))
+    result = execute(engine, read("/data/a", limit=500))
+
+    assert not result.cached
+    assert rail.calls == 2
+
+
+def test_uncacheable_decisions_are_recomputed():
+    rail = PathRail()
+    engine = make_engine(rail)
+
+    execute(engine, read("/data/a", volatile=True))
+    result = execute(engine, read("/data/a", volatile=True))
+
+    assert not result.cached
+    assert rail.calls == 2
+
+
+def test_adding_an_execution_rail_changes_the_policy_version():
+    engine = make_engine(PathRail())
+    execute(engine, read("/data/a"))
+
+    engine.add_rail(PathRail({"strict": True}), RailType.EXECUTION)
+
+    assert not execute(engine, read("/data/a")).cached
+
+
+def test_cache_can_be_disabled():
+    rail = PathRail()
+    engine = make_engine(rail, settings={"execution_cache": {"enabled": False}})
+
+    execute(engine, read("/data/a"))
+    execute(engine, read("/data/a"))
+
+    assert engine.execution_decisions is None
+    assert rail.calls == 2
@@ -0,0 +1,48 @@
+"""Tests for the fact checking rail."""
+
+import asyncio
+import os
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from klyntos_guard.core.knowledge_base import MANIFEST, KnowledgeBase
+from klyntos_guard.core.types import ProcessingContext
+from klyntos_guard.rails.fact_checking import FactCheckingRail
+
+CLAIM = "The Eiffel Tower was completed in 1889 in Paris."
+
+
+def check(rail: FactCheckingRail, text: str):
+    return asyncio.run(rail.process_output(text, ProcessingContext()))
+
+
+def test_rebuilt_knowledge_base_is_picked_up(tmp_path):
+    path = tmp_path / "kb"
+    KnowledgeBase(path).add([{"text": "Mount Everest is 8849 metres high.", "source": "atlas"}])
+    rail = FactCheckingRail({"knowledge_base_path": str(path), "action": "warn"})
+    assert check(rail, CLAIM).get("warning")
+
+    KnowledgeBase(path).add([{"text": CLAIM, "source": "encyclopedia"}])
+    # The rebuild may land within the filesystem's timestamp resolution
+    manifest = path / MANIFEST
+    stat = manifest.stat()
+    os.utime(manifest, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    result = check(rail, CLAIM)
+    assert not result.get("warning")
+    assert result["metadata"]["fact_check"]["unsupported_count"] == 0
+
+
+def test_block_includes_evidence(tmp_path):
+    path = tmp_path / "kb"
+    KnowledgeBase(path).add([{"text": "Mount Everest is 8849 metres high.", "source": "atlas"}])
+    rail = FactCheckingRail({"knowledge_base_path": str(path), "action": "block"})
+
+    result = check(rail, CLAIM)
+
+    assert result["blocked"]
+    claims = result["metadata"]["fact_check"]["claims"]
+    assert [claim["claim"] for claim in claims] == [CLAIM]
+    assert not claims[0]["supported"]
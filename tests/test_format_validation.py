@@ -0,0 +1,60 @@
+"""Tests for streamed format validation."""
+
+import random
+
+import pytest
+
+from klyntos_guard.rails.format_validation import FormatValidationRail
+
+PATTERNS = ["<script", "javascript:", "onerror="]
+
+
+def stream(rail: FormatValidationRail, chunks):
+    """Feed chunks to a validator; released text and the first violation."""
+    validator = rail.stream_validator()
+    released = []
+    for chunk in chunks:
+        text, violation = validator.feed(chunk)
+        released.append(text)
+        if violation:
+            return "".join(released), violation
+    released.append(validator.flush())
+    return "".join(released), None
+
+
+def random_chunks(text: str, rng: random.Random):
+    """Split text at random points, including empty chunks."""
+    chunks = []
+    position = 0
+    while position < len(text):
+        size = rng.randint(0, 12)
+        chunks.append(text[position:position + size])
+        position += size
+    return chunks
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_stream_releases_text_up_to_first_pattern(seed):
+    rng = random.Random(seed)
+    rail = FormatValidationRail({"forbidden_patterns": PATTERNS})
+    words = ["hello", "world", "<scr", "ipt", "java", "script:", "<p>", "x", " "]
+    text = "".join(rng.choice(words) for _ in range(rng.randint(0, 40)))
+
+    released, violation = stream(rail, random_chunks(text, rng))
+
+    positions = [text.lower().find(p) for p in PATTERNS if p in text.lower()]
+    if positions:
+        assert violation is not None and violation["blocked"]
+        assert released == text[:min(positions)]
+    else:
+        assert violation is None
+        assert released == text
+
+
+def test_stream_keeps_text_of_matching_chunk():
+    rail = FormatValidationRail({"forbidden_patterns": PATTERNS})
+
+    released, violation = stream(rail, ["safe prefix ", "more text <script>"])
+
+    assert violation["blocked"]
+    assert released == "safe prefix more text "
@@ -0,0 +1,118 @@
+"""Tests for approximate phrase matching."""
+
+import random
+
+import pytest
+
+from klyntos_guard.core.fuzzy import FuzzyPhraseMatcher, default_max_edits, edit_distance
+
+
+def brute_force_ends(text, phrase, max_edits, transpositions):
+    """End offsets where some substring is within max_edits of the phrase."""
+    return {
+        end
+        for end in range(1, len(text) + 1)
+        if any(
+            edit_distance(text[start:end], phrase, transpositions) <= max_edits
+            # Longer or shorter substrings need more than max_edits edits
+            for start in range(
+                max(0, end - len(phrase) - max_edits),
+                max(0, end - len(phrase) + max_edits + 1),
+            )
+        )
+    }
+
+
+def random_text(rng, phrases, length=80):
+    """Random text over the phrase alphabet with mutated phrases mixed in."""
+    alphabet = sorted(set("".join(phrases))) + [" "]
+    pieces = []
+    while sum(map(len, pieces)) < length:
+        if rng.random() < 0.3:
+            phrase = list(rng.choice(phrases))
+            for _ in range(rng.randint(0, 3)):
+                position = rng.randrange(len(phrase))
+                operation = rng.choice(["substitute", "delete", "insert", "swap"])
+                if operation == "substitute":
+                    phrase[position] = rng.choice(alphabet)
+                elif operation == "delete" and len(phrase) > 1:
+                    del phrase[position]
+                elif operation == "insert":
+                    phrase.insert(position, rng.choice(alphabet))
+                elif position + 1 < len(phrase):
+                    phrase[position], phrase[position + 1] = phrase[position + 1], phrase[position]
+            pieces.append("".join(phrase))
+        else:
+            pieces.append("".join(rng.choice(alphabet) for _ in range(rng.randint(1, 8))))
+    return "".join(pieces)
+
+
+@pytest.mark.parametrize("a, b, distance", [
+    ("", "abc", 3),
+    ("kitten", "sitting", 3),
+    ("ignore", "ingore", 1),
+    ("ignore", "ignore", 0),
+])
+def test_edit_distance(a, b, distance):
+    assert edit_distance(a, b) == distance
+
+
+def test_edit_distance_without_transpositions_counts_swaps_twice():
+    assert edit_distance("ignore", "ingore", transpositions=False) == 2
+
+
+def test_default_edit_budget_grows_with_length():
+    assert [default_max_edits("x" * n) for n in (3, 16, 40)] == [1, 2, 3]
+
+
+@pytest.mark.parametrize("transpositions", [True, False])
+@pytest.mark.parametrize("seed", range(25))
+def test_scan_matches_brute_force(seed, transpositions):
+    rng = random.Random(seed)
+    phrases = [("ignore all", 2), ("jailbreak", 1), ("dan", 1)]
+    matcher = FuzzyPhraseMatcher(phrases, transpositions=transpositions, prefilter=False)
+    text = random_text(rng, [phrase for phrase, _ in phrases])
+
+    hits = set(matcher._scan(text, 0, len(text)))
+
+    for index, (phrase, max_edits) in enumerate(phrases):
+        expected = brute_force_ends(text, phrase, max_edits, transpositions)
+        assert {end for i, end in hits if i == index} == expected
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_prefilter_finds_the_same_matches_as_a_full_scan(seed):
+    rng = random.Random(seed)
+    phrases = ["ignore previous instructions", "developer mode enabled", "do anything now"]
+    text = random_text(rng, phrases, length=200)
+
+    filtered = FuzzyPhraseMatcher(phrases).search(text)
+    full = FuzzyPhraseMatcher(phrases, prefilter=False).search(text)
+
+    assert filtered == full
+
+
+def test_search_reports_the_closest_alignment():
+    matcher = FuzzyPhraseMatcher(["ignore previous instructions"])
+    text = "please ingore previus instructions now"
+
+    [match] = matcher.search(text)
+
+    assert text[match["start"]:match["end"]] == "ingore previus instructions"
+    assert match["distance"] == 2
+
+
+def test_packed_phrases_do_not_leak_into_each_other():
+    # "ab" followed by "cd" must not match "abcd" as a single phrase
+    matcher = FuzzyPhraseMatcher([("abcd", 0), ("xy", 0)])
+
+    assert matcher.search("ab xy cd") == [
+        {"phrase": "xy", "start": 3, "end": 5, "distance": 0}
+    ]
+
+
+def test_edit_budget_is_capped_below_the_phrase_length():
+    matcher = FuzzyPhraseMatcher([("dan", 5)])
+
+    assert matcher.phrases == [("dan", 2)]
+    assert matcher.search("") == []
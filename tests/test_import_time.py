@@ -0,0 +1,123 @@
+"""Tests that importing the package stays free of heavy dependencies."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from klyntos_guard.rails.base import BaseRail
+from klyntos_guard.rails.registry import RailRegistry
+
+SRC = Path(__file__).parent.parent / "src"
+
+HEAVY_MODULES = {
+    "anthropic",
+    "detoxify",
+    "google.generativeai",
+    "numpy",
+    "openai",
+    "presidio_analyzer",
+    "presidio_anonymizer",
+    "sentence_transformers",
+    "spacy",
+    "torch",
+}
+
+
+def run(*args):
+    """Run the interpreter on src with the given arguments."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(SRC), env.get("PYTHONPATH")]))
+    return subprocess.run(
+        [sys.executable, *args], env=env, capture_output=True, text=True, check=True
+    )
+
+
+def imported_modules(code):
+    """Modules imported by running code in a fresh interpreter."""
+    completed = run("-X", "importtime", "-c", code)
+    return {
+        line.rsplit("|", 1)[1].strip()
+        for line in completed.stderr.splitlines()
+        if line.startswith("import time:") and line.count("|") == 2
+    }
+
+
+def loaded_modules(code):
+    """Modules in sys.modules after running code in a fresh interpreter."""
+    # importlib.import_module is not reported by -X importtime
+    completed = run("-c", code + "\nimport sys\nprint('\\n'.join(sys.modules))")
+    return set(completed.stdout.splitlines())
+
+
+def heavy(modules):
+    return sorted(
+        name for name in modules
+        if any(name == root or name.startswith(root + ".") for root in HEAVY_MODULES)
+    )
+
+
+def test_importing_the_package_skips_heavy_dependencies():
+    modules = imported_modules("import klyntos_guard")
+
+    assert "klyntos_guard" in modules
+    assert heavy(modules) == []
+
+
+def test_registry_imports_only_the_rails_it_looks_up():
+    modules = loaded_modules(
+        "from klyntos_guard.rails.registry import get_registry\n"
+        "assert get_registry().get('pii_detection_simple') is not None"
+    )
+
+    assert "klyntos_guard.rails.pii_detection" in modules
+    assert "klyntos_guard.rails.toxicity_filter" not in modules
+    assert "klyntos_guard.rails.jailbreak_similarity" not in modules
+    assert heavy(modules) == []
+
+
+class EntryPointRail(BaseRail):
+    async def process_input(self, input_text, context):
+        return {"blocked": False}
+
+
+class FakeEntryPoint:
+    name = "third_party"
+    value = "somewhere:EntryPointRail"
+
+    def __init__(self):
+        self.loads = 0
+
+    def load(self):
+        self.loads += 1
+        return EntryPointRail
+
+
+def test_entry_point_rails_are_loaded_on_first_lookup(monkeypatch):
+    entry_point = FakeEntryPoint()
+    monkeypatch.setattr(
+        "klyntos_guard.rails.registry._entry_points", lambda group: [entry_point]
+    )
+    registry = RailRegistry(entry_point_group="klyntos_guard.rails")
+
+    assert entry_point.loads == 0
+    assert registry.get("third_party") is EntryPointRail
+    assert registry.get("third_party") is EntryPointRail
+    assert entry_point.loads == 1
+    assert registry.get("missing") is None
+
+
+def test_unregistered_declared_rails_stay_unloaded():
+    registry = RailRegistry({"declared": "klyntos_guard.rails.does_not_exist"})
+
+    assert registry.unregister("declared") is False
+    assert registry.get("declared") is None
+
+
+def test_declared_rail_with_a_missing_module_raises():
+    registry = RailRegistry({"declared": "klyntos_guard.rails.does_not_exist"})
+
+    with pytest.raises(ImportError):
+        registry.get("declared")
@@ -0,0 +1,103 @@
+"""Tests for nearest-centroid intent classification."""
+
+import asyncio
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from klyntos_guard.core.engine import GuardrailsEngine
+from klyntos_guard.core.types import ProcessingContext, RailType
+from klyntos_guard.rails.intent_classification import IntentClassificationRail
+
+VOCABULARY = ["refund", "money", "back", "password", "reset", "login", "order", "track"]
+
+
+class BagOfWordsModel:
+    """Local sentence encoder embedding texts as vocabulary word counts."""
+
+    def __init__(self):
+        self.batches = []
+
+    def encode(self, texts, batch_size, convert_to_numpy):
+        self.batches.append(list(texts))
+        return np.array(
+            [[text.split().count(word) for word in VOCABULARY] + [0.01] for text in texts]
+        )
+
+
+CONFIG = {
+    "intents": ["refund_request", "account_access", "order_tracking"],
+    "intent_examples": {
+        "refund_request": ["refund my money", "money back"],
+        "account_access": ["reset my password", "login problem"],
+    },
+    "routing_rules": {"refund_request": "billing", "account_access": "support"},
+    "default_route": "general",
+}
+
+
+def make_rail(**overrides):
+    rail = IntentClassificationRail({**CONFIG, **overrides})
+    model = BagOfWordsModel()
+    rail.classifier.embedder._model = model
+    return rail, model
+
+
+def intent(result):
+    return result["metadata"]["intent"]
+
+
+def test_nearest_intent_is_routed():
+    rail, _ = make_rail()
+
+    result = asyncio.run(rail.process_input("I want a Refund, give my money back", ProcessingContext()))
+
+    assert not result["blocked"]
+    assert intent(result)["name"] == "refund_request"
+    assert intent(result)["route"] == "billing"
+    assert intent(result)["confidence"] > 0.8
+
+
+def test_intent_without_examples_uses_its_name():
+    rail, _ = make_rail()
+
+    result = asyncio.run(rail.process_input("order tracking", ProcessingContext()))
+
+    assert intent(result) == {
+        "name": "order_tracking",
+        "confidence": pytest.approx(1.0, abs=1e-3),
+        "route": "general",
+    }
+
+
+def test_unmatched_input_falls_back():
+    rail, _ = make_rail(fallback_intent="chitchat")
+
+    result = asyncio.run(rail.process_input("what a lovely day", ProcessingContext()))
+
+    assert intent(result) == {"name": "chitchat", "confidence": 0.0, "route": "general"}
+    assert result["details"]["intent_scores"] == {}
+
+
+def test_batch_is_encoded_once_and_cached():
+    rail, model = make_rail()
+    texts = ["refund please", "reset password", "refund please"]
+
+    results = asyncio.run(rail.process_input_batch(texts, ProcessingContext()))
+    asyncio.run(rail.process_input("refund please", ProcessingContext()))
+
+    assert [intent(r)["name"] for r in results] == ["refund_request", "account_access", "refund_request"]
+    # Examples, then the distinct inputs; the repeat comes from the cache
+    assert model.batches[1:] == [["refund please", "reset password"]]
+
+
+def test_engine_returns_the_intent_in_the_result_metadata():
+    rail, _ = make_rail()
+    engine = GuardrailsEngine()
+    engine.add_rail(rail, RailType.INPUT)
+
+    result = asyncio.run(engine.process("please reset my password"))
+
+    assert result.allowed
+    assert result.metadata["intent"]["route"] == "support"
@@ -0,0 +1,97 @@
+"""Tests for keyword and literal automata."""
+
+import asyncio
+import random
+import re
+
+import pytest
+
+from klyntos_guard.core.keywords import KeywordAutomaton, LiteralAutomaton, keyword_pattern
+from klyntos_guard.core.types import ProcessingContext
+from klyntos_guard.rails.topic_control import TopicControlRail
+
+KEYWORDS = {
+    "greeting": ["ha", "ha ha", "hello"],
+    "tech": ["how to", "c++", "e-mail", "set up"],
+    "politics": ["vote", "ha ha ha"],
+}
+
+
+def random_text(rng, length=40):
+    words = ["ha", "hello", "how", "to", "c", "+", "e", "-", "mail", "set", "up", "vote",
+             "devoted", "hat", "xha"]
+    separators = [" ", "  ", "\n", ""]
+    return "".join(rng.choice(words) + rng.choice(separators) for _ in range(length))
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_automaton_matches_the_keyword_regexes(seed):
+    text = random_text(random.Random(seed))
+    automaton = KeywordAutomaton(KEYWORDS)
+
+    expected_counts = {}
+    expected_starts = []
+    for label, keywords in KEYWORDS.items():
+        for keyword in keywords:
+            starts = [m.start() for m in re.finditer(keyword_pattern(keyword), text)]
+            if starts:
+                expected_counts[label] = expected_counts.get(label, 0) + len(starts)
+            expected_starts.extend((label, start) for start in starts)
+
+    assert automaton.counts(text) == expected_counts
+    assert sorted((label, start) for label, start, _ in automaton.search(text)) == sorted(
+        expected_starts
+    )
+
+
+def test_keywords_match_whole_tokens_only():
+    automaton = KeywordAutomaton({"politics": ["vote"], "tech": ["how to"]})
+
+    assert automaton.counts("devoted voters, vote!") == {"politics": 1}
+    assert automaton.search("how\n  to vote") == [("tech", 0, 8), ("politics", 9, 13)]
+
+
+def test_duplicate_and_empty_keywords_are_ignored():
+    automaton = KeywordAutomaton({"a": ["vote", "vote", "", "  "], "b": ["vote"]})
+
+    assert len(automaton) == 2
+    assert automaton.counts("vote") == {"a": 1, "b": 1}
+
+
+def test_keyword_pattern_of_symbols_only_keyword():
+    assert keyword_pattern("   ") is None
+    assert re.search(keyword_pattern("c++"), "I like c ++ a lot")
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_literal_automaton_scans_chunks_like_the_whole_text(seed):
+    rng = random.Random(seed)
+    automaton = LiteralAutomaton(["<script", "javascript:", "onerror="])
+    text = "".join(rng.choice(["<script", "<SCRIPT>", "java", "script:", "onerror=", " x "])
+                   for _ in range(30))
+
+    _, whole = automaton.scan(text)
+    state, chunked, offset = 0, [], 0
+    while offset < len(text):
+        size = rng.randint(1, 10)
+        state, found = automaton.scan(text[offset:offset + size], state)
+        chunked.extend((p, offset + start, offset + end) for p, start, end in found)
+        offset += size
+
+    assert chunked == whole
+    assert all(text[start:end].lower() == pattern for pattern, start, end in whole)
+
+
+def test_topic_scores_count_keyword_hits_per_topic():
+    rail = TopicControlRail({
+        "topic_keywords": {"politics": ["Vote", "Election"], "support": ["help"]},
+        "blocked_topics": ["politics"],
+    })
+
+    result = asyncio.run(rail.process_input(
+        "Help me VOTE in the élection, then vote again", ProcessingContext()
+    ))
+
+    assert result["blocked"]
+    assert result["details"]["topic_scores"] == {"politics": 3, "support": 1}
+    assert result["details"]["detected_topics"] == ["politics", "support"]
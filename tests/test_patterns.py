@@ -0,0 +1,77 @@
+"""Tests for the process-wide compiled pattern cache."""
+
+import gc
+import re
+import threading
+import weakref
+
+from klyntos_guard.core.patterns import compile_pattern, compile_patterns, get_pattern_cache_stats
+from klyntos_guard.rails.jailbreak_prevention import JailbreakPreventionRail
+
+
+def test_same_pattern_and_flags_share_one_object():
+    first = compile_pattern(r"shared\s+pattern", re.IGNORECASE)
+
+    assert compile_pattern(r"shared\s+pattern", re.IGNORECASE | re.UNICODE) is first
+    assert compile_pattern(r"shared\s+pattern") is not first
+    assert first.flags & re.IGNORECASE
+
+
+def test_lists_share_the_list_and_its_patterns():
+    first = compile_patterns(["alpha", "beta"], re.IGNORECASE)
+    same = compile_patterns(("alpha", "beta"), re.IGNORECASE)
+    reordered = compile_patterns(["beta", "alpha"], re.IGNORECASE)
+
+    assert same is first
+    assert reordered is not first
+    assert reordered[0] is first[1] and reordered[1] is first[0]
+    assert list(first) == [first[0], first[1]] and len(first) == 2
+
+
+def test_stats_count_requests_and_compilations():
+    before = get_pattern_cache_stats()
+    held = [compile_pattern("counted-pattern") for _ in range(3)]
+    after = get_pattern_cache_stats()
+
+    assert after["patterns_requested"] - before["patterns_requested"] == 3
+    assert after["patterns_compiled"] - before["patterns_compiled"] == 1
+    assert held[0] is held[2]
+
+
+def test_unused_patterns_are_released():
+    released = weakref.ref(compile_pattern("released-pattern"))
+    # re keeps its own bounded cache of recently compiled patterns
+    re.purge()
+    gc.collect()
+    compiled = get_pattern_cache_stats()["patterns_compiled"]
+
+    assert released() is None
+    compile_pattern("released-pattern")
+    assert get_pattern_cache_stats()["patterns_compiled"] == compiled + 1
+
+
+def test_concurrent_requests_get_the_same_object():
+    results = []
+    barrier = threading.Barrier(8)
+
+    def request():
+        barrier.wait()
+        results.append(compile_patterns(["concurrent", "request"]))
+
+    threads = [threading.Thread(target=request) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert all(result is results[0] for result in results)
+
+
+def test_rails_with_the_same_configuration_share_patterns():
+    first = JailbreakPreventionRail()
+    second = JailbreakPreventionRail()
+    custom = JailbreakPreventionRail({"custom_patterns": [r"secret\s+word"]})
+
+    assert second.patterns is first.patterns
+    assert custom.patterns is not first.patterns
+    assert custom.patterns[0] is first.patterns[0]
@@ -0,0 +1,51 @@
+"""Tests for the regex PII detection rail."""
+
+import asyncio
+import random
+
+import pytest
+
+from klyntos_guard.core.edits import EditPlan
+from klyntos_guard.core.types import ProcessingContext
+from klyntos_guard.rails.pii_detection import SimplePIIDetectionRail
+
+
+def redact(rail: SimplePIIDetectionRail, text: str) -> str:
+    result = asyncio.run(rail.process_input(text, ProcessingContext()))
+    return EditPlan(result.get("edits", ())).apply(text)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("contact john.555-123-4567@gmail.com now", "contact [PHONE REDACTED] now"),
+    ("mail 4111-1111-1111-1111@corp.com", "mail [CREDIT_CARD REDACTED]"),
+    ("mail 555-123-4567@corp.com today", "mail [PHONE REDACTED] today"),
+    ("id 123-45-6789@corp.com", "id [SSN REDACTED]"),
+    ("call 555-123-4567 or write to a@b.com", "call [PHONE REDACTED] or write to [EMAIL REDACTED]"),
+])
+def test_overlapping_entities_are_redacted_as_their_union(text, expected):
+    assert redact(SimplePIIDetectionRail(), text) == expected
+
+
+def test_overlapping_spans_take_the_highest_priority_type():
+    rail = SimplePIIDetectionRail({"priority": ["EMAIL", "PHONE", "CREDIT_CARD", "SSN"]})
+    assert redact(rail, "contact john.555-123-4567@gmail.com now") == "contact [EMAIL REDACTED] now"
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_every_pattern_match_is_redacted(seed):
+    rng = random.Random(seed)
+    pieces = [
+        "john", ".", "@", "gmail.com", "corp.com", "555-123-4567", "4111-1111-1111-1111",
+        "4111 1111 1111 1111", "123-45-6789", " ", " ", "x", "-", "1",
+    ]
+    text = "".join(rng.choice(pieces) for _ in range(rng.randint(1, 30)))
+    rail = SimplePIIDetectionRail()
+
+    covered = set()
+    for pattern in rail.patterns.values():
+        for match in pattern.finditer(text):
+            covered.update(range(match.start(), match.end()))
+    spans = rail._collect(text)
+
+    assert all(a[2] <= b[1] for a, b in zip(spans, spans[1:]))
+    assert covered <= {i for _, start, end in spans for i in range(start, end)}
@@ -0,0 +1,110 @@
+"""Tests for the Presidio prefilter of the PII detection rail."""
+
+import asyncio
+
+import pytest
+
+from klyntos_guard.core.types import ProcessingContext
+from klyntos_guard.rails import pii_detection
+from klyntos_guard.rails.pii_detection import PIIDetectionRail, _plausible_entities
+
+DEFAULT_ENTITIES = [
+    "EMAIL_ADDRESS", "PHONE_NUMBER", "CREDIT_CARD", "US_SSN",
+    "IP_ADDRESS", "PERSON", "LOCATION", "DATE_TIME",
+]
+
+
+@pytest.mark.parametrize("text, plausible, needs_ner", [
+    ("what is the weather like", [], False),
+    ("call me on 555 1234", ["PHONE_NUMBER", "CREDIT_CARD", "US_SSN", "IP_ADDRESS", "DATE_TIME"], False),
+    ("write to someone@example", ["EMAIL_ADDRESS"], False),
+    ("see you tomorrow", ["DATE_TIME"], True),
+    ("I met Alice", ["PERSON", "LOCATION", "DATE_TIME"], True),
+    ("mail ｊｏｅ＠example", ["EMAIL_ADDRESS"], False),
+])
+def test_plausible_entities(text, plausible, needs_ner):
+    assert _plausible_entities(text, DEFAULT_ENTITIES) == (plausible, needs_ner)
+
+
+def test_unknown_entities_are_always_plausible():
+    assert _plausible_entities("nothing here", ["CRYPTO", "PERSON"]) == (["CRYPTO"], False)
+
+
+class Result:
+    def __init__(self, entity_type, start, end, score=0.9):
+        self.entity_type = entity_type
+        self.start = start
+        self.end = end
+        self.score = score
+
+
+class PlainNlpEngine:
+    """An NLP engine that is not spaCy-based."""
+
+    def process_batch(self, texts, language, batch_size):
+        return [(text, None) for text in texts]
+
+
+class RecordingAnalyzer:
+    """Stands in for a Presidio AnalyzerEngine."""
+
+    nlp_engine = PlainNlpEngine()
+
+    def __init__(self):
+        self.calls = []
+
+    def analyze(self, text, entities, language, score_threshold, nlp_artifacts):
+        self.calls.append(list(entities))
+        start = text.find("555")
+        return [Result("PHONE_NUMBER", start, start + 8)] if start >= 0 else []
+
+
+@pytest.fixture
+def analyzer(monkeypatch):
+    analyzer = RecordingAnalyzer()
+    monkeypatch.setattr(pii_detection, "PRESIDIO_AVAILABLE", True)
+    monkeypatch.setattr(pii_detection, "get_analyzer", lambda *args, **kwargs: analyzer)
+    return analyzer
+
+
+def process(rail, text):
+    return asyncio.run(rail.process_input(text, ProcessingContext()))
+
+
+def test_tiers_skip_the_analyzer_or_ner_when_possible(analyzer):
+    rail = PIIDetectionRail()
+
+    skipped = process(rail, "what is the weather like")
+    regex = process(rail, "call 555-1234 now")
+    full = process(rail, "Alice lives here")
+
+    assert [r["details"]["tier"] for r in (skipped, full)] == ["skipped", "full"]
+    assert regex["edits"] == [(5, 13, "[PHONE_NUMBER REDACTED]")]
+    assert analyzer.calls == [
+        ["PHONE_NUMBER", "CREDIT_CARD", "US_SSN", "IP_ADDRESS", "DATE_TIME"],
+        ["PERSON", "LOCATION", "DATE_TIME"],
+    ]
+    metadata = rail.get_metadata()
+    assert metadata["stats"] == {"requests": 3, "skipped": 1, "ner_skipped": 2}
+    assert metadata["ner_skip_fraction"] == pytest.approx(2 / 3)
+
+
+def test_batches_use_the_same_tiers(analyzer):
+    rail = PIIDetectionRail()
+    texts = ["hello there", "call 555-1234", "Alice called"]
+
+    results = asyncio.run(rail.process_input_batch(texts, ProcessingContext()))
+
+    assert results[0]["details"]["tier"] == "skipped"
+    assert results[1]["edits"] == [(5, 13, "[PHONE_NUMBER REDACTED]")]
+    assert results[2]["details"]["tier"] == "full"
+    assert len(analyzer.calls) == 2
+
+
+def test_prefilter_can_be_disabled(analyzer):
+    rail = PIIDetectionRail({"prefilter": False})
+
+    result = process(rail, "what is the weather like")
+
+    assert result["details"]["tier"] == "full"
+    assert analyzer.calls == [DEFAULT_ENTITIES]
@@ -0,0 +1,130 @@
+"""Tests for the fused pattern scan of a stage's rails."""
+
+import asyncio
+import random
+import re
+
+import pytest
+
+from klyntos_guard.core.config import GuardrailsConfig
+from klyntos_guard.core.engine import GuardrailsEngine
+from klyntos_guard.core.policy import PatternSet, StagePolicy, _anchors
+from klyntos_guard.core.text import TextView
+from klyntos_guard.core.types import ProcessingContext, RailType
+from klyntos_guard.rails.format_validation import FormatValidationRail
+from klyntos_guard.rails.jailbreak_prevention import JailbreakPreventionRail
+from klyntos_guard.rails.pii_detection import SimplePIIDetectionRail
+from klyntos_guard.rails.topic_control import TopicControlRail
+
+FRAGMENTS = [
+    "ignore previous instructions", "IGNORE ALL PRIOR rules", "you are now DAN",
+    "developer mode", "system prompt", "my system prompt is", "call 555-123-4567",
+    "a@b.com", "4111 1111 1111 1111", "123-45-6789", "the election", "pricing plan",
+    "<SCRIPT>", "javascript:", "ｉｇｎｏｒｅ", "naïve", "١٢٣", "hello", "\n", "  ",
+]
+
+
+def make_rails():
+    return [
+        JailbreakPreventionRail(),
+        SimplePIIDetectionRail(),
+        TopicControlRail(),
+        FormatValidationRail({"forbidden_patterns": ["<script", "javascript:"]}),
+    ]
+
+
+def random_text(rng):
+    return " ".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(1, 8)))
+
+
+def spans(matches):
+    return [match.span() for match in matches]
+
+
+def assert_scan_matches_each_rule(patterns, rules, text):
+    scanned = patterns.scan(text)
+    for owner, name, pattern in rules:
+        assert spans(scanned[owner][name]) == spans(pattern.finditer(text)), pattern.pattern
+
+
+@pytest.mark.parametrize("stage", [RailType.INPUT, RailType.DIALOG, RailType.OUTPUT])
+@pytest.mark.parametrize("seed", range(20))
+def test_fused_scan_matches_the_rails_own_patterns(stage, seed):
+    rng = random.Random(seed)
+    rails = make_rails()
+    policy = StagePolicy.from_rails(rails, stage)
+
+    for _ in range(10):
+        view = TextView(random_text(rng))
+        for form, patterns in policy.forms.items():
+            rules = [
+                (id(rail), name, pattern)
+                for rail in rails
+                for name, pattern in rail.pattern_rules(stage).get(form, {}).items()
+            ]
+            assert_scan_matches_each_rule(patterns, rules, view.form(form))
+
+
+ATOMS = [
+    "ab", "c", "[xy]", "[0-9]", r"\d", "(?:ab|cd)", "a?", "b*", "c+", r"\s+",
+    "(?=ab)", ".", "(?:x|)", "[^a]", r"\b", "(?:ab){2}", "é",
+]
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_anchor_filter_never_skips_a_matching_pattern(seed):
+    rng = random.Random(seed)
+    rules = []
+    for index in range(8):
+        pattern = "".join(rng.choice(ATOMS) for _ in range(rng.randint(1, 4)))
+        flags = re.IGNORECASE if rng.random() < 0.3 else 0
+        rules.append((index % 3, index, re.compile(pattern, flags)))
+    patterns = PatternSet(rules)
+
+    for _ in range(20):
+        text = "".join(rng.choice("abcdxyAB019 \né") for _ in range(rng.randint(0, 30)))
+        assert_scan_matches_each_rule(patterns, rules, text)
+
+
+@pytest.mark.parametrize("pattern, anchors", [
+    (r"ignore\s+(?:previous|prior)", {"ignore"}),
+    (r"(?:previous|prior)\s+instructions?", {"instruction"}),
+    (r"\d{3}-\d{4}", {"-"}),
+    (r"\d+", set("0123456789")),
+    (r"a*b?", None),
+])
+def test_anchors(pattern, anchors):
+    found = _anchors(re.compile(pattern)).strings
+    assert (set(found) if found is not None else None) == anchors
+
+
+def test_identical_patterns_are_scanned_once():
+    pattern = re.compile("vote")
+    patterns = PatternSet([(1, "a", pattern), (2, "b", re.compile("vote")), (2, "c", pattern)])
+
+    assert patterns.get_stats()["patterns"] == 1
+    assert {owner: spans(found["b" if owner == 2 else "a"])
+            for owner, found in patterns.scan("vote").items()} == {1: [(0, 4)], 2: [(0, 4)]}
+
+
+def test_engine_results_do_not_depend_on_fused_matching():
+    def make_engine(enabled):
+        engine = GuardrailsEngine(config=GuardrailsConfig(config_dict={
+            "settings": {"fused_matching": {"enabled": enabled}},
+        }))
+        for rail in make_rails():
+            engine.add_rail(rail, RailType.INPUT)
+            engine.add_rail(rail, RailType.OUTPUT)
+        return engine
+
+    def outcome(result):
+        return {**result, "violations": [v.message for v in result["violations"]]}
+
+    fused, plain = make_engine(True), make_engine(False)
+    rng = random.Random(0)
+    for _ in range(50):
+        text = random_text(rng)
+        for method in ("_run_input_rails", "_run_output_rails"):
+            a = asyncio.run(getattr(fused, method)(text, ProcessingContext()))
+            b = asyncio.run(getattr(plain, method)(text, ProcessingContext()))
+            assert outcome(a) == outcome(b), text
@@ -0,0 +1,138 @@
+"""Tests for retrieval rails and the chunk verdict cache."""
+
+import asyncio
+
+from klyntos_guard.core import verdicts
+from klyntos_guard.core.engine import GuardrailsEngine
+from klyntos_guard.core.types import RailType
+from klyntos_guard.core.verdicts import VerdictCache, content_key
+from klyntos_guard.rails.base import BaseRail
+from klyntos_guard.rails.pii_detection import SimplePIIDetectionRail
+
+
+class DropRail(BaseRail):
+    """Drops chunks mentioning "secret", counting the chunks it sees."""
+
+    def __init__(self, config=None):
+        super().__init__(config)
+        self.seen = []
+        self.fail = False
+
+    async def process_retrieval(self, retrieved_chunks, context):
+        if self.fail:
+            raise RuntimeError("scoring service down")
+        self.seen.extend(chunk["content"] for chunk in retrieved_chunks)
+        return {"blocked": False, "chunk_verdicts": [
+            {"allowed": "secret" not in chunk["content"], "reason": "secret"}
+            for chunk in retrieved_chunks
+        ]}
+
+
+class BlockAllRail(BaseRail):
+    async def process_retrieval(self, retrieved_chunks, context):
+        return {"blocked": True, "message": "Index compromised"}
+
+
+def make_engine(*rails):
+    engine = GuardrailsEngine()
+    for rail in rails:
+        engine.add_rail(rail, RailType.RETRIEVAL)
+    return engine
+
+
+def retrieve(engine, chunks):
+    return asyncio.run(engine.check_retrieval(chunks))
+
+
+def test_content_key_separates_parts():
+    assert content_key("ab", "c") != content_key("a", "bc")
+    assert content_key("ab", "c") == content_key("ab", "c")
+
+
+def test_cache_evicts_least_recently_used():
+    cache = VerdictCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (1, None, 3)
+    assert cache.get_stats()["hits"] == 3
+
+
+def test_cache_entries_expire(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(verdicts.time, "monotonic", lambda: now[0])
+    cache = VerdictCache(ttl_seconds=10)
+    cache.put("a", 1)
+
+    now[0] = 105.0
+    assert cache.get("a") == 1
+    now[0] = 111.0
+    assert cache.get("a") is None
+
+
+def test_chunks_are_dropped_redacted_and_kept_in_order():
+    engine = make_engine(DropRail(), SimplePIIDetectionRail())
+
+    result = retrieve(engine, [
+        "public doc",
+        {"content": "the secret plan", "source": "wiki"},
+        {"content": "mail a@b.com", "source": "crm", "metadata": {"id": 7}},
+    ])
+
+    assert result.allowed
+    assert result.chunks == [
+        {"content": "public doc"},
+        {"content": "mail [EMAIL REDACTED]", "source": "crm", "metadata": {"id": 7}},
+    ]
+    assert [(v.allowed, v.redacted) for v in result.verdicts] == [
+        (True, False), (False, False), (True, True)
+    ]
+    assert result.verdicts[1].reasons == ["DropRail: secret"]
+    assert result.metadata == {"checked_chunks": 3, "cached_chunks": 0, "dropped_chunks": 1}
+
+
+def test_verdicts_are_reused_by_content_and_source():
+    drop = DropRail()
+    engine = make_engine(drop, SimplePIIDetectionRail())
+    chunks = [{"content": "mail a@b.com", "source": "crm"}, "the secret plan"]
+
+    retrieve(engine, chunks)
+    again = retrieve(engine, chunks + [{"content": "mail a@b.com", "source": "wiki"}])
+
+    assert [v.cached for v in again.verdicts] == [True, True, False]
+    assert again.chunks[0]["content"] == "mail [EMAIL REDACTED]"
+    assert [c["content"] for c in again.chunks] == ["mail [EMAIL REDACTED]"] * 2
+    assert drop.seen == ["mail a@b.com", "the secret plan", "mail a@b.com"]
+
+
+def test_failed_rails_do_not_cache_verdicts():
+    drop = DropRail()
+    drop.fail = True
+    engine = make_engine(drop)
+
+    retrieve(engine, ["the secret plan"])
+    drop.fail = False
+    result = retrieve(engine, ["the secret plan"])
+
+    assert not result.verdicts[0].cached
+    assert not result.verdicts[0].allowed
+
+
+def test_adding_a_retrieval_rail_clears_the_cache():
+    engine = make_engine()
+    retrieve(engine, ["the secret plan"])
+
+    engine.add_rail(DropRail(), RailType.RETRIEVAL)
+    result = retrieve(engine, ["the secret plan"])
+
+    assert result.chunks == []
+
+
+def test_blocking_rail_blocks_the_whole_retrieval():
+    result = retrieve(make_engine(BlockAllRail(), DropRail()), ["public doc"])
+
+    assert not result.allowed
+    assert result.chunks == []
+    assert result.violations[0].message == "Index compromised"
@@ -0,0 +1,153 @@
+"""Tests for the session state stores."""
+
+import asyncio
+
+import pytest
+
+from klyntos_guard.core.sessions import (
+    InMemorySessionStore,
+    RedisSessionStore,
+    SessionState,
+    SessionStore,
+)
+
+
+class FakeWatchError(Exception):
+    """Raised by FakeRedis when a watched key changed before EXEC."""
+
+
+class FakePipeline:
+    """The WATCH/GET/MULTI/SET/EXEC subset of a redis.asyncio pipeline."""
+
+    def __init__(self, server: "FakeRedis"):
+        self.server = server
+        self.watched = {}
+        self.queued = []
+
+    async def __aenter__(self) -> "FakePipeline":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.watched.clear()
+        self.queued.clear()
+
+    async def watch(self, key: str) -> None:
+        self.watched[key] = self.server.versions.get(key, 0)
+
+    async def get(self, key: str):
+        value = await self.server.get(key)
+        # Let other coroutines run between WATCH and EXEC, so concurrent
+        # updates of one key actually interleave
+        await asyncio.sleep(0)
+        return value
+
+    def multi(self) -> None:
+        self.queued = []
+
+    def set(self, key: str, value: str, ex: int = None) -> None:
+        self.queued.append((key, value, ex))
+
+    async def execute(self) -> list:
+        for key, version in self.watched.items():
+            if self.server.versions.get(key, 0) != version:
+                raise FakeWatchError(key)
+        for key, value, ex in self.queued:
+            self.server.data[key] = value
+            self.server.expiries[key] = ex
+            self.server.versions[key] = self.server.versions.get(key, 0) + 1
+        return [True] * len(self.queued)
+
+
+class FakeRedis:
+    """In-process stand-in for a redis.asyncio client."""
+
+    def __init__(self):
+        self.data = {}
+        self.expiries = {}
+        self.versions = {}
+
+    async def get(self, key: str):
+        return self.data.get(key)
+
+    async def delete(self, key: str) -> None:
+        self.data.pop(key, None)
+        self.versions[key] = self.versions.get(key, 0) + 1
+
+    def pipeline(self, transaction: bool = True) -> FakePipeline:
+        return FakePipeline(self)
+
+
+def redis_store(**kwargs) -> RedisSessionStore:
+    return RedisSessionStore(FakeRedis(), watch_error=FakeWatchError, **kwargs)
+
+
+def count_turn(state: SessionState) -> int:
+    state.turns += 1
+    return state.turns
+
+
+def test_session_store_is_abstract():
+    with pytest.raises(TypeError):
+        SessionStore()
+
+
+@pytest.mark.parametrize("make_store", [InMemorySessionStore, redis_store])
+def test_update_and_get_round_trip(make_store):
+    async def scenario():
+        store = make_store()
+        assert await store.get("default:s1") is None
+
+        def track(state: SessionState) -> int:
+            state.push_topic("billing")
+            state.counters["frustration"] = 0.5
+            return count_turn(state)
+
+        assert await store.update("default:s1", track) == 1
+        state = await store.get("default:s1")
+        assert state.turns == 1
+        assert state.recent_topics == ["billing"]
+        assert state.counters == {"frustration": 0.5}
+
+        await store.delete("default:s1")
+        assert await store.get("default:s1") is None
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("make_store", [InMemorySessionStore, redis_store])
+def test_concurrent_updates_are_not_lost(make_store):
+    async def scenario():
+        store = make_store()
+        await asyncio.gather(*(store.update("default:s1", count_turn) for _ in range(10)))
+        return store, await store.get("default:s1")
+
+    store, state = asyncio.run(scenario())
+    assert state.turns == 10
+    if isinstance(store, RedisSessionStore):
+        assert store.conflicts > 0
+
+
+def test_redis_store_sets_ttl_and_prefix():
+    async def scenario():
+        store = redis_store(ttl_seconds=60, prefix="test:")
+        await store.update("default:s1", count_turn)
+        return store.client
+
+    client = asyncio.run(scenario())
+    assert list(client.data) == ["test:default:s1"]
+    assert client.expiries["test:default:s1"] == 60
+
+
+def test_redis_store_gives_up_after_max_retries():
+    class AlwaysConflicting(FakePipeline):
+        async def execute(self) -> list:
+            raise FakeWatchError("always")
+
+    class ConflictingRedis(FakeRedis):
+        def pipeline(self, transaction: bool = True) -> FakePipeline:
+            return AlwaysConflicting(self)
+
+    store = RedisSessionStore(ConflictingRedis(), watch_error=FakeWatchError, max_retries=3)
+    with pytest.raises(RuntimeError):
+        asyncio.run(store.update("default:s1", count_turn))
+    assert store.conflicts == 3
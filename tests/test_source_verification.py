@@ -0,0 +1,134 @@
+"""Tests for domain lists and the source verification rail."""
+
+import asyncio
+import random
+
+import pytest
+
+from klyntos_guard.core.domains import DomainTrie, url_host
+from klyntos_guard.core.engine import GuardrailsEngine
+from klyntos_guard.core.types import ProcessingContext, RailType
+from klyntos_guard.rails.source_verification import SourceVerificationRail
+
+
+def reference_lookup(patterns, host):
+    """Most specific matching pattern, by scanning every pattern."""
+    if host in patterns:
+        return patterns[host]
+    labels = host.split(".")
+    # Longer suffixes are more specific
+    for start in range(1, len(labels)):
+        value = patterns.get("*." + ".".join(labels[start:]))
+        if value is not None:
+            return value
+    return None
+
+
+@pytest.mark.parametrize("url, host", [
+    ("https://Docs.Example.com/page?q=1", "docs.example.com"),
+    ("docs.example.com/page", "docs.example.com"),
+    ("http://user:pw@example.com:8080/", "example.com"),
+    ("https://example.com./", "example.com"),
+    ("not a url", None),
+    ("https://", None),
+])
+def test_url_host(url, host):
+    assert url_host(url) == host
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_trie_matches_a_scan_of_all_patterns(seed):
+    rng = random.Random(seed)
+    labels = ["com", "org", "example", "docs", "api", "eu", "a"]
+
+    def domain():
+        return ".".join(rng.choice(labels) for _ in range(rng.randint(1, 4)))
+
+    patterns = {}
+    trie = DomainTrie()
+    for _ in range(20):
+        pattern = ("*." if rng.random() < 0.5 else "") + domain()
+        value = rng.choice(["trusted", "blocked"])
+        patterns[pattern] = value
+        trie.add(pattern, value)
+
+    assert len(trie) == len(patterns)
+    for _ in range(200):
+        host = domain()
+        assert trie.lookup(host) == reference_lookup(patterns, host)
+
+
+def test_wildcards_match_subdomains_but_not_the_domain_itself():
+    trie = DomainTrie()
+    trie.add("*.example.com", "sub")
+    trie.add("api.example.com", "exact")
+
+    assert trie.lookup("example.com") is None
+    assert trie.lookup("a.b.example.com") == "sub"
+    assert trie.lookup("api.example.com") == "exact"
+    assert trie.lookup("v1.api.example.com") == "sub"
+
+
+@pytest.mark.parametrize("pattern", ["", "*.", "a..com", "*.*.com"])
+def test_invalid_patterns_raise(pattern):
+    with pytest.raises(ValueError):
+        DomainTrie().add(pattern, True)
+
+
+def verify(rail, chunks):
+    return asyncio.run(rail.process_retrieval(chunks, ProcessingContext()))
+
+
+def test_rail_keeps_trusted_sources_only():
+    rail = SourceVerificationRail({
+        "trusted_domains": ["*.example.com", "wiki.org"],
+        "blocked_domains": ["evil.example.com"],
+    })
+    chunks = [
+        {"content": "a", "source": "https://docs.example.com/x"},
+        {"content": "b", "source": "https://evil.example.com/x"},
+        {"content": "c", "source": "https://other.net"},
+        {"content": "d"},
+        {"content": "e", "source": "wiki.org/page"},
+    ]
+
+    result = verify(rail, chunks)
+
+    assert [v["allowed"] for v in result["chunk_verdicts"]] == [True, False, False, False, True]
+    assert [v.get("reason") for v in result["chunk_verdicts"][1:4]] == [
+        "blocked domain: evil.example.com",
+        "untrusted domain: other.net",
+        "unverified source",
+    ]
+    assert [c["content"] for c in result["filtered_chunks"]] == ["a", "e"]
+
+
+def test_without_trusted_domains_only_blocked_sources_are_dropped():
+    rail = SourceVerificationRail({
+        "blocked_domains": ["*.spam.net"],
+        "require_verification": False,
+    })
+
+    result = verify(rail, [
+        {"content": "a", "source": "https://x.spam.net"},
+        {"content": "b", "source": "https://news.org"},
+        {"content": "c"},
+    ])
+
+    assert [v["allowed"] for v in result["chunk_verdicts"]] == [False, True, True]
+
+
+def test_block_action_blocks_the_retrieval_through_the_engine():
+    engine = GuardrailsEngine()
+    engine.add_rail(
+        SourceVerificationRail({"trusted_domains": ["example.com"], "action": "block"}),
+        RailType.RETRIEVAL,
+    )
+
+    result = asyncio.run(engine.check_retrieval([
+        {"content": "a", "source": "https://example.com"},
+        {"content": "b", "source": "https://elsewhere.com"},
+    ]))
+
+    assert not result.allowed
+    assert result.violations[0].details == {"rejected_sources": ["https://elsewhere.com"]}
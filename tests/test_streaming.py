@@ -0,0 +1,92 @@
+"""Tests for streamed redaction."""
+
+import asyncio
+import random
+
+import pytest
+
+from klyntos_guard.core.edits import EditPlan
+from klyntos_guard.core.streaming import GuardedStream, StreamingRedactor
+from klyntos_guard.core.types import ProcessingContext
+from klyntos_guard.rails.format_validation import FormatValidationRail
+from klyntos_guard.rails.pii_detection import SimplePIIDetectionRail
+
+PIECES = [
+    "call", "me", "at", "555-123-4567", "john@example.com", "4111 1111 1111 1111",
+    "123-45-6789", "or", "x.555-123-4567@corp.com",
+]
+
+
+def random_chunks(text: str, rng: random.Random):
+    chunks = []
+    position = 0
+    while position < len(text):
+        size = rng.randint(1, 9)
+        chunks.append(text[position:position + size])
+        position += size
+    return chunks
+
+
+def redact(rail: SimplePIIDetectionRail, text: str) -> str:
+    result = asyncio.run(rail.process_output(text, ProcessingContext()))
+    return EditPlan(result.get("edits", ())).apply(text)
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_streamed_redaction_matches_whole_text(seed):
+    rng = random.Random(seed)
+    rail = SimplePIIDetectionRail()
+    # Words stay shorter than the holdback, as in real text
+    text = "".join(
+        rng.choice(PIECES) + rng.choice([" ", ", ", "\n"]) for _ in range(rng.randint(1, 25))
+    )
+
+    redactor = rail.stream_redactor()
+    streamed = "".join(redactor.feed(chunk) for chunk in random_chunks(text, rng))
+    streamed += redactor.flush()
+
+    assert streamed == redact(rail, text)
+
+
+def test_entity_split_across_chunks_is_held_back():
+    redactor = SimplePIIDetectionRail().stream_redactor()
+
+    released = redactor.feed("my number is 555-12")
+    assert "555" not in released
+    released += redactor.feed("3-4567, thanks")
+    released += redactor.flush()
+
+    assert released == "my number is [PHONE REDACTED], thanks"
+    assert redactor.detections == [{"entity_type": "PHONE", "start": 13, "end": 25}]
+
+
+def test_holdback_bounds_the_buffer():
+    redactor = StreamingRedactor(lambda text: [], str.upper, holdback=4)
+    assert redactor.feed("abcdefgh") == "abcd"
+    assert redactor.feed("ij") == "ef"
+    assert redactor.flush() == "ghij"
+
+
+def test_guarded_stream_stops_upstream_at_violation():
+    pulled = []
+
+    async def chunks():
+        for chunk in ["mail a@b.com ", "then <scr", "ipt>alert()", " never sent"]:
+            pulled.append(chunk)
+            yield chunk
+
+    async def scenario():
+        format_rail = FormatValidationRail({"forbidden_patterns": ["<script"]})
+        stream = GuardedStream(
+            chunks(),
+            [format_rail.stream_validator()],
+            [SimplePIIDetectionRail().stream_redactor],
+        )
+        text = "".join([piece async for piece in stream])
+        return stream, text
+
+    stream, text = asyncio.run(scenario())
+
+    assert text == "mail [EMAIL REDACTED] then "
+    assert stream.aborted and len(stream.violations) == 1
+    assert pulled[-1] == "ipt>alert()"
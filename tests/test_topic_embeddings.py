@@ -0,0 +1,105 @@
+"""Tests for embedding-centroid topic detection."""
+
+import asyncio
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from klyntos_guard.core.types import ProcessingContext, RailType
+from klyntos_guard.rails.topic_control import TopicControlRail
+
+VOCABULARY = ["vote", "election", "ballot", "invoice", "refund", "payment", "weather"]
+
+
+class BagOfWordsAdapter:
+    """Embeds texts as vocabulary word counts, recording each batch."""
+
+    def __init__(self):
+        self.batches = []
+
+    async def embed(self, texts, **kwargs):
+        self.batches.append(list(texts))
+        return [
+            [text.split().count(word) for word in VOCABULARY] + [0.01]
+            for text in texts
+        ]
+
+
+CONFIG = {
+    "detection_mode": "embedding",
+    "encoder": "adapter",
+    "topic_examples": {
+        "politics": ["vote election", "ballot vote"],
+        "billing": ["invoice payment", "refund payment"],
+    },
+    "blocked_topics": ["politics"],
+    "similarity_threshold": 0.5,
+}
+
+
+def make_rail(adapter, **overrides):
+    rail = TopicControlRail({**CONFIG, **overrides})
+    rail.bind_adapters([adapter])
+    return rail
+
+
+def test_unknown_detection_mode_raises():
+    with pytest.raises(ValueError, match="detection_mode"):
+        TopicControlRail({"detection_mode": "semantic"})
+
+
+def test_embedding_mode_blocks_by_centroid_similarity():
+    adapter = BagOfWordsAdapter()
+    rail = make_rail(adapter)
+
+    blocked = asyncio.run(rail.process_input("when is the Election vote", ProcessingContext()))
+    allowed = asyncio.run(rail.process_input("my refund and invoice", ProcessingContext()))
+    unrelated = asyncio.run(rail.process_input("nice weather", ProcessingContext()))
+
+    assert blocked["blocked"]
+    assert list(blocked["details"]["topic_scores"]) == ["politics"]
+    assert not allowed["blocked"]
+    assert allowed["details"]["detected_topics"] == ["billing"]
+    assert unrelated["details"]["detected_topics"] == ["general_inquiry"]
+    # Examples are embedded once, as one batch
+    assert adapter.batches[0] == ["vote election", "ballot vote", "invoice payment", "refund payment"]
+
+
+def test_batch_is_embedded_in_one_call_and_cached():
+    adapter = BagOfWordsAdapter()
+    rail = make_rail(adapter)
+    texts = ["vote now", "refund please", "vote now"]
+
+    results = asyncio.run(rail.process_input_batch(texts, ProcessingContext()))
+    asyncio.run(rail.process_input_batch(texts, ProcessingContext()))
+
+    assert [r["blocked"] for r in results] == [True, False, True]
+    assert adapter.batches[1:] == [["vote now", "refund please"]]
+
+
+def test_centroids_are_reused_from_disk_until_examples_change(tmp_path):
+    cache_path = tmp_path / "centroids.npz"
+    first = BagOfWordsAdapter()
+    asyncio.run(make_rail(first, centroid_cache_path=str(cache_path))
+                .process_input("vote", ProcessingContext()))
+
+    second = BagOfWordsAdapter()
+    asyncio.run(make_rail(second, centroid_cache_path=str(cache_path))
+                .process_input("vote", ProcessingContext()))
+
+    changed = BagOfWordsAdapter()
+    examples = {**CONFIG["topic_examples"], "weather": ["weather"]}
+    asyncio.run(make_rail(changed, centroid_cache_path=str(cache_path), topic_examples=examples)
+                .process_input("vote", ProcessingContext()))
+
+    assert len(first.batches) == 2
+    assert second.batches == [["vote"]]
+    assert len(changed.batches) == 2
+
+
+def test_topics_without_examples_are_reported():
+    rail = TopicControlRail({**CONFIG, "allowed_topics": ["billing", "shipping"]})
+
+    assert rail.undetectable_topics == ["shipping"]
+    assert rail.pattern_rules(RailType.INPUT) == {}
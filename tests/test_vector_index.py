@@ -0,0 +1,83 @@
+"""Tests for the dense vector index."""
+
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from klyntos_guard.core.vector_index import VectorIndex
+
+
+def unit_rows(matrix):
+    matrix = np.asarray(matrix, dtype=np.float32)
+    return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+
+def clustered(count, dim=32, clusters=40, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    points = centers[rng.integers(0, clusters, size=count)] + 0.3 * rng.normal(size=(count, dim))
+    return unit_rows(points)
+
+
+def recall(index, exact, queries, k=10):
+    _, found = index.search(queries, k)
+    _, expected = exact.search(queries, k)
+    return np.mean([len(set(a) & set(b)) / k for a, b in zip(found, expected)])
+
+
+def test_exact_search_returns_best_rows_first():
+    vectors = unit_rows(np.eye(4) + 0.1)
+    index = VectorIndex(vectors, labels=["a", "b", "c", "d"])
+
+    scores, ids = index.search(vectors[2], k=2)
+
+    assert ids[0, 0] == 2
+    assert scores[0, 0] == pytest.approx(1.0, abs=1e-5)
+    assert scores[0, 0] >= scores[0, 1]
+
+
+def test_int8_quantization_keeps_recall():
+    vectors = clustered(3000)
+    queries = clustered(50, seed=1)
+
+    assert recall(VectorIndex(vectors, quantize=True), VectorIndex(vectors), queries) >= 0.95
+
+
+def test_ivf_partition_keeps_recall():
+    vectors = clustered(5000)
+    queries = clustered(50, seed=1)
+    index = VectorIndex(vectors, ivf_threshold=1000, nprobe=8)
+
+    assert index._centroids is not None
+    assert recall(index, VectorIndex(vectors), queries) >= 0.9
+
+
+def test_save_and_load_round_trip(tmp_path):
+    path = tmp_path / "attacks.npy"
+    VectorIndex.save(path, np.eye(3) * 5, labels=["x", "y", "z"])
+
+    index = VectorIndex.load(path)
+
+    assert index.labels == ["x", "y", "z"]
+    assert np.allclose(np.linalg.norm(index._matrix, axis=1), 1.0)
+
+
+def test_partition_cache_is_reused_until_the_matrix_changes(tmp_path):
+    path = tmp_path / "attacks.npy"
+    VectorIndex.save(path, clustered(2000))
+    first = VectorIndex.load(path, ivf_threshold=1000)
+    cached = VectorIndex.load(path, ivf_threshold=1000)
+    assert np.array_equal(first._order, cached._order)
+
+    # Same shape, different vectors: the cached partition must not be used
+    rebuilt_vectors = clustered(2000, seed=7)
+    VectorIndex.save(path, rebuilt_vectors)
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    rebuilt = VectorIndex.load(path, ivf_threshold=1000)
+
+    queries = clustered(30, seed=8)
+    assert recall(rebuilt, VectorIndex(rebuilt_vectors), queries) >= 0.9
+    assert not np.array_equal(first._centroids, rebuilt._centroids)